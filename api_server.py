@@ -0,0 +1,288 @@
+# 큐레이션 JSON API 서버 (asyncio)
+# curation 모듈을 Streamlit 없이 HTTP로 제공한다. 표준 라이브러리 asyncio 스트림 위의 작은
+# HTTP/1.1 서버로, keep-alive 연결을 재사용하고 블로킹 작업(검색, 키워드 생성)은 큐레이션
+# 스레드 풀에서 실행하므로 이벤트 루프는 요청 파싱과 응답 전송만 맡는다.
+#
+#   python api_server.py --port 8080
+#
+#   GET  /health
+#   GET  /keywords?theme=비 오는 날에
+#   GET  /search?keyword=빗소리&max_results=5&exclude=id1,id2
+#   GET  /curate?theme=비 오는 날에&max_results=5      (POST /curate 에 JSON 본문도 가능)
+#   GET  /metrics                                       (TRACING_ENABLED=1일 때 구간별 시간, Prometheus 텍스트)
+#   GET  /metrics?format=jsonl&limit=1000              (최근 span을 JSON lines로)
+#
+# 오류는 {"error": {"code": ..., "message": ...}} 형식으로 반환한다.
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+from urllib.parse import parse_qs, urlsplit
+
+import config
+import curation
+import tracing
+import usage_log
+from video_record import VideoRecord
+
+logger = logging.getLogger(__name__)
+
+MAX_RESULTS_LIMIT = 50
+
+STATUS_TEXT = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    429: 'Too Many Requests',
+    500: 'Internal Server Error',
+    502: 'Bad Gateway',
+    503: 'Service Unavailable',
+}
+
+# CurationError 코드별 HTTP 상태
+ERROR_STATUS = {
+    'bad_request': 400,
+    'not_found': 404,
+    'method_not_allowed': 405,
+    'payload_too_large': 413,
+    'quota_exhausted': 429,
+    'youtube_unavailable': 503,
+    'youtube_error': 502,
+    'missing_api_key': 503,
+    'internal_error': 500,
+}
+
+
+# JSON이 아닌 응답 본문
+class TextResponse:
+    def __init__(self, text, content_type):
+        self.text = text
+        self.content_type = content_type
+
+
+def _error(code, message):
+    return curation.CurationError(code, message)
+
+
+def _text_param(params, name):
+    value = params.get(name)
+    if not isinstance(value, str) or not value.strip():
+        raise _error('bad_request', f"'{name}' 값이 필요합니다")
+    return value.strip()
+
+
+def _max_results(params):
+    value = params.get('max_results', 5)
+    # bool은 int의 하위 클래스이고, 5.7 같은 실수는 int()가 조용히 잘라 버리므로 따로 거절한다
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise _error('bad_request', "'max_results'는 정수여야 합니다")
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise _error('bad_request', "'max_results'는 정수여야 합니다")
+    if not 1 <= value <= MAX_RESULTS_LIMIT:
+        raise _error('bad_request', f"'max_results'는 1에서 {MAX_RESULTS_LIMIT} 사이여야 합니다")
+    return value
+
+
+# 제외할 영상 ID 목록 (쉼표로 구분한 문자열이나 문자열 목록)
+def _exclude(params):
+    value = params.get('exclude') or []
+    if isinstance(value, str):
+        return [video_id for video_id in value.split(',') if video_id]
+    if not isinstance(value, list) or not all(isinstance(video_id, str) for video_id in value):
+        raise _error('bad_request', "'exclude'는 쉼표로 구분한 문자열이나 문자열 목록이어야 합니다")
+    return value
+
+
+async def handle_keywords(params):
+    theme = curation.classify_theme(_text_param(params, 'theme'))
+    keywords = await curation.run_blocking(curation.generate_keywords, theme)
+    return {'theme': theme, 'keywords': keywords}
+
+
+async def handle_search(params):
+    keyword = _text_param(params, 'keyword')
+    exclude = _exclude(params)
+    videos = await curation.run_blocking(_search_videos, keyword, _max_results(params), exclude)
+    return {'keyword': keyword, 'videos': videos}
+
+
+# 키워드 사용을 기록하고 검색 (warm-up 작업이 인기 키워드를 고르는 데 사용)
+def _search_videos(keyword, max_results, exclude):
+    usage_log.record(keyword)
+    return curation.search_videos(keyword, max_results, exclude)
+
+
+async def handle_curate(params):
+    return await curation.curate(_text_param(params, 'theme'), _max_results(params))
+
+
+async def handle_health(params):
+    return {'status': 'ok'}
+
+
+async def handle_metrics(params):
+    return TextResponse(*tracing.metrics_response(params))
+
+
+ROUTES = {
+    '/health': (handle_health, ('GET',)),
+    '/keywords': (handle_keywords, ('GET',)),
+    '/search': (handle_search, ('GET',)),
+    '/curate': (handle_curate, ('GET', 'POST')),
+    '/metrics': (handle_metrics, ('GET',)),
+}
+
+
+# 요청 하나 처리 → (상태, 응답 본문)
+async def dispatch(method, target, body):
+    url = urlsplit(target)
+    route = ROUTES.get(url.path)
+    try:
+        if route is None:
+            raise _error('not_found', f"없는 경로입니다: {url.path}")
+        handler, methods = route
+        if method not in methods:
+            raise _error('method_not_allowed', f"{method} 요청은 지원하지 않습니다")
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if body:
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                raise _error('bad_request', "요청 본문이 올바른 JSON이 아닙니다")
+            if not isinstance(payload, dict):
+                raise _error('bad_request', "요청 본문은 JSON 객체여야 합니다")
+            params.update(payload)
+        with curation.translate_errors():
+            return 200, await handler(params)
+    except curation.CurationError as e:
+        return ERROR_STATUS.get(e.code, 500), {'error': e.to_dict()}
+
+
+# 영상 레코드는 이전과 같은 JSON 객체로 보낸다
+def _json_default(value):
+    if isinstance(value, VideoRecord):
+        return value.to_dict()
+    raise TypeError(f"JSON으로 바꿀 수 없는 값입니다: {type(value).__name__}")
+
+
+def _response(status, payload, keep_alive):
+    if isinstance(payload, TextResponse):
+        body = payload.text.encode('utf-8')
+        content_type = payload.content_type
+    else:
+        body = json.dumps(payload, ensure_ascii=False, default=_json_default).encode('utf-8')
+        content_type = 'application/json; charset=utf-8'
+    head = (
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    return head.encode('latin-1') + body
+
+
+# 요청 헤더와 본문 읽기. 연결이 끝났으면 None
+async def _read_request(reader):
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), config.API_KEEPALIVE_TIMEOUT)
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:
+        raise _error('payload_too_large', "요청 헤더가 너무 깁니다")
+
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, version = lines[0].split(' ', 2)
+    except ValueError:
+        raise _error('bad_request', "잘못된 요청입니다")
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(':')
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise _error('bad_request', "Content-Length가 올바르지 않습니다")
+    if length < 0:
+        raise _error('bad_request', "Content-Length가 올바르지 않습니다")
+    if length > config.API_MAX_BODY_BYTES:
+        raise _error('payload_too_large', "요청 본문이 너무 큽니다")
+    body = await reader.readexactly(length) if length else b''
+
+    connection = headers.get('connection', '').lower()
+    keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+    return method.upper(), target, body, keep_alive
+
+
+_connection_ids = itertools.count(1)
+
+
+# 연결 하나를 추적 세션 하나로, 요청 하나를 rerun 하나로 기록한다
+async def handle_connection(reader, writer):
+    session_id = f"api-{next(_connection_ids)}"
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except curation.CurationError as e:
+                writer.write(_response(ERROR_STATUS[e.code], {'error': e.to_dict()}, False))
+                await writer.drain()
+                break
+            except asyncio.IncompleteReadError:
+                break
+            if request is None:
+                break
+            method, target, body, keep_alive = request
+            with tracing.rerun('api.request', session_id, method=method, path=urlsplit(target).path) as span:
+                status, payload = await dispatch(method, target, body)
+                span.set('status', status)
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(host=None, port=None):
+    return await asyncio.start_server(
+        handle_connection,
+        config.API_HOST if host is None else host,
+        config.API_PORT if port is None else port,
+    )
+
+
+async def serve(host=None, port=None):
+    server = await start_server(host, port)
+    for sock in server.sockets:
+        logger.info("큐레이션 API 서버 시작: %s", sock.getsockname())
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default=config.API_HOST)
+    parser.add_argument('--port', type=int, default=config.API_PORT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        curation.configure()
+    except curation.CurationError as e:
+        parser.error(e.message)
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == '__main__':
+    main()
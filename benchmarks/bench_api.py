@@ -0,0 +1,104 @@
+# 큐레이션 API 서버 처리량 벤치마크
+# 같은 프로세스에서 api_server를 띄우고 YouTube 대신 synthetic 백엔드(youtube_backend, 응답 지연 설정 가능)를
+# 연결한 뒤, keep-alive 연결 여러 개로 요청을 보내 초당 처리량과 지연 시간을 잰다.
+# - 기본: /curate (테마 → 키워드 5개 동시 검색). 처음 이후에는 대부분 검색 캐시에서 응답
+# - --cold: /search에 매번 다른 키워드를 보내 모든 요청이 synthetic 백엔드까지 간다
+#
+#   python benchmarks/bench_api.py --requests 5000 --connections 64
+#   python benchmarks/bench_api.py --cold --backend-latency 50
+import argparse
+import asyncio
+import itertools
+import os
+import statistics
+import sys
+import tempfile
+import time
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 백엔드 처리량을 재는 것이므로 할당량 제한은 사실상 끈다
+os.environ.setdefault('QUOTA_DAILY_BUDGET', str(10 ** 12))
+os.environ.setdefault('QUOTA_PER_MINUTE', str(10 ** 12))
+os.environ.setdefault('KEYWORD_EXPANSION_ENABLED', '0')
+os.environ.setdefault('CATALOG_DIR', os.path.join(tempfile.mkdtemp(prefix='bench-api-'), 'catalog'))
+os.environ.setdefault('USAGE_DB_PATH', os.path.join(tempfile.mkdtemp(prefix='bench-api-'), 'usage.sqlite3'))
+
+import api_server  # noqa: E402
+import curation  # noqa: E402
+from youtube_backend import SyntheticClient  # noqa: E402
+
+THEMES = ['비 오는 날에', '운동할 때', '공부할 때', '새벽 감성', '드라이브할 때', '카페에서']
+
+
+async def _request(reader, writer, target):
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: bench\r\n\r\n".encode('utf-8'))
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = next(
+        int(line.split(b':', 1)[1])
+        for line in head.split(b'\r\n') if line.lower().startswith(b'content-length:')
+    )
+    await reader.readexactly(length)
+    return status
+
+
+async def _client(port, targets, latencies, statuses):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        for target in targets:
+            started = time.perf_counter()
+            statuses.append(await _request(reader, writer, target))
+            latencies.append((time.perf_counter() - started) * 1000)
+    finally:
+        writer.close()
+
+
+def make_targets(count, cold):
+    if cold:
+        return [f"/search?keyword={quote(f'키워드 {i}')}&max_results=5" for i in range(count)]
+    themes = itertools.cycle(THEMES)
+    return [f"/curate?theme={quote(next(themes))}&max_results=5" for _ in range(count)]
+
+
+async def run(args):
+    backend = SyntheticClient(latency=args.backend_latency / 1000)
+    curation.set_youtube_client(backend)
+    server = await api_server.start_server('127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+
+    # 키워드 인덱스와 유사 테마 인덱스를 미리 로드
+    await _client(port, make_targets(len(THEMES), False), [], [])
+    calls_before = backend.get_stats()['calls']
+
+    targets = make_targets(args.requests, args.cold)
+    chunks = [targets[i::args.connections] for i in range(args.connections)]
+    latencies, statuses = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(_client(port, chunk, latencies, statuses) for chunk in chunks if chunk))
+    elapsed = time.perf_counter() - started
+    server.close()
+    await server.wait_closed()
+
+    latencies.sort()
+    errors = sum(1 for status in statuses if status != 200)
+    print(f"{'cold /search' if args.cold else 'warm /curate'}: {len(statuses)} requests, "
+          f"{args.connections} connections, backend latency {args.backend_latency} ms")
+    print(f"  {len(statuses) / elapsed:8.1f} req/s, p50 {statistics.median(latencies):7.2f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1]:7.2f} ms, "
+          f"{errors} errors, {backend.get_stats()['calls'] - calls_before} backend calls")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--connections', type=int, default=64)
+    parser.add_argument('--backend-latency', type=float, default=20.0, help="synthetic 백엔드 응답 지연 (ms)")
+    parser.add_argument('--cold', action='store_true')
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# 로컬 영상 카탈로그 벤치마크
+# synthetic 레코드(키워드마다 --per-keyword개)로 카탈로그를 만들어 가져오기 속도, 세그먼트 크기,
+# 세그먼트를 여는 시간(mmap), 키워드 검색 지연 시간(메모리 세그먼트 / 디스크 세그먼트 / compact 뒤)을 잰다.
+# 검색 한 번이 API로 갔다면 쓰였을 할당량(search.list + videos.list)도 함께 보여 준다.
+#
+#   python benchmarks/bench_catalog.py --keywords 2000 --per-keyword 50
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import quota  # noqa: E402
+import video_catalog  # noqa: E402
+
+MARKERS = ('playlist', '플레이리스트', 'mix', 'live', 'official', '모음')
+WORDS = ('비', '오는', '날', '재즈', '카페', '새벽', '감성', '드라이브', '운동', '공부', '빗소리와', '피아노를', '로파이')
+UNITS_PER_SEARCH = quota.method_cost('youtube.search.list') + quota.method_cost('youtube.videos.list')
+
+
+def make_records(keywords, per_keyword, seed=0):
+    rng = random.Random(seed)
+    for k in range(keywords):
+        keyword = f"키워드{k} {rng.choice(WORDS)}"
+        for i in range(per_keyword):
+            yield video_catalog.make_record(
+                f"{k:06d}{i:05d}",
+                f"{' '.join(rng.sample(WORDS, 3))} {rng.choice(MARKERS)} {keyword} {i}",
+                f"채널 {rng.randint(1, 500)}",
+                [keyword],
+                rng.randint(240, 1200) if rng.random() < 0.9 else rng.randint(1300, 10800),
+                rng.randint(100, 10 ** 7),
+            )
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def time_searches(catalog, queries, limit):
+    latencies = []
+    results = 0
+    for query in queries:
+        started = time.perf_counter()
+        results += len(catalog.search(query, limit))
+        latencies.append((time.perf_counter() - started) * 1e6)
+    return latencies, results / len(queries)
+
+
+def report(label, latencies, results):
+    print(f"  {label:22s} p50 {statistics.median(latencies):8.1f} us  p95 {percentile(latencies, 0.95):8.1f} us"
+          f"  평균 결과 {results:5.1f}개")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--keywords', type=int, default=2000)
+    parser.add_argument('--per-keyword', type=int, default=50)
+    parser.add_argument('--flush-records', type=int, default=20000, help="세그먼트 하나의 레코드 수")
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--limit', type=int, default=100)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='bench-catalog-')
+    catalog = video_catalog.VideoCatalog(directory, flush_records=10 ** 12)
+    rng = random.Random(1)
+    queries = [f"키워드{rng.randrange(args.keywords)}" for _ in range(args.queries)]
+    queries += [f"{rng.choice(WORDS)} {rng.choice(WORDS)}" for _ in range(args.queries // 4)]
+
+    total = args.keywords * args.per_keyword
+    started = time.perf_counter()
+    for count, record in enumerate(make_records(args.keywords, args.per_keyword), 1):
+        catalog.add(record)
+        if count % args.flush_records == 0:
+            catalog.flush()
+    ingest = time.perf_counter() - started
+    print(f"레코드 {total}개 가져오기: {total / ingest:,.0f}개/s")
+    report('메모리 + 디스크', *time_searches(catalog, queries, args.limit))
+    catalog.flush()
+    stats = catalog.get_stats()
+    print(f"세그먼트 {stats['segments']}개, {stats['bytes_on_disk'] / 1e6:.1f} MB "
+          f"({stats['bytes_on_disk'] / total:.0f} bytes/레코드)")
+
+    started = time.perf_counter()
+    reopened = video_catalog.VideoCatalog(directory)
+    print(f"세그먼트 열기 (mmap): {(time.perf_counter() - started) * 1000:.0f} ms")
+    report('디스크 세그먼트', *time_searches(reopened, queries, args.limit))
+    started = time.perf_counter()
+    reopened.compact()
+    print(f"compact: {(time.perf_counter() - started) * 1000:.0f} ms")
+    report('compact 뒤', *time_searches(reopened, queries, args.limit))
+    print(f"검색 {len(queries)}번을 API로 했다면 {len(queries) * UNITS_PER_SEARCH:,} 할당량 단위")
+
+
+if __name__ == '__main__':
+    main()
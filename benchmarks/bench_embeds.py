@@ -0,0 +1,98 @@
+# 영상 카드 페이지 무게 벤치마크 (플레이어 바로 로드 vs 썸네일 facade)
+# 5/50/500개 카드로 만든 HTML의 크기와 생성 시간, 페이지를 열 때 시작되는 외부 요청 수를 비교한다.
+# - 플레이어: 카드마다 YouTube 플레이어 문서 하나 (플레이어가 다시 스크립트와 이미지를 받음)
+# - facade: 화면 근처 카드의 썸네일만 (loading="lazy"), 플레이어는 클릭할 때만
+#
+#   python benchmarks/bench_embeds.py --counts 5 50 500
+#   python benchmarks/bench_embeds.py --browser   # playwright가 있으면 Chromium에서 실제 전송량과 load 시간 측정
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import embeds  # noqa: E402
+from video_record import VideoRecord  # noqa: E402
+
+PAGE = """<!doctype html><meta charset="utf-8">
+<style>
+.video-grid{{display:flex;flex-direction:column;gap:2rem;max-width:960px}}
+.iframe-container{{position:relative;width:100%;padding-bottom:56.25%}}
+.iframe-container iframe{{position:absolute;top:0;left:0;width:100%;height:100%;border:none}}
+</style>
+<div class="video-grid">{cards}</div>
+"""
+
+
+def make_videos(count):
+    # YouTube 영상 ID와 같은 길이 (11자)
+    return [
+        VideoRecord(f"bench{i:06d}", f"비 오는 날 플레이리스트 {i} <live>", f"채널 {i % 7}", '빗소리')
+        for i in range(count)
+    ]
+
+
+def render(videos, facade):
+    started = time.perf_counter()
+    cards = ''.join(embeds.video_card_html(video, facade) for video in videos)
+    return PAGE.format(cards=cards), (time.perf_counter() - started) * 1000
+
+
+# 페이지를 열 때 바로 시작되는 외부 문서/이미지 요청 수
+def initial_requests(count, facade, viewport_cards):
+    if facade:
+        return {'players': 0, 'thumbnails': min(count, viewport_cards)}
+    return {'players': count, 'thumbnails': 0}
+
+
+# Chromium에서 페이지를 열고 load 이벤트까지의 시간과 전송량을 잰다 (네트워크 필요)
+def measure_in_browser(page_html):
+    from playwright.sync_api import sync_playwright
+
+    with tempfile.NamedTemporaryFile('w', suffix='.html', delete=False, encoding='utf-8') as f:
+        f.write(page_html)
+        path = f.name
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch()
+            page = browser.new_page(viewport={'width': 1280, 'height': 900})
+            started = time.perf_counter()
+            page.goto(f"file://{path}", wait_until='load', timeout=120000)
+            load_ms = (time.perf_counter() - started) * 1000
+            transferred = page.evaluate(
+                "performance.getEntriesByType('resource').reduce((s, e) => s + e.transferSize, 0)"
+            )
+            frames = len(page.frames) - 1
+            browser.close()
+        return load_ms, transferred, frames
+    finally:
+        os.unlink(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--counts', type=int, nargs='+', default=[5, 50, 500])
+    parser.add_argument('--viewport-cards', type=int, default=3, help='첫 화면과 lazy 로딩 여유 범위에 들어가는 카드 수')
+    parser.add_argument('--browser', action='store_true')
+    args = parser.parse_args()
+
+    for count in args.counts:
+        videos = make_videos(count)
+        for facade in (False, True):
+            page_html, render_ms = render(videos, facade)
+            requests = initial_requests(count, facade, args.viewport_cards)
+            line = (
+                f"{count:4d} videos {'facade' if facade else 'player':6s}: "
+                f"{len(page_html.encode('utf-8')):8d} html bytes, {render_ms:7.2f} ms render, "
+                f"{requests['players']:4d} players, {requests['thumbnails']:3d} thumbnails at load"
+            )
+            if args.browser:
+                load_ms, transferred, frames = measure_in_browser(page_html)
+                line += f", load {load_ms:8.1f} ms, {transferred / 1024:9.1f} KiB transferred, {frames} frames"
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
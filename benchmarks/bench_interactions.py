@@ -0,0 +1,141 @@
+# 좋아요 클릭 한 번의 비용 측정 (전체 rerun vs fragment rerun)
+# Streamlit AppTest로 앱을 실행하고, 영상 그리드에서 좋아요를 누를 때의 스크립트 실행 시간과
+# 프런트엔드로 보내는 delta 메시지 크기를 잰다.
+# - full: fragment 도입 전처럼 클릭마다 앱 전체를 다시 실행하는 경우
+# - fragment: 검색 결과 그리드 fragment만 다시 실행하는 경우
+# 검색 결과는 공유 캐시에 미리 넣어 두므로 네트워크 없이 동작한다.
+#
+#   python benchmarks/bench_interactions.py --repeat 20
+# AppTest는 fragment 단위 rerun과 컴포넌트 값 입력을 직접 지원하지 않아서, LocalScriptRunner의
+# RerunData에 fragment_id_queue를 넣고 그리드 컴포넌트의 위젯 값을 직접 만들어 실행한다
+# (Streamlit 내부 API, 1.37 이상).
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from functools import partial
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('LIKED_DB_PATH', os.path.join(tempfile.mkdtemp(), 'liked.sqlite3'))
+os.environ.setdefault('KEYWORD_EXPANSION_ENABLED', '0')
+os.environ.setdefault('SIDEBAR_REFRESH_SECONDS', '0')
+os.environ.setdefault('CATALOG_DIR', os.path.join(tempfile.mkdtemp(), 'catalog'))
+os.environ.setdefault('USAGE_DB_PATH', os.path.join(tempfile.mkdtemp(), 'usage.sqlite3'))
+
+from streamlit.proto.WidgetStates_pb2 import WidgetState  # noqa: E402
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from streamlit.testing.v1 import local_script_runner  # noqa: E402
+
+from search_cache import search_cache, search_key  # noqa: E402
+
+THEME = '비 오는 날에'
+KEYWORDS = ('빗소리', '감성', '우울', '새벽', '차분한')
+KEYWORD = KEYWORDS[0]
+
+
+def seed_search_cache(count):
+    for keyword in KEYWORDS:
+        items = [
+            {'id': f"{keyword}{i:06d}", 'title': f"{keyword} 플레이리스트 {i}", 'channel': f"채널 {i % 7}"}
+            for i in range(count)
+        ]
+        search_cache.put(search_key(keyword, 20), {'items': items, 'next_page_token': None})
+
+
+class Recorder:
+    def __init__(self):
+        self.msgs = []
+        self._original_run = local_script_runner.LocalScriptRunner.run
+
+    # LocalScriptRunner.run을 감싸서 이번 실행에서 보낸 메시지를 기록
+    def install(self):
+        recorder = self
+        original_run = self._original_run
+
+        def run(runner, *args, **kwargs):
+            tree = original_run(runner, *args, **kwargs)
+            # 이번 실행에서 새로 보낸 메시지만 (fragment rerun에서는 큐에 이전 delta가 남아 있음)
+            recorder.msgs = [data['forward_msg'] for data in runner.event_data if 'forward_msg' in data]
+            return tree
+
+        local_script_runner.LocalScriptRunner.run = run
+
+    def delta_bytes(self):
+        return sum(msg.ByteSize() for msg in self.msgs if msg.HasField('delta'))
+
+    def delta_count(self):
+        return sum(1 for msg in self.msgs if msg.HasField('delta'))
+
+    # 키가 prefix로 시작하는 그리드 컴포넌트의 (위젯 ID, fragment ID)
+    def grid_of(self, key_prefix):
+        for msg in self.msgs:
+            if msg.HasField('delta') and msg.delta.HasField('new_element'):
+                element = msg.delta.new_element
+                if element.HasField('component_instance') and f"-{key_prefix}" in element.component_instance.id:
+                    return element.component_instance.id, msg.delta.fragment_id
+        return None, None
+
+
+# 그리드에서 영상 하나의 좋아요 버튼을 누른 것과 같은 위젯 값으로 실행
+def click_like(at, grid_id, video_id, nonce):
+    widget_states = at._tree.get_widget_states()
+    state = WidgetState(id=grid_id)
+    state.json_value = json.dumps({'action': 'like', 'id': video_id, 'nonce': nonce})
+    widget_states.widgets.append(state)
+    at._run(widget_states)
+
+
+def measure(at, recorder, grid_id, video_id, fragment_id, repeat):
+    timings, sizes, counts = [], [], []
+    for nonce in range(repeat):
+        # 러너는 생성할 때 받은 첫 RerunData와 클릭 요청을 합치므로 실행 전체에 걸쳐 바꿔 둔다
+        if fragment_id is not None:
+            local_script_runner.RerunData = partial(RerunData, fragment_id_queue=[fragment_id])
+        started = time.perf_counter()
+        try:
+            click_like(at, grid_id, video_id, f"{fragment_id}-{nonce}")
+        finally:
+            local_script_runner.RerunData = RerunData
+        timings.append((time.perf_counter() - started) * 1000)
+        sizes.append(recorder.delta_bytes())
+        counts.append(recorder.delta_count())
+    return statistics.median(timings), statistics.median(sizes), statistics.median(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    seed_search_cache(20)
+    recorder = Recorder()
+    recorder.install()
+
+    at = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=30)
+    at.secrets['YOUTUBE_API_KEY'] = 'benchmark'
+    at.secrets['GOOGLE_API_KEY'] = 'benchmark'
+    at.run()
+    at.text_input(key='input_text').input(THEME)
+    at.button(key='search_button').click().run()
+    hashtag = next(b for b in at.button if b.label == f"#{KEYWORD}")
+    hashtag.click().run()
+
+    grid_id, fragment_id = recorder.grid_of('results_grid_')
+    if grid_id is None:
+        print("검색 결과 그리드를 찾지 못했습니다")
+        return
+    video_id = f"{KEYWORD}000000"
+
+    full = measure(at, recorder, grid_id, video_id, None, args.repeat)
+    print(f"full rerun:     {full[0]:7.2f} ms, {full[1]:8.0f} delta bytes, {full[2]:4.0f} deltas")
+    scoped = measure(at, recorder, grid_id, video_id, fragment_id, args.repeat)
+    print(f"fragment rerun: {scoped[0]:7.2f} ms, {scoped[1]:8.0f} delta bytes, {scoped[2]:4.0f} deltas")
+
+
+if __name__ == '__main__':
+    main()
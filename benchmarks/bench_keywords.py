@@ -0,0 +1,85 @@
+# generate_keywords 테마 조회 벤치마크
+# 합성 카탈로그(수만 개 테마)로 Aho–Corasick 인덱스와 기존 선형 부분 문자열 탐색을 비교한다.
+#
+#   python benchmarks/bench_keywords.py --themes 50000 --queries 2000
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_index import KeywordIndex, normalize_theme  # noqa: E402
+
+SYLLABLES = '가나다라마바사아자차카타파하비밤날운동공부휴식사랑이별설렘행복산책요리'
+
+
+def make_catalog(count, seed):
+    rng = random.Random(seed)
+    themes = {}
+    while len(themes) < count:
+        words = [''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(rng.randint(1, 3))]
+        themes[' '.join(words)] = ['키워드'] * 5
+    return themes
+
+
+# 카탈로그에 없는 글자로만 만든 입력 (일치하는 테마가 없어 전체를 탐색하는 경우)
+def make_misses(count, seed):
+    rng = random.Random(seed)
+    return [''.join(chr(rng.randint(0xC790, 0xC7FF)) for _ in range(rng.randint(4, 20))) for _ in range(count)]
+
+
+def make_queries(themes, count, seed):
+    rng = random.Random(seed)
+    keys = list(themes)
+    queries = []
+    for _ in range(count):
+        prefix = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(0, 6)))
+        suffix = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(0, 6)))
+        queries.append(f"{prefix} {rng.choice(keys)} {suffix}할 때 듣기 좋은 노래")
+    return queries
+
+
+# 기존 generate_keywords 방식: 정확히 일치하지 않으면 사전 순서대로 부분 문자열 탐색
+def linear_lookup(themes, theme):
+    clean_theme = normalize_theme(theme)
+    if clean_theme in themes:
+        return themes[clean_theme]
+    for key in themes:
+        if key in clean_theme:
+            return themes[key]
+    return None
+
+
+def timed(fn, queries):
+    started = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - started) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--themes', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    themes = make_catalog(args.themes, args.seed)
+    queries = make_queries(themes, args.queries, args.seed)
+    misses = make_misses(args.queries, args.seed)
+
+    started = time.perf_counter()
+    index = KeywordIndex(themes, ['기본'])
+    build_ms = (time.perf_counter() - started) * 1000
+
+    print(f"themes={len(themes)} queries={len(queries)}")
+    print(f"index build: {build_ms:.1f} ms")
+    for name, batch in (('hit', queries), ('miss', misses)):
+        print(f"[{name}] aho-corasick: {timed(index.lookup, batch):9.2f} us/query")
+        print(f"[{name}] linear scan:  {timed(lambda q: linear_lookup(themes, q), batch):9.2f} us/query")
+
+
+if __name__ == '__main__':
+    main()
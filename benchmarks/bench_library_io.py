@@ -0,0 +1,118 @@
+# 저장 목록 가져오기/내보내기 벤치마크
+# 사용자 한 명의 저장 목록에 영상 --items개를 넣고 library_io로 형식마다 다음을 잰다.
+# - 내보내기: 초당 영상 수, MB/s, 파이썬 메모리 최대 사용량 (tracemalloc)
+# - 가져오기: 내보낸 파일을 새 사용자로 가져오기, 같은 파일을 다시 가져오기 (모두 중복)
+# - 가져오는 동안 다른 세션의 사이드바 조회(keyword_counts) 지연 시간 (배치 사이에 잠금을 놓는지 확인)
+# 메모리 최대 사용량이 --items와 관계없이 비슷하면 스트리밍이 제대로 되고 있는 것이다.
+#
+#   python benchmarks/bench_library_io.py --items 100000
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+WORKDIR = tempfile.mkdtemp(prefix='bench-library-io-')
+os.environ.setdefault('LIKED_DB_PATH', os.path.join(WORKDIR, 'liked.sqlite3'))
+
+import library_io  # noqa: E402
+import liked_store  # noqa: E402
+from video_record import VideoRecord  # noqa: E402
+
+KEYWORDS = 50
+CHANNELS = 500
+
+
+def seed(store, user_id, items, batch_size):
+    def videos():
+        for n in range(items):
+            yield VideoRecord(
+                f"v{n:010d}", f"비 오는 날 플레이리스트 {n}", f"채널 {n % CHANNELS}", f"키워드 {n % KEYWORDS}", 1.7e9 + n,
+            )
+    started = time.perf_counter()
+    for batch in library_io.batched(videos(), batch_size):
+        store.like_many(user_id, batch)
+    return time.perf_counter() - started
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+# fn을 실행하는 동안 다른 스레드에서 keyword_counts 지연 시간을 잰다
+def with_reader(store, reader_user, fn):
+    latencies = []
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            started = time.perf_counter()
+            store.keyword_counts(reader_user)
+            latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.002)
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    try:
+        result = fn()
+    finally:
+        stop.set()
+        thread.join()
+    return result, latencies
+
+
+def traced(fn):
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    store = liked_store.get_store()
+    seconds = seed(store, 'bench', args.items, args.batch_size)
+    seed(store, 'reader', 200, args.batch_size)
+    print(f"저장 목록 {args.items:,}개 (like_many {args.batch_size}개씩 {args.items / seconds:,.0f}개/s)")
+
+    for fmt in library_io.FORMATS:
+        path = os.path.join(WORKDIR, f"export.{library_io.EXTENSIONS[fmt]}")
+
+        def export():
+            return library_io.export_to_file(store, 'bench', path, fmt, batch_size=args.batch_size)
+
+        # tracemalloc은 느리므로 처리량과 메모리는 따로 실행해서 잰다
+        result = export()
+        _, peak = traced(export)
+        print(f"{fmt:5s} 내보내기      {result['items'] / result['seconds']:9,.0f}개/s"
+              f"  {result['bytes'] / 2 ** 20 / result['seconds']:6.1f} MB/s"
+              f"  파일 {result['bytes'] / 2 ** 20:6.1f} MB  메모리 최대 {peak / 2 ** 20:5.2f} MB")
+
+        def run(user_id):
+            with open(path, 'rb') as f:
+                return library_io.import_stream(store, user_id, f, batch_size=args.batch_size)
+
+        for label, user_id in (('가져오기', f"import-{fmt}"), ('다시 가져오기', f"import-{fmt}")):
+            report, latencies = with_reader(store, 'reader', lambda: run(user_id))
+            _, peak = traced(lambda: run(f"traced-{fmt}"))
+            print(f"      {label:8s} {report['read'] / report['seconds']:9,.0f}개/s"
+                  f"  추가 {report['added']:7,}  중복 {report['duplicates']:7,}  잘못됨 {report['invalid']}"
+                  f"  메모리 최대 {peak / 2 ** 20:5.2f} MB"
+                  f"  동시 조회 p50 {statistics.median(latencies):5.2f} ms"
+                  f" p99 {percentile(latencies, 0.99):5.2f} ms 최대 {max(latencies):5.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+# YouTube API 복원력 계층 벤치마크
+# synthetic 백엔드에 장애를 넣고 resilience.ResilientCaller의 설정별 결과를 비교한다.
+# - 재시도: 요청의 --error-rate가 500 오류일 때 성공률과 할당량 사용량 (재시도 없음 / 재시도 3번)
+# - hedge: 요청의 --slow-rate가 --slow-latency만큼 늦을 때 videos.list 지연 시간 (hedge 없음 / p95 hedge)
+# - 회로 차단기: --outage초 동안 모든 요청이 실패할 때 upstream 호출 수와 실패 응답 시간 (차단기 없음 / 있음)
+# - stale fallback: 캐시가 만료된 키워드를 장애 중에 검색할 때 결과를 보여 준 비율 (curation.load_search_page)
+#
+#   python benchmarks/bench_resilience.py --calls 300
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QUOTA_DAILY_BUDGET', str(10 ** 12))
+os.environ.setdefault('QUOTA_PER_MINUTE', str(10 ** 12))
+os.environ.setdefault('KEYWORD_EXPANSION_ENABLED', '0')
+os.environ.setdefault('USAGE_DB_PATH', os.path.join(tempfile.mkdtemp(prefix='bench-resilience-'), 'usage.sqlite3'))
+# 만료된 캐시가 stale 기간 없이 바로 upstream으로 가도록 (카탈로그도 끔)
+os.environ.setdefault('SEARCH_CACHE_TTL', '1')
+os.environ.setdefault('SEARCH_CACHE_STALE_TTL', '0')
+os.environ.setdefault('CATALOG_ENABLED', '0')
+
+import curation  # noqa: E402
+import quota  # noqa: E402
+import resilience  # noqa: E402
+from youtube_backend import SyntheticClient  # noqa: E402
+
+
+def make_caller(**overrides):
+    options = dict(
+        deadline=8.0, attempt_timeout=4.0, attempts=1, backoff_base=0.01, backoff_max=0.1,
+        hedge_methods=(), hedge_min_delay=0.0, breaker_failures=0, breaker_open_seconds=1.0, seed=0,
+    )
+    options.update(overrides)
+    return resilience.ResilientCaller(**options)
+
+
+def fresh_scheduler():
+    quota.scheduler = quota.QuotaScheduler(daily_budget=10 ** 12, per_minute=10 ** 12)
+    return quota.scheduler
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def run_calls(caller, client, method, calls):
+    latencies = []
+    ok = 0
+    for i in range(calls):
+        if method == 'youtube.search.list':
+            request = client.search().list(q=f"키워드 {i}", part='snippet', maxResults=20)
+        else:
+            request = client.videos().list(id=f"video{i:06d}", part='contentDetails,statistics')
+        started = time.perf_counter()
+        try:
+            caller.call(method, lambda: request.execute(), quota.PRIORITY_USER)
+            ok += 1
+        except Exception:
+            pass
+        latencies.append((time.perf_counter() - started) * 1000)
+    return ok, latencies
+
+
+def bench_retries(args):
+    print(f"재시도 (search.list, 오류 비율 {args.error_rate:.0%})")
+    for label, attempts in (('재시도 없음', 1), ('재시도 3번', 3)):
+        scheduler = fresh_scheduler()
+        client = SyntheticClient(latency=0.002, error_rate=args.error_rate, seed=1)
+        ok, latencies = run_calls(make_caller(attempts=attempts), client, 'youtube.search.list', args.calls)
+        units = scheduler.get_stats()['spent_today']
+        print(f"  {label:10s} 성공 {ok / args.calls:6.1%}  p50 {statistics.median(latencies):6.1f} ms"
+              f"  p99 {percentile(latencies, 0.99):6.1f} ms  성공 한 번에 {units / max(ok, 1):6.1f} 단위")
+
+
+def bench_hedging(args):
+    print(f"hedge (videos.list, {args.slow_rate:.0%}가 {args.slow_latency * 1000:.0f} ms)")
+    for label, methods in (('hedge 없음', ()), ('p95 hedge', ('youtube.videos.list',))):
+        scheduler = fresh_scheduler()
+        client = SyntheticClient(latency=0.01, jitter=0.003, slow_rate=args.slow_rate,
+                                 slow_latency=args.slow_latency, seed=2)
+        caller = make_caller(hedge_methods=methods)
+        ok, latencies = run_calls(caller, client, 'youtube.videos.list', args.calls)
+        stats = caller.get_stats()
+        units = scheduler.get_stats()['spent_today']
+        print(f"  {label:10s} p50 {statistics.median(latencies):6.1f} ms  p95 {percentile(latencies, 0.95):6.1f} ms"
+              f"  p99 {percentile(latencies, 0.99):6.1f} ms  hedge {stats['hedges']}번 (먼저 응답 {stats['hedge_wins']})"
+              f"  할당량 {units} 단위")
+
+
+# 장애 동안 여러 스레드가 계속 호출
+def _hammer(caller, client, seconds, threads):
+    results = {'ok': 0, 'failed': 0, 'latencies': [], 'recovered_at': None}
+    lock = threading.Lock()
+    started = time.monotonic()
+
+    def worker(index):
+        i = 0
+        while time.monotonic() - started < seconds:
+            i += 1
+            request = client.videos().list(id=f"w{index}-{i}", part='contentDetails')
+            began = time.perf_counter()
+            try:
+                caller.call('youtube.videos.list', lambda: request.execute())
+                outcome = 'ok'
+            except Exception:
+                outcome = 'failed'
+            with lock:
+                results[outcome] += 1
+                if outcome == 'failed':
+                    results['latencies'].append((time.perf_counter() - began) * 1000)
+                elif results['recovered_at'] is None:
+                    results['recovered_at'] = time.monotonic() - started
+            time.sleep(0.005)
+
+    pool = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return results
+
+
+def bench_breaker(args):
+    print(f"회로 차단기 ({args.outage:.1f}초 장애, 스레드 8개가 {args.outage + 1.5:.1f}초 동안 호출)")
+    for label, failures in (('차단기 없음', 0), ('차단기', 5)):
+        fresh_scheduler()
+        client = SyntheticClient(latency=0.01, seed=3)
+        caller = make_caller(attempts=3, breaker_failures=failures, breaker_open_seconds=0.5)
+        client.fail_for(args.outage)
+        results = _hammer(caller, client, args.outage + 1.5, 8)
+        calls = client.get_stats()['calls']
+        failed = results['latencies'] or [0.0]
+        stats = caller.get_stats()
+        print(f"  {label:10s} upstream 호출 {calls:5d}번  실패 응답 {results['failed']:5d}개"
+              f" (p50 {statistics.median(failed):5.1f} ms)  바로 거절 {stats['short_circuits']:5d}"
+              f"  회로 열림 {sum(b['opened'] for b in stats['breakers'].values())}번")
+
+
+def bench_fallback(args):
+    keywords = [f"장애 키워드 {i}" for i in range(args.keywords)]
+    print(f"stale fallback (만료된 키워드 {len(keywords)}개를 장애 중에 검색)")
+    fresh_scheduler()
+    client = SyntheticClient(latency=0.005, seed=4)
+    curation.set_youtube_client(client)
+    resilience.caller = make_caller(attempts=2, breaker_failures=5, breaker_open_seconds=30.0)
+    youtube = curation.get_youtube()
+    for keyword in keywords:
+        curation.load_search_page(youtube, keyword)
+    time.sleep(1.1)  # SEARCH_CACHE_TTL이 지나도록
+    client.fail_for(60)
+    served = 0
+    started = time.perf_counter()
+    for keyword in keywords + [f"처음 보는 키워드 {i}" for i in range(len(keywords))]:
+        try:
+            curation.load_search_page(youtube, keyword)
+            served += 1
+        except resilience.UpstreamUnavailable:
+            pass
+    elapsed = (time.perf_counter() - started) * 1000 / (2 * len(keywords))
+    stats = resilience.caller.get_stats()
+    print(f"  만료된 키워드 {len(keywords)}개 중 {served}개를 마지막 결과로 응답 (처음 보는 키워드는 오류)"
+          f"  평균 {elapsed:.1f} ms  바로 거절 {stats['short_circuits']}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=300)
+    parser.add_argument('--error-rate', type=float, default=0.2)
+    parser.add_argument('--slow-rate', type=float, default=0.05)
+    parser.add_argument('--slow-latency', type=float, default=0.3)
+    parser.add_argument('--outage', type=float, default=2.0)
+    parser.add_argument('--keywords', type=int, default=20)
+    args = parser.parse_args()
+    bench_retries(args)
+    bench_hedging(args)
+    bench_breaker(args)
+    bench_fallback(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# 세션 메모리 벤치마크
+# 세션 --sessions개가 각자 저장 영상 --likes개와 검색 결과 5개를 들고 있을 때의 메모리를
+# 이전 영상 dict(embed_url 포함)와 VideoRecord(__slots__, 채널/키워드 intern)로 비교한다.
+# 모드마다 새 프로세스에서 실행해서 상주 메모리(RSS) 증가량을 재고,
+# session_memory.session_report로 계산한 세션 하나의 크기도 함께 보여 준다.
+# 문자열은 SQLite에서 읽은 것처럼 행마다 새 객체로 만든다.
+#
+#   python benchmarks/bench_session_memory.py --sessions 1000 --likes 500
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import session_memory  # noqa: E402
+from video_record import VideoRecord  # noqa: E402
+
+KEYWORDS = 50
+CHANNELS = 500
+
+
+def fresh(text):
+    # SQLite 행에서 읽은 문자열처럼 매번 새 객체
+    return text.encode('utf-8').decode('utf-8')
+
+
+def rss_bytes():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def make_dict(video_id, title, channel, keyword, liked_at):
+    return {
+        'id': video_id,
+        'title': title,
+        'channel': channel,
+        'embed_url': f"https://www.youtube.com/embed/{video_id}",
+        'keyword': keyword,
+        'liked_at': liked_at,
+    }
+
+
+def make_record(video_id, title, channel, keyword, liked_at):
+    return VideoRecord(video_id, title, channel, keyword, liked_at)
+
+
+def make_session(index, likes, make):
+    videos = []
+    for i in range(likes):
+        n = index * likes + i
+        videos.append(make(
+            fresh(f"v{n:010d}"), fresh(f"비 오는 날 플레이리스트 {n}"), fresh(f"채널 {n % CHANNELS}"),
+            fresh(f"키워드 {n % KEYWORDS}"), 1.7e9 + n,
+        ))
+    return {
+        'liked_videos': videos,
+        'current_videos': [make(video_id, title, channel, keyword, None) for video_id, title, channel, keyword in (
+            (fresh(f"c{index:06d}{i}"), fresh(f"검색 결과 {i}"), fresh(f"채널 {i}"), fresh("빗소리")) for i in range(5)
+        )],
+        'selected_keyword': fresh("빗소리"),
+        'refresh_counter': 0,
+    }
+
+
+def child(mode, sessions, likes):
+    make = make_dict if mode == 'dict' else make_record
+    gc.collect()
+    before = rss_bytes()
+    started = time.perf_counter()
+    states = [make_session(index, likes, make) for index in range(sessions)]
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    _, per_session = session_memory.session_report(states[0])
+    print(json.dumps({
+        'mode': mode,
+        'rss_bytes': rss_bytes() - before,
+        'report_bytes': per_session,
+        'build_seconds': elapsed,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sessions', type=int, default=1000)
+    parser.add_argument('--likes', type=int, default=500)
+    parser.add_argument('--child', choices=('dict', 'record'))
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.sessions, args.likes)
+        return
+
+    videos = args.sessions * (args.likes + 5)
+    print(f"{args.sessions} sessions x {args.likes} likes ({videos:,} videos)")
+    for mode in ('dict', 'record'):
+        result = subprocess.run(
+            [sys.executable, __file__, '--child', mode, '--sessions', str(args.sessions), '--likes', str(args.likes)],
+            capture_output=True, text=True, check=True,
+        )
+        sample = json.loads(result.stdout)
+        print(f"  {mode:6s} RSS +{sample['rss_bytes'] / 2 ** 20:7.1f} MB ({sample['rss_bytes'] / videos:5.0f} B/영상)  "
+              f"세션 하나 보고서 {sample['report_bytes'] / 1024:7.1f} KB  만들기 {sample['build_seconds']:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+# 레플리카 공유 캐시 벤치마크
+# 레플리카 여러 개(각자 메모리 캐시를 가진 SearchCache)가 같은 키워드 분포(Zipf)로 동시에 검색할 때
+# upstream 호출 수(= 할당량)와 계층별 hit 비율, 지연 시간을 공유 캐시 없음 / SQLite / RESP 대체 서버로 비교한다.
+# upstream은 synthetic 검색 응답을 만들고 지정한 지연 시간만큼 기다리는 loader다.
+# 마지막으로 검색 페이지의 JSON과 이진 직렬화 크기, 인코딩/디코딩 시간을 비교한다.
+#
+#   python benchmarks/bench_shared_cache.py --replicas 4 --queries 500 --keywords 200
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import quota  # noqa: E402
+import shared_cache  # noqa: E402
+from search_cache import SearchCache, search_key  # noqa: E402
+from youtube_backend import SyntheticClient  # noqa: E402
+
+UNITS_PER_LOAD = quota.method_cost('youtube.search.list') + quota.method_cost('youtube.videos.list')
+
+
+def make_page(client, keyword):
+    response = client.search().list(q=keyword, maxResults=20).execute()
+    rng = random.Random(keyword)
+    return {
+        'items': [
+            {
+                'id': item['id']['videoId'],
+                'title': item['snippet']['title'],
+                'channel': item['snippet']['channelTitle'],
+                'duration': rng.randint(240, 10800),
+                'views': rng.randint(100, 10 ** 7),
+            }
+            for item in response['items']
+        ],
+        'next_page_token': response.get('nextPageToken'),
+    }
+
+
+def zipf_keywords(count, queries, seed):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(count)]
+    return rng.choices([f"키워드 {i}" for i in range(count)], weights=weights, k=queries)
+
+
+def start_stand_in():
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(
+        asyncio.start_server(shared_cache.RespStandIn().handle, '127.0.0.1', 0)
+    )
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return server.sockets[0].getsockname()[1]
+
+
+def run(mode, args):
+    client = SyntheticClient()
+    loads = []
+    lock = threading.Lock()
+
+    def loader(keyword):
+        def load():
+            time.sleep(args.latency / 1000)
+            with lock:
+                loads.append(keyword)
+            return make_page(client, keyword)
+        return load
+
+    if mode == 'none':
+        backend = None
+    elif mode == 'sqlite':
+        backend = shared_cache.SqliteBackend(os.path.join(tempfile.mkdtemp(prefix='bench-shared-'), 'cache.sqlite3'))
+    else:
+        backend = shared_cache.RespBackend('127.0.0.1', start_stand_in())
+
+    replicas = []
+    for _ in range(args.replicas):
+        tier = None
+        if backend is not None:
+            tier = shared_cache.SharedTier(
+                'search', 1800, backend=backend, lease_seconds=5, poll_interval=0.01,
+                saved_units_per_hit=UNITS_PER_LOAD,
+            )
+        replicas.append(SearchCache(ttl=1800, max_entries=args.local_entries, shared=tier))
+
+    latencies = []
+
+    def replica_worker(index):
+        cache = replicas[index]
+        for keyword in zipf_keywords(args.keywords, args.queries, seed=index):
+            started = time.perf_counter()
+            cache.get_or_load(search_key(keyword, 20), loader(keyword))
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.replicas) as pool:
+        list(pool.map(replica_worker, range(args.replicas)))
+    elapsed = time.perf_counter() - started
+
+    local_hits = sum(cache.get_stats()['hits'] for cache in replicas)
+    lookups = args.replicas * args.queries
+    shared_stats = [cache.shared.get_stats() for cache in replicas if cache.shared is not None]
+    shared_hits = sum(stats['hits'] + stats['lease_wait_hits'] for stats in shared_stats)
+    latencies.sort()
+    print(
+        f"{mode:7s} upstream {len(loads):5d} ({len(loads) * UNITS_PER_LOAD:7d} units)  "
+        f"local hit {local_hits / lookups:6.1%}  shared hit {shared_hits / lookups:6.1%}  "
+        f"p50 {statistics.median(latencies):7.2f} ms  p95 {latencies[int(len(latencies) * 0.95) - 1]:7.2f} ms  "
+        f"{elapsed:5.2f} s"
+    )
+    if backend is not None:
+        backend.close()
+
+
+def codec(args):
+    client = SyntheticClient()
+    page = make_page(client, '비 오는 날 빗소리')
+    as_json = json.dumps(page, ensure_ascii=False).encode('utf-8')
+    as_binary = shared_cache.encode(page)
+    assert shared_cache.decode(as_binary) == page
+
+    def per_call(fn, count=2000):
+        started = time.perf_counter()
+        for _ in range(count):
+            fn()
+        return (time.perf_counter() - started) * 1e6 / count
+
+    print(f"검색 페이지 ({len(page['items'])}개 항목)")
+    print(f"  JSON   {len(as_json):6d} bytes  encode {per_call(lambda: json.dumps(page, ensure_ascii=False).encode('utf-8')):6.1f} us"
+          f"  decode {per_call(lambda: json.loads(as_json)):6.1f} us")
+    print(f"  binary {len(as_binary):6d} bytes  encode {per_call(lambda: shared_cache.encode(page)):6.1f} us"
+          f"  decode {per_call(lambda: shared_cache.decode(as_binary)):6.1f} us")
+    details = {'duration': 3725, 'views': 1234567}
+    print(f"상세 정보: JSON {len(json.dumps(details))} bytes, binary {len(shared_cache.encode(details))} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--replicas', type=int, default=4)
+    parser.add_argument('--queries', type=int, default=500, help="레플리카당 검색 수")
+    parser.add_argument('--keywords', type=int, default=200, help="서로 다른 키워드 수 (Zipf 분포)")
+    parser.add_argument('--latency', type=float, default=20.0, help="upstream 응답 지연 (ms)")
+    parser.add_argument('--local-entries', type=int, default=1000, help="레플리카별 메모리 캐시 항목 수")
+    parser.add_argument('--modes', nargs='+', default=['none', 'sqlite', 'resp'])
+    args = parser.parse_args()
+
+    print(f"{args.replicas} replicas x {args.queries} queries, {args.keywords} keywords, "
+          f"upstream {args.latency} ms")
+    for mode in args.modes:
+        run(mode, args)
+    codec(args)
+
+
+if __name__ == '__main__':
+    main()
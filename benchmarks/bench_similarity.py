@@ -0,0 +1,64 @@
+# 유사 테마 인덱스 벤치마크
+# 합성 카탈로그로 인덱스를 만들고(디스크 저장 후 memory-map으로 열기) 질의당 지연 시간을 잰다.
+#
+#   python benchmarks/bench_similarity.py --themes 100000 --queries 2000
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from theme_similarity import ThemeSimilarityIndex, build_index  # noqa: E402
+
+# 한글 음절 블록 앞쪽 1000자 + 실제 테마에 자주 나오는 음절
+SYLLABLES = [chr(0xAC00 + i * 11) for i in range(1000)] + list('비밤날운동공부휴식사랑이별설렘행복산책요리새벽감성')
+
+
+def random_text(rng, words):
+    return ' '.join(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(words))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--themes', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--dims', type=int, default=config.THEME_SIMILARITY_DIMS)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    themes = list(dict.fromkeys(random_text(rng, rng.randint(1, 3)) for _ in range(args.themes)))
+    queries = [random_text(rng, rng.randint(1, 4)) for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as path:
+        started = time.perf_counter()
+        build_index(themes, path, args.dims)
+        build_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index = ThemeSimilarityIndex(path)
+        open_ms = (time.perf_counter() - started) * 1000
+
+        for query in queries[:50]:
+            index.nearest(query)
+        latencies = []
+        for query in queries:
+            started = time.perf_counter()
+            index.nearest(query)
+            latencies.append((time.perf_counter() - started) * 1e6)
+
+    latencies.sort()
+    print(f"themes={len(themes)} queries={len(queries)} dims={args.dims}")
+    print(f"build: {build_s:.2f} s, open (mmap): {open_ms:.2f} ms")
+    print(f"nearest: mean {statistics.fmean(latencies):.1f} us, "
+          f"p50 {latencies[len(latencies) // 2]:.1f} us, "
+          f"p95 {latencies[int(len(latencies) * 0.95)]:.1f} us")
+
+
+if __name__ == '__main__':
+    main()
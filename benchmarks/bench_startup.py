@@ -0,0 +1,145 @@
+# 콜드 스타트 벤치마크
+# 새 프로세스에서 app.py의 import 문만 실행해 -X importtime으로 모듈별 import 시간을 나누어 보고,
+# 새 프로세스에서 AppTest로 첫 실행(첫 화면)이 끝나기까지의 시간과 두 번째 실행(rerun) 시간을 잰다.
+# YouTube는 synthetic 백엔드를 사용하므로 네트워크가 필요 없다.
+#
+#   python benchmarks/bench_startup.py
+#   git worktree add /tmp/before HEAD~1 && python benchmarks/bench_startup.py --root /tmp/before   # 변경 전과 비교
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_PAINT = """
+import os, sys, time, json
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+at = AppTest.from_file(os.path.join({root!r}, 'app.py'), default_timeout=120)
+at.secrets['YOUTUBE_API_KEY'] = 'benchmark'
+at.secrets['GOOGLE_API_KEY'] = 'benchmark'
+at.query_params['uid'] = 'startup'
+at.run()
+first = time.perf_counter()
+assert not at.exception, at.exception
+at.run()
+second = time.perf_counter()
+print(json.dumps({{
+    'streamlit_import_ms': (imported - started) * 1000,
+    'first_run_ms': (first - imported) * 1000,
+    'rerun_ms': (second - first) * 1000,
+}}))
+"""
+
+
+def child_env(root):
+    tmp = tempfile.mkdtemp(prefix='bench-startup-')
+    env = dict(os.environ)
+    env.update({
+        'PYTHONPATH': root,
+        'YOUTUBE_BACKEND': 'synthetic',
+        'YOUTUBE_SYNTHETIC_LATENCY': '0',
+        'LIKED_DB_PATH': os.path.join(tmp, 'liked.sqlite3'),
+        'CATALOG_DIR': os.path.join(tmp, 'catalog'),
+        'USAGE_DB_PATH': os.path.join(tmp, 'usage.sqlite3'),
+        'SIDEBAR_REFRESH_SECONDS': '0',
+        'PYTHONWARNINGS': 'ignore',
+    })
+    return env
+
+
+# app.py 최상위 import 문만 모은 코드
+def app_imports(root):
+    with open(os.path.join(root, 'app.py'), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    return '\n'.join(
+        ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+# -X importtime 출력 → [(깊이, 이름, 누적 ms)]
+def parse_importtime(stderr):
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, name.strip(), int(cumulative) / 1000))
+    return rows
+
+
+def import_breakdown(root):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', app_imports(root)],
+        cwd=root, env=child_env(root), capture_output=True, text=True,
+    )
+    wall = (time.perf_counter() - started) * 1000
+    if result.returncode:
+        raise RuntimeError(result.stderr[-2000:])
+    return wall, parse_importtime(result.stderr)
+
+
+def first_paint(root):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', FIRST_PAINT.format(root=root)],
+        cwd=root, env=child_env(root), capture_output=True, text=True,
+    )
+    wall = (time.perf_counter() - started) * 1000
+    if result.returncode:
+        raise RuntimeError(result.stderr[-2000:])
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample['process_ms'] = wall
+    return sample
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--root', default=ROOT, help="측정할 체크아웃 경로 (변경 전 트리와 비교할 때)")
+    parser.add_argument('--repeat', type=int, default=5, help="새 프로세스를 띄워 측정할 횟수")
+    parser.add_argument('--top', type=int, default=12)
+    args = parser.parse_args()
+    root = os.path.abspath(args.root)
+
+    # 디스크 캐시와 .pyc를 채우기 위한 한 번
+    import_breakdown(root)
+    runs = [import_breakdown(root) for _ in range(args.repeat)]
+    walls = [wall for wall, _ in runs]
+    totals = {}
+    for _, rows in runs:
+        for depth, name, cumulative in rows:
+            if depth <= 1:
+                totals.setdefault((depth, name), []).append(cumulative)
+    print(f"app.py import 문 ({root}): 프로세스 {statistics.median(walls):.0f} ms")
+    top_level = sorted(
+        ((statistics.median(values), name) for (depth, name), values in totals.items() if depth == 0),
+        reverse=True,
+    )
+    for cumulative, name in top_level[:args.top]:
+        print(f"  {name:40s} {cumulative:8.1f} ms")
+    heavy = sorted(
+        ((statistics.median(values), name) for (depth, name), values in totals.items() if depth == 1),
+        reverse=True,
+    )
+    print("  가장 무거운 하위 import:")
+    for cumulative, name in heavy[:args.top]:
+        print(f"    {name:38s} {cumulative:8.1f} ms")
+
+    first_paint(root)
+    samples = [first_paint(root) for _ in range(args.repeat)]
+    print(f"첫 화면 (새 프로세스 {args.repeat}회 중앙값)")
+    for name in ('streamlit_import_ms', 'first_run_ms', 'rerun_ms', 'process_ms'):
+        print(f"  {name:20s} {statistics.median(sample[name] for sample in samples):8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
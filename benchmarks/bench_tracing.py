@@ -0,0 +1,61 @@
+# 성능 추적 오버헤드 벤치마크
+# span이 없는 호출, 추적을 끈 span, 켠 span(rerun 안의 span)의 호출당 비용을 비교한다.
+# 추적을 끈 span은 미리 만든 빈 객체의 with 문뿐이므로 1µs 미만이어야 한다 (API 호출은 수십 ms).
+#
+#   python benchmarks/bench_tracing.py --iterations 200000
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tracing  # noqa: E402
+
+
+def work():
+    return None
+
+
+def plain():
+    return work()
+
+
+@tracing.traced('bench.traced')
+def decorated():
+    return work()
+
+
+def with_span():
+    with tracing.span('bench.span', method='youtube.search.list'):
+        return work()
+
+
+# 호출당 시간 (ns)
+def measure(fn, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) * 1e9 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=200000)
+    args = parser.parse_args()
+
+    print(f"{'case':28s} {'ns/call':>10s}")
+    tracing.tracer.enabled = False
+    print(f"{'no span':28s} {measure(plain, args.iterations):10.1f}")
+    print(f"{'span (disabled)':28s} {measure(with_span, args.iterations):10.1f}")
+    print(f"{'traced (disabled)':28s} {measure(decorated, args.iterations):10.1f}")
+
+    tracing.tracer.enabled = True
+    with tracing.rerun('bench.rerun', 'bench'):
+        print(f"{'span (enabled)':28s} {measure(with_span, args.iterations):10.1f}")
+        print(f"{'traced (enabled)':28s} {measure(decorated, args.iterations):10.1f}")
+    print(f"buffered spans: {len(tracing.tracer.records())}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,626 @@
+# 동시 세션 부하 테스트
+# app.py 레플리카를 `streamlit run`으로 로컬에 띄우고 (YouTube는 synthetic 백엔드), 가상 사용자들이 브라우저처럼
+# 웹소켓(/_stcore/stream)으로 접속해서 시나리오(테마 검색, 해시태그, 새로고침, 좋아요, 저장 목록 보기)를 실행한다.
+# 동시 세션 수를 단계별로 늘리면서 단계마다 다음을 잰다.
+# - 처리량(rerun/s)과 rerun 지연 시간 p50/p95/p99: 클릭(BackMsg)부터 script_finished까지. st.rerun()으로 이어지는 실행 포함
+# - 레플리카별 CPU 사용률과 최대 RSS (/proc)
+# - upstream 호출 수: 레플리카의 /metrics에서 메서드별 할당량 사용량을 읽어 호출 수로 바꾼다
+# rerun p95가 --slo-ms를 넘거나, 오류 비율이 --max-error-rate를 넘거나, 세션을 늘려도 처리량이 늘지 않으면 멈추고
+# 그 전 단계를 포화 지점으로 알려 준다. SLO나 오류 기준을 넘어서 멈췄으면 두 단계 사이를 --refine번 이분 탐색한다.
+# 시나리오는 JSON 파일이다 (benchmarks/scenarios/default.json). 사용자는 가중치에 따라 흐름(flow)을 골라
+# 단계(step)를 차례로 실행하고, 단계 사이에는 think_seconds만큼 쉰다. 쉬는 동안에도 브라우저처럼
+# 사이드바 fragment의 자동 rerun(SIDEBAR_REFRESH_SECONDS, 켠 경우)을 보낸다.
+# 할당량 제한은 끄고 (실제로 쓸 할당량은 upstream 호출 수로 보여 준다) 키워드 확장도 끈다.
+#
+#   python benchmarks/loadtest.py --levels 1,2,4,8,16,32 --duration 20
+#   python benchmarks/loadtest.py --replicas 2 --shared-cache --backend-latency 0.2 --slo-ms 800
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import socket
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+from streamlit.proto.Alert_pb2 import Alert  # noqa: E402
+from streamlit.proto.BackMsg_pb2 import BackMsg  # noqa: E402
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg  # noqa: E402
+from streamlit.proto.WidgetStates_pb2 import WidgetState  # noqa: E402
+
+import quota  # noqa: E402
+
+DEFAULT_SCENARIO = os.path.join(BENCH_DIR, 'scenarios', 'default.json')
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'results', 'loadtest.json')
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class WebSocket:
+    # 웹소켓 클라이언트 (RFC 6455 중 Streamlit과 주고받는 데 필요한 부분만: binary 프레임, ping, close)
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+
+    @classmethod
+    async def connect(cls, host, port, path, protocol):
+        reader, writer = await asyncio.open_connection(host, port)
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        writer.write((
+            f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\nSec-WebSocket-Protocol: {protocol}\r\n"
+            f"Origin: http://{host}:{port}\r\n\r\n"
+        ).encode('ascii'))
+        status_line = (await reader.readuntil(b'\r\n\r\n')).split(b'\r\n', 1)[0].decode('latin-1')
+        if ' 101 ' not in status_line:
+            writer.close()
+            raise ConnectionError(f"웹소켓 연결 실패: {status_line}")
+        return cls(reader, writer)
+
+    def _frame(self, opcode, payload):
+        length = len(payload)
+        if length < 126:
+            head = struct.pack('!BB', 0x80 | opcode, 0x80 | length)
+        elif length < 2 ** 16:
+            head = struct.pack('!BBH', 0x80 | opcode, 0x80 | 126, length)
+        else:
+            head = struct.pack('!BBQ', 0x80 | opcode, 0x80 | 127, length)
+        mask = os.urandom(4)
+        # 클라이언트 프레임은 마스크해야 한다 (정수 XOR로 한 번에)
+        repeated = (mask * (length // 4 + 1))[:length]
+        masked = (int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(length, 'big')
+        self._writer.write(head + mask + masked)
+
+    async def send(self, payload):
+        self._frame(0x2, payload)
+        await self._writer.drain()
+
+    async def recv(self):
+        chunks = []
+        while True:
+            first, second = await self._reader.readexactly(2)
+            opcode = first & 0x0F
+            length = second & 0x7F
+            if length == 126:
+                length, = struct.unpack('!H', await self._reader.readexactly(2))
+            elif length == 127:
+                length, = struct.unpack('!Q', await self._reader.readexactly(8))
+            if second & 0x80:
+                mask = await self._reader.readexactly(4)
+                data = bytes(b ^ mask[i % 4] for i, b in enumerate(await self._reader.readexactly(length)))
+            else:
+                data = await self._reader.readexactly(length)
+            if opcode == 0x9:
+                self._frame(0xA, data)
+                continue
+            if opcode == 0x8:
+                raise ConnectionError("서버가 웹소켓을 닫았습니다")
+            if opcode == 0xA:
+                continue
+            chunks.append(data)
+            if first & 0x80:
+                return b''.join(chunks)
+
+    async def close(self):
+        try:
+            self._frame(0x8, struct.pack('!H', 1000))
+            await self._writer.drain()
+        except (ConnectionError, RuntimeError):
+            pass
+        self._writer.close()
+
+
+class AppSession:
+    # 브라우저 탭 하나 (Streamlit 세션 하나)
+    # 화면에 있는 위젯을 delta에서 모아 두고, 클릭은 모든 위젯 값과 함께 rerun_script로 보낸다
+    def __init__(self, port, user_id, timeout):
+        self.port = port
+        self.user_id = user_id
+        self.timeout = timeout
+        self.widgets = {}
+        self.values = {}
+        self.auto_reruns = {}
+        self._socket = None
+
+    async def connect(self):
+        self._socket = await WebSocket.connect('127.0.0.1', self.port, '/_stcore/stream', 'streamlit')
+
+    async def close(self):
+        if self._socket is not None:
+            await self._socket.close()
+            self._socket = None
+
+    # 위젯 하나를 바꾸거나 누르고 (state가 None이면 그냥 다시 실행) 실행이 끝날 때까지 기다린다
+    # (걸린 시간 ms, 앱이 보여 준 오류 목록)을 반환
+    async def rerun(self, state=None, fragment_id='', auto=False):
+        msg = BackMsg()
+        client_state = msg.rerun_script
+        client_state.query_string = f"uid={self.user_id}"
+        client_state.fragment_id = fragment_id
+        client_state.is_auto_rerun = auto
+        # 브라우저처럼 화면에 있는 위젯의 값만 보낸다 (사라진 그리드의 마지막 클릭을 다시 보내지 않게)
+        for widget_id, value in self.values.items():
+            if widget_id in self.widgets and (state is None or widget_id != state.id):
+                client_state.widget_states.widgets.append(value)
+        if state is not None:
+            client_state.widget_states.widgets.append(state)
+            if not state.HasField('trigger_value'):
+                self.values[state.id] = state
+        started = time.perf_counter()
+        await self._socket.send(msg.SerializeToString())
+        errors = await asyncio.wait_for(self._read_run(fragment_id), self.timeout)
+        return (time.perf_counter() - started) * 1000, errors
+
+    async def _read_run(self, fragment_id):
+        errors = []
+        if fragment_id:
+            self._forget_fragment(fragment_id)
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self._socket.recv())
+            kind = msg.WhichOneof('type')
+            if kind == 'new_session' and not msg.new_session.fragment_ids_this_run:
+                # 전체 실행이 새로 시작됨 (fragment에서 부른 st.rerun() 포함): 이전 화면의 위젯은 사라진다
+                self.widgets.clear()
+                self.auto_reruns.clear()
+            elif kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                error = self._remember(msg.delta.new_element, msg.delta.fragment_id)
+                if error:
+                    errors.append(error)
+            elif kind == 'auto_rerun':
+                self.auto_reruns[msg.auto_rerun.fragment_id] = msg.auto_rerun.interval
+            elif kind == 'script_finished' and msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                return errors
+
+    def _forget_fragment(self, fragment_id):
+        for widget_id in [key for key, widget in self.widgets.items() if widget['fragment_id'] == fragment_id]:
+            del self.widgets[widget_id]
+
+    def _remember(self, element, fragment_id):
+        kind = element.WhichOneof('type')
+        if kind in ('button', 'text_input'):
+            widget = getattr(element, kind)
+            self.widgets[widget.id] = {'kind': kind, 'label': widget.label, 'fragment_id': fragment_id}
+        elif kind == 'component_instance':
+            widget = element.component_instance
+            self.widgets[widget.id] = {
+                'kind': kind, 'label': '', 'fragment_id': fragment_id, 'args': json.loads(widget.json_args or '{}'),
+            }
+        elif kind == 'exception':
+            return f"{element.exception.type}: {element.exception.message}"
+        elif kind == 'alert' and element.alert.format == Alert.ERROR:
+            return element.alert.body
+        return None
+
+    def find(self, kind, match):
+        return [(widget_id, widget) for widget_id, widget in self.widgets.items()
+                if widget['kind'] == kind and match(widget_id, widget)]
+
+
+class VirtualUser:
+    # 시나리오를 실행하는 가상 사용자. 단계 결과는 results에 (op, 시작 시각, ms, 오류) 로 쌓는다
+    def __init__(self, index, port, scenario, results, rng, timeout):
+        self.session = AppSession(port, f"loadtest{index:05d}", timeout)
+        self.scenario = scenario
+        self.results = results
+        self.rng = rng
+        self._nonce = 0
+        self._auto_due = {}
+
+    async def _record(self, op, run):
+        started = time.monotonic()
+        try:
+            elapsed, errors = await run
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError, OSError) as e:
+            self.results.append((op, started, None, f"{type(e).__name__}: {e}"))
+            # 응답을 잃은 세션은 다시 접속해서 처음 화면부터
+            await self.session.close()
+            await self.session.connect()
+            self.session.values.clear()
+            return False
+        self.results.append((op, started, elapsed, '; '.join(errors) or None))
+        return True
+
+    def _click(self, widget_id, fragment_id):
+        state = WidgetState(id=widget_id)
+        state.trigger_value = True
+        return self.session.rerun(state, fragment_id)
+
+    def _grid_event(self, key_part, action):
+        grids = self.session.find('component_instance', lambda widget_id, _: key_part in widget_id)
+        if not grids:
+            return None
+        grid_id, grid = grids[0]
+        ids = grid['args'].get('ids')
+        if not ids:
+            return None
+        self._nonce += 1
+        state = WidgetState(id=grid_id)
+        state.json_value = json.dumps({'action': action, 'id': self.rng.choice(ids), 'nonce': self._nonce})
+        return self.session.rerun(state, grid['fragment_id'])
+
+    def _button(self, prefix, pick=None):
+        buttons = self.session.find('button', lambda _, widget: widget['label'].startswith(prefix))
+        if not buttons:
+            return None
+        if pick is None or pick == 'random':
+            widget_id, widget = self.rng.choice(buttons)
+        else:
+            widget_id, widget = buttons[min(int(pick), len(buttons) - 1)]
+        return self._click(widget_id, widget['fragment_id'])
+
+    # 시나리오 단계 하나를 rerun 요청으로 (화면에 해당 위젯이 없으면 None)
+    def _step_request(self, step):
+        op = step['op']
+        if op == 'search':
+            inputs = self.session.find('text_input', lambda widget_id, _: 'input_text' in widget_id)
+            buttons = self.session.find('button', lambda widget_id, _: 'search_button' in widget_id)
+            if not inputs or not buttons:
+                return None
+            theme = step.get('theme') or self.rng.choice(self.scenario['themes'])
+            state = WidgetState(id=inputs[0][0])
+            state.string_value = theme
+            self.session.values[state.id] = state
+            return self._click(buttons[0][0], buttons[0][1]['fragment_id'])
+        if op == 'hashtag':
+            return self._button('#', step.get('index'))
+        if op == 'refresh':
+            return self._button('🔄')
+        if op == 'like':
+            return self._grid_event('results_grid_', 'like')
+        if op == 'open_playlist':
+            return self._button('🎵', step.get('index'))
+        if op == 'playlist_next':
+            return self._button('다음')
+        if op == 'playlist_prev':
+            return self._button('◀')
+        if op == 'unlike':
+            return self._grid_event('saved_grid_', 'delete')
+        if op == 'home':
+            return self._button('🏠')
+        if op == 'reload':
+            return self.session.rerun()
+        raise ValueError(f"알 수 없는 시나리오 단계: {op}")
+
+    # think time 동안 브라우저처럼 fragment 자동 rerun을 보낸다
+    async def _think(self, seconds, end):
+        until = min(end, time.monotonic() + seconds)
+        while True:
+            now = time.monotonic()
+            for fragment_id, interval in list(self.session.auto_reruns.items()):
+                due = self._auto_due.setdefault(fragment_id, now + interval)
+                if now >= due:
+                    self._auto_due[fragment_id] = now + interval
+                    await self._record('auto_rerun', self.session.rerun(fragment_id=fragment_id, auto=True))
+            now = time.monotonic()
+            if now >= until:
+                return
+            wake = min([until] + [due for due in self._auto_due.values() if due > now])
+            await asyncio.sleep(max(0.0, wake - now))
+
+    def _pick_flow(self):
+        flows = self.scenario['flows']
+        return self.rng.choices(flows, weights=[flow.get('weight', 1) for flow in flows])[0]
+
+    async def run(self, end):
+        await self.session.connect()
+        try:
+            await self._record('open', self.session.rerun())
+            think = self.scenario.get('think_seconds', [1.0, 3.0])
+            while time.monotonic() < end:
+                for step in self._pick_flow()['steps']:
+                    for _ in range(step.get('times', 1)):
+                        if time.monotonic() >= end:
+                            return
+                        await self._think(self.rng.uniform(*step.get('think_seconds', think)), end)
+                        if time.monotonic() >= end:
+                            return
+                        request = self._step_request(step)
+                        if request is None:
+                            self.results.append((step['op'], time.monotonic(), None, 'skipped'))
+                            continue
+                        await self._record(step['op'], request)
+        finally:
+            await self.session.close()
+
+
+class Replica:
+    # streamlit run으로 띄운 app.py 프로세스 하나
+    def __init__(self, index, workdir, env):
+        self.index = index
+        self.port = free_port()
+        self.metrics_port = free_port()
+        self.log_path = os.path.join(workdir, f"replica{index}.log")
+        env = dict(env, TRACING_ENABLED='1', TRACING_METRICS_PORT=str(self.metrics_port),
+                   CATALOG_DIR=os.path.join(workdir, f"catalog{index}"))
+        with open(self.log_path, 'wb') as log:
+            self.process = subprocess.Popen(
+                [sys.executable, '-m', 'streamlit', 'run', os.path.join(ROOT, 'app.py'),
+                 '--server.headless=true', f'--server.port={self.port}', '--server.address=127.0.0.1',
+                 '--server.fileWatcherType=none', '--browser.gatherUsageStats=false'],
+                cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT,
+            )
+
+    def wait_ready(self, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"레플리카 {self.index}가 종료되었습니다 ({self.log_path})")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1) as response:
+                    if response.status == 200:
+                        return
+            except OSError:
+                time.sleep(0.2)
+        raise RuntimeError(f"레플리카 {self.index}가 {timeout}초 안에 준비되지 않았습니다 ({self.log_path})")
+
+    def cpu_seconds(self):
+        with open(f"/proc/{self.process.pid}/stat") as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+    def rss_bytes(self):
+        with open(f"/proc/{self.process.pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+
+    # 메서드별 upstream 호출 수 (/metrics의 할당량 사용량 ÷ 메서드 비용)
+    def upstream_calls(self):
+        # 앱의 /metrics 서버는 첫 세션의 스크립트가 실행될 때 시작된다
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{self.metrics_port}/metrics", timeout=5) as response:
+                text = response.read().decode('utf-8')
+        except OSError:
+            return {}
+        calls = {}
+        for line in text.splitlines():
+            if line.startswith('app_quota_units_total{'):
+                labels, value = line.rsplit(' ', 1)
+                method = labels.split('method="', 1)[1].split('"', 1)[0]
+                calls[method] = int(float(value)) // quota.method_cost(method)
+        return calls
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+async def _sample_rss(replicas, peaks, end):
+    while time.monotonic() < end:
+        for replica in replicas:
+            peaks[replica.index] = max(peaks.get(replica.index, 0), replica.rss_bytes())
+        await asyncio.sleep(0.5)
+
+
+def _summarize(results, window, replicas, cpu_before, cpu_after, calls_before, calls_after, rss_peaks):
+    start, end = window
+    measured = [result for result in results if start <= result[1] < end]
+    done = [result for result in measured if result[2] is not None]
+    latencies = [result[2] for result in done]
+    failed = [result for result in measured if result[3] and result[3] != 'skipped']
+    by_op = {}
+    for op, _, elapsed, _ in done:
+        by_op.setdefault(op, []).append(elapsed)
+    upstream = {}
+    for replica in replicas:
+        for method, count in calls_after[replica.index].items():
+            upstream[method] = upstream.get(method, 0) + count - calls_before[replica.index].get(method, 0)
+    seconds = end - start
+    return {
+        'reruns': len(done),
+        'throughput': len(done) / seconds,
+        'p50_ms': statistics.median(latencies) if latencies else None,
+        'p95_ms': percentile(latencies, 0.95) if latencies else None,
+        'p99_ms': percentile(latencies, 0.99) if latencies else None,
+        'errors': len(failed),
+        'error_rate': len(failed) / max(1, len(measured)),
+        'error_samples': sorted({result[3] for result in failed})[:5],
+        'skipped': sum(1 for result in measured if result[3] == 'skipped'),
+        'by_op': {
+            op: {'n': len(samples), 'p50_ms': statistics.median(samples), 'p95_ms': percentile(samples, 0.95)}
+            for op, samples in sorted(by_op.items())
+        },
+        'replicas': [
+            {
+                'cpu_percent': 100 * (cpu_after[replica.index] - cpu_before[replica.index]) / seconds,
+                'rss_peak_mb': rss_peaks.get(replica.index, 0) / 2 ** 20,
+            }
+            for replica in replicas
+        ],
+        'upstream_calls': upstream,
+    }
+
+
+# 동시 세션 sessions개로 duration초 동안 실행하고 요약을 반환 (처음 ramp초는 접속 구간이라 집계하지 않음)
+async def run_level(replicas, scenario, sessions, duration, ramp, timeout, seed):
+    results = []
+    begin = time.monotonic()
+    end = begin + ramp + duration
+    users = [
+        VirtualUser(index, replicas[index % len(replicas)].port, scenario, results,
+                    random.Random(seed * 100003 + index), timeout)
+        for index in range(sessions)
+    ]
+
+    async def start_user(index, user):
+        # 접속을 ramp 구간에 고르게 나눈다
+        await asyncio.sleep(ramp * index / sessions)
+        await user.run(end)
+
+    rss_peaks = {}
+    sampler = asyncio.create_task(_sample_rss(replicas, rss_peaks, end))
+    tasks = [asyncio.create_task(start_user(index, user)) for index, user in enumerate(users)]
+    measure_from = begin + ramp
+    await asyncio.sleep(max(0.0, measure_from - time.monotonic()))
+    cpu_before = {replica.index: replica.cpu_seconds() for replica in replicas}
+    calls_before = {replica.index: replica.upstream_calls() for replica in replicas}
+    await asyncio.sleep(max(0.0, end - time.monotonic()))
+    cpu_after = {replica.index: replica.cpu_seconds() for replica in replicas}
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await sampler
+    calls_after = {replica.index: replica.upstream_calls() for replica in replicas}
+    return _summarize(results, (measure_from, end), replicas, cpu_before, cpu_after, calls_before, calls_after,
+                      rss_peaks)
+
+
+def print_level(sessions, summary):
+    p = {key: f"{summary[key]:7.0f}" if summary[key] is not None else '      -' for key in ('p50_ms', 'p95_ms', 'p99_ms')}
+    replicas = '  '.join(f"CPU {r['cpu_percent']:4.0f}% RSS {r['rss_peak_mb']:5.0f} MB" for r in summary['replicas'])
+    upstream = ', '.join(f"{method.split('.')[1]} {count}" for method, count in sorted(summary['upstream_calls'].items()))
+    print(f"세션 {sessions:4d}  {summary['throughput']:6.1f} rerun/s  p50 {p['p50_ms']} p95 {p['p95_ms']} "
+          f"p99 {p['p99_ms']} ms  오류 {summary['errors']:3d}  {replicas}  upstream {upstream or '-'}")
+    for error in summary['error_samples']:
+        print(f"           오류 예: {error[:160]}")
+
+
+# 단계 결과가 SLO를 만족하는지와 멈춘 이유
+def check_level(summary, previous, args):
+    if summary['p95_ms'] is None:
+        return "완료된 rerun이 없음"
+    if summary['p95_ms'] > args.slo_ms:
+        return f"p95 {summary['p95_ms']:.0f} ms > SLO {args.slo_ms:.0f} ms"
+    if summary['error_rate'] > args.max_error_rate:
+        return f"오류 비율 {summary['error_rate']:.1%} > {args.max_error_rate:.1%}"
+    if previous is not None and summary['throughput'] < previous['throughput'] * (1 + args.min_gain):
+        return f"처리량이 {args.min_gain:.0%} 이상 늘지 않음 ({previous['throughput']:.1f} → {summary['throughput']:.1f} rerun/s)"
+    return None
+
+
+def load_scenario(path):
+    with open(path, encoding='utf-8') as f:
+        scenario = json.load(f)
+    if not scenario.get('flows'):
+        raise ValueError(f"시나리오에 flows가 없습니다: {path}")
+    return scenario
+
+
+def replica_env(args, workdir):
+    env = dict(os.environ)
+    env.update({
+        'YOUTUBE_BACKEND': 'synthetic',
+        'YOUTUBE_SYNTHETIC_LATENCY': str(args.backend_latency),
+        'KEYWORD_EXPANSION_ENABLED': '0',
+        'QUOTA_DAILY_BUDGET': str(10 ** 12),
+        'QUOTA_PER_MINUTE': str(10 ** 12),
+        'LIKED_DB_PATH': os.path.join(workdir, 'liked.sqlite3'),
+        'USAGE_DB_PATH': os.path.join(workdir, 'usage.sqlite3'),
+    })
+    if args.shared_cache:
+        env['SHARED_CACHE_URL'] = f"sqlite:///{os.path.join(workdir, 'shared.sqlite3')}"
+    return env
+
+
+async def run(args, scenario):
+    workdir = tempfile.mkdtemp(prefix='loadtest-')
+    # configure_api_keys가 읽는 secrets (synthetic 백엔드는 키를 쓰지 않는다)
+    os.makedirs(os.path.join(workdir, '.streamlit'))
+    with open(os.path.join(workdir, '.streamlit', 'secrets.toml'), 'w') as f:
+        f.write('YOUTUBE_API_KEY = "loadtest"\nGOOGLE_API_KEY = ""\n')
+    env = replica_env(args, workdir)
+    replicas = [Replica(index, workdir, env) for index in range(args.replicas)]
+    levels = []
+    try:
+        for replica in replicas:
+            replica.wait_ready()
+        print(f"레플리카 {len(replicas)}개, 시나리오 {scenario.get('name', args.scenario)}, "
+              f"단계마다 {args.duration:.0f}초 (접속 {args.ramp:.0f}초 제외), SLO p95 {args.slo_ms:.0f} ms")
+        saturation = None
+        stop_reason = None
+        previous = None
+        for sessions in args.levels:
+            summary = await run_level(replicas, scenario, sessions, args.duration, args.ramp, args.timeout, args.seed)
+            print_level(sessions, summary)
+            levels.append({'sessions': sessions, **summary})
+            stop_reason = check_level(summary, previous, args)
+            if stop_reason:
+                break
+            saturation = {'sessions': sessions, **summary}
+            previous = summary
+        # SLO나 오류 기준을 넘은 단계와 그 전 단계 사이를 이분 탐색해서 포화 지점을 좁힌다
+        if saturation is not None and stop_reason and check_level(levels[-1], None, args):
+            low, high = saturation['sessions'], levels[-1]['sessions']
+            for _ in range(args.refine):
+                middle = (low + high) // 2
+                if middle <= low:
+                    break
+                summary = await run_level(replicas, scenario, middle, args.duration, args.ramp, args.timeout, args.seed)
+                print_level(middle, summary)
+                levels.append({'sessions': middle, **summary})
+                reason = check_level(summary, None, args)
+                if reason:
+                    high, stop_reason = middle, reason
+                else:
+                    low, saturation = middle, {'sessions': middle, **summary}
+        if saturation is None:
+            print(f"첫 단계부터 기준을 넘었습니다: {stop_reason}")
+        else:
+            print(f"포화 지점: 세션 {saturation['sessions']}개 ({saturation['throughput']:.1f} rerun/s, "
+                  f"p95 {saturation['p95_ms']:.0f} ms)")
+            print(f"  다음 단계에서 멈춤: {stop_reason}" if stop_reason else "  모든 단계가 기준을 만족했습니다")
+            for op, stats in saturation['by_op'].items():
+                print(f"  {op:14s} {stats['n']:6d}번  p50 {stats['p50_ms']:7.1f} ms  p95 {stats['p95_ms']:7.1f} ms")
+    finally:
+        for replica in replicas:
+            replica.stop()
+    return {
+        'scenario': scenario.get('name', args.scenario),
+        'replicas': args.replicas,
+        'backend_latency': args.backend_latency,
+        'slo_ms': args.slo_ms,
+        'levels': levels,
+        'saturation_sessions': saturation['sessions'] if saturation else 0,
+        'stop_reason': stop_reason,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scenario', default=DEFAULT_SCENARIO)
+    parser.add_argument('--replicas', type=int, default=1)
+    parser.add_argument('--levels', default='1,2,4,8,16,32,64,128', help="단계별 동시 세션 수 (쉼표로 구분)")
+    parser.add_argument('--duration', type=float, default=20.0, help="단계마다 집계할 시간 (초)")
+    parser.add_argument('--ramp', type=float, default=3.0, help="세션이 접속하는 시간 (집계하지 않음, 초)")
+    parser.add_argument('--slo-ms', type=float, default=1000.0, help="rerun p95 목표 (ms)")
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--min-gain', type=float, default=0.05, help="세션을 늘렸을 때 처리량이 이 비율 이상 늘어야 함")
+    parser.add_argument('--refine', type=int, default=3, help="기준을 넘은 뒤 이분 탐색할 단계 수")
+    parser.add_argument('--timeout', type=float, default=30.0, help="rerun 하나를 기다릴 최대 시간 (초)")
+    parser.add_argument('--backend-latency', type=float, default=0.1, help="synthetic YouTube 응답 지연 (초)")
+    parser.add_argument('--shared-cache', action='store_true', help="레플리카가 SQLite 공유 캐시를 함께 씀")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+    args.levels = [int(level) for level in args.levels.split(',') if level.strip()]
+
+    report = asyncio.run(run(args, load_scenario(args.scenario)))
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
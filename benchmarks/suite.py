@@ -0,0 +1,314 @@
+# 성능 회귀 벤치마크 모음
+# Streamlit AppTest로 앱을 화면 없이 실행하고 (YouTube는 synthetic 백엔드) 주요 흐름의 지연 시간을 잰다.
+# - initial_load: 첫 화면
+# - search_flow: 검색 버튼 → 키워드 → 해시태그 클릭 → 결과
+# - refresh: 새로고침 버튼 (다음 페이지 영상)
+# - like_unlike@N / open_playlist@N: 좋아요 라이브러리가 N개일 때 좋아요 토글과 저장 목록 열기
+# - generate_keywords_*, select_videos, search_videos: 핵심 함수 마이크로벤치마크
+# 항목들을 --rounds번 번갈아 실행하고(라운드마다 --repeat번), 라운드별 p50과 p95의 중앙값을 기준값과 비교한다.
+# 20개 중 p95는 사실상 최댓값이라 잡음이 크므로 p95는 더 느슨한 기준(--p95-threshold)으로 큰 꼬리 지연 회귀만 잡는다.
+# 결과는 JSON으로 저장하고, 저장된 기준값보다 p50이나 p95가 기준 이상 느려지면 실패(종료 코드 1)한다.
+# 일부러 hot path를 바꾸는 커밋은 같은 커밋에서 --update-baseline으로 기준값을 갱신한다.
+#
+#   python benchmarks/suite.py                      # 측정 후 benchmarks/baseline.json과 비교
+#   python benchmarks/suite.py --update-baseline    # 기준값 갱신
+#   python benchmarks/suite.py --only search_flow refresh --repeat 5
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+_tmp = tempfile.mkdtemp(prefix='bench-suite-')
+os.environ.update({
+    'YOUTUBE_BACKEND': 'synthetic',
+    'LIKED_DB_PATH': os.path.join(_tmp, 'liked.sqlite3'),
+    'CATALOG_DIR': os.path.join(_tmp, 'catalog'),
+    'USAGE_DB_PATH': os.path.join(_tmp, 'usage.sqlite3'),
+    'KEYWORD_EXPANSION_ENABLED': '0',
+    'SIDEBAR_REFRESH_SECONDS': '0',
+    'QUOTA_DAILY_BUDGET': str(10 ** 12),
+    'QUOTA_PER_MINUTE': str(10 ** 12),
+})
+os.environ.setdefault('YOUTUBE_SYNTHETIC_LATENCY', '0')
+
+from streamlit.proto.WidgetStates_pb2 import WidgetState  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import curation  # noqa: E402
+import liked_store  # noqa: E402
+from video_record import VideoRecord  # noqa: E402
+
+# 스크립트 실행 밖에서 AppTest를 준비할 때마다 나오는 "missing ScriptRunContext" 경고를 숨긴다
+# (Streamlit이 설정을 읽을 때 로거 레벨을 다시 맞추므로 레벨 대신 필터를 단다)
+logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').addFilter(
+    lambda record: 'missing ScriptRunContext' not in record.getMessage()
+)
+
+THEME = '비 오는 날에'
+KEYWORD = '빗소리'
+LIBRARY_SIZES = (10, 1000, 10000)
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'results', 'latest.json')
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        'n': len(samples),
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'p50_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(samples[max(0, int(len(samples) * 0.95 + 0.5) - 1)], 3),
+    }
+
+
+# 라운드별 요약을 하나로 (각 값은 라운드 값들의 중앙값)
+def combine(rounds):
+    return {
+        'n': sum(summary['n'] for summary in rounds),
+        'rounds': len(rounds),
+        'mean_ms': round(statistics.median(summary['mean_ms'] for summary in rounds), 3),
+        'p50_ms': round(statistics.median(summary['p50_ms'] for summary in rounds), 3),
+        'p95_ms': round(statistics.median(summary['p95_ms'] for summary in rounds), 3),
+    }
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def new_app(user_id='bench'):
+    at = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=60)
+    at.secrets['YOUTUBE_API_KEY'] = 'benchmark'
+    at.secrets['GOOGLE_API_KEY'] = 'benchmark'
+    at.query_params['uid'] = user_id
+    return at
+
+
+def check(at):
+    if at.exception:
+        raise RuntimeError(f"앱 실행 중 예외: {at.exception[0].value}")
+    return at
+
+
+def search(at):
+    at.text_input(key='input_text').input(THEME)
+    check(at.button(key='search_button').click().run())
+
+
+def open_keyword(at):
+    check(next(b for b in at.button if b.label == f"#{KEYWORD}").click().run())
+
+
+# 검색 결과 그리드 컴포넌트 값을 직접 넣어 좋아요 클릭을 재현
+def click_grid(at, action, video_id, nonce):
+    grid_id = next(
+        node.id for node in at._tree
+        if getattr(node, 'type', None) == 'component_instance' and '-results_grid_' in node.id
+    )
+    widget_states = at._tree.get_widget_states()
+    state = WidgetState(id=grid_id)
+    state.json_value = json.dumps({'action': action, 'id': video_id, 'nonce': nonce})
+    widget_states.widgets.append(state)
+    check(at._run(widget_states))
+
+
+_seeded = set()
+
+
+def seed_library(user_id, size):
+    if user_id in _seeded:
+        return
+    _seeded.add(user_id)
+    store = liked_store.get_store()
+    # 해시태그 키워드에 절반, 나머지는 다른 키워드 20개에 나눠서 저장
+    for i in range(size):
+        keyword = KEYWORD if i % 2 == 0 else f"키워드{i % 20}"
+        store.like(user_id, VideoRecord(f"lib{size}-{i:06d}", f"저장 영상 {i}", '채널', keyword))
+
+
+def bench_initial_load(repeat):
+    return [timed(lambda: check(new_app().run())) for _ in range(repeat)]
+
+
+def bench_search_flow(repeat):
+    samples = []
+    for _ in range(repeat):
+        at = check(new_app().run())
+        samples.append(timed(lambda: (search(at), open_keyword(at))))
+    return samples
+
+
+def bench_refresh(repeat):
+    at = check(new_app().run())
+    search(at)
+    open_keyword(at)
+    samples = []
+    for i in range(repeat):
+        # synthetic 검색 결과는 5페이지뿐이라 다 보면 처음부터 다시 연다
+        if i % 10 == 9:
+            open_keyword(at)
+        samples.append(timed(lambda: check(at.button(key=f"refresh_{at.session_state.refresh_counter}").click().run())))
+    return samples
+
+
+def bench_like_unlike(repeat, size):
+    user_id = f"like{size}"
+    seed_library(user_id, size)
+    at = check(new_app(user_id).run())
+    search(at)
+    open_keyword(at)
+    video_id = at.session_state.current_videos[0].id
+    return [timed(lambda: click_grid(at, 'like', video_id, f"{size}-{i}")) for i in range(repeat)]
+
+
+def bench_open_playlist(repeat, size):
+    user_id = f"playlist{size}"
+    seed_library(user_id, size)
+    samples = []
+    for _ in range(repeat):
+        at = check(new_app(user_id).run())
+        button = next(b for b in at.button if b.key == f"playlist_{KEYWORD}")
+        samples.append(timed(lambda: check(button.click().run())))
+    return samples
+
+
+def bench_function(fn, repeat, inner=100):
+    fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(inner):
+            fn()
+        samples.append((time.perf_counter() - started) * 1000 / inner)
+    return samples
+
+
+def micro_benchmarks():
+    items = [{'id': f"v{i:06d}", 'title': f"영상 {i}", 'channel': '채널'} for i in range(200)]
+    exclude = {f"v{i:06d}" for i in range(0, 200, 3)}
+    # 검색 캐시 채우기는 main의 첫 실행(측정 제외)에서 한다
+    return {
+        # 카탈로그 일치, 유사 테마, 기본 키워드 경로
+        'generate_keywords_catalog': lambda repeat: bench_function(lambda: curation.generate_keywords('비 오는 날'), repeat),
+        'generate_keywords_similar': lambda repeat: bench_function(lambda: curation.generate_keywords('맑은날씨'), repeat),
+        'generate_keywords_default': lambda repeat: bench_function(lambda: curation.generate_keywords('드라이브 하는 중'), repeat),
+        'select_videos': lambda repeat: bench_function(lambda: curation.select_videos(items, KEYWORD, 5, exclude), repeat),
+        'search_videos': lambda repeat: bench_function(lambda: curation.search_videos(KEYWORD, 5, exclude), repeat),
+    }
+
+
+def scenarios():
+    benches = {
+        'initial_load': bench_initial_load,
+        'search_flow': bench_search_flow,
+        'refresh': bench_refresh,
+    }
+    for size in LIBRARY_SIZES:
+        benches[f"like_unlike@{size}"] = lambda repeat, size=size: bench_like_unlike(repeat, size)
+        benches[f"open_playlist@{size}"] = lambda repeat, size=size: bench_open_playlist(repeat, size)
+    return benches
+
+
+# 기준값과 p50을 비교해서 느려진 항목 목록
+# 아주 짧은 측정은 잡음이 크므로 min_delta_ms보다 작은 차이는 무시한다
+# 기준값보다 metric이 threshold 비율과 min_delta_ms를 모두 넘게 느려진 항목 [(name, metric, 기준값, 측정값)]
+def compare(results, baseline, metric, threshold, min_delta_ms):
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None or metric not in base:
+            continue
+        limit = max(base[metric] * (1 + threshold), base[metric] + min_delta_ms)
+        if result[metric] > limit:
+            regressions.append((name, metric, base[metric], result[metric]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=20, help='라운드마다 항목별 측정 횟수')
+    parser.add_argument('--rounds', type=int, default=5, help='모든 항목을 번갈아 실행하는 횟수')
+    parser.add_argument('--only', nargs='+', help='실행할 항목 이름')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--threshold', type=float, default=0.25, help='허용하는 p50 증가 비율')
+    parser.add_argument('--min-delta-ms', type=float, default=2.0, help='이보다 작은 p50 증가는 무시')
+    parser.add_argument('--p95-threshold', type=float, default=0.5, help='허용하는 p95 증가 비율')
+    parser.add_argument('--p95-min-delta-ms', type=float, default=10.0, help='이보다 작은 p95 증가는 무시')
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+
+    benches = scenarios()
+    benches.update(micro_benchmarks())
+    if args.only:
+        unknown = set(args.only) - set(benches)
+        if unknown:
+            parser.error(f"알 수 없는 항목: {', '.join(sorted(unknown))}")
+        benches = {name: benches[name] for name in args.only}
+
+    # 첫 실행(모듈 로드, 인덱스 생성, 캐시 채우기)은 측정에서 제외
+    for bench in benches.values():
+        bench(1)
+    # 라운드마다 모든 항목을 한 번씩 실행해서 기계 상태의 변화가 모든 항목에 고르게 섞이게 한다
+    rounds = {name: [] for name in benches}
+    for _ in range(args.rounds):
+        for name, bench in benches.items():
+            rounds[name].append(summarize(bench(args.repeat)))
+    results = {}
+    for name, summaries in rounds.items():
+        results[name] = combine(summaries)
+        spread = ' / '.join(f"{summary['p50_ms']:.3g}" for summary in summaries)
+        print(f"{name:28s} p50 {results[name]['p50_ms']:9.3f} ms  p95 {results[name]['p95_ms']:9.3f} ms"
+              f"  (라운드 p50 {spread})")
+
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'repeat': args.repeat,
+        'rounds': args.rounds,
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)['results']
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({**report, 'results': baseline}, f, ensure_ascii=False, indent=2)
+        print(f"기준값 저장: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"기준값 없음: {args.baseline} (--update-baseline으로 만들 수 있음)")
+        return
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+    regressions = (
+        compare(results, baseline, 'p50_ms', args.threshold, args.min_delta_ms)
+        + compare(results, baseline, 'p95_ms', args.p95_threshold, args.p95_min_delta_ms)
+    )
+    for name, metric, before, after in regressions:
+        print(f"회귀: {name} {metric[:-3]} {before:.3f} ms → {after:.3f} ms")
+    if regressions:
+        sys.exit(1)
+    print("회귀 없음")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+# 앱 설정
+# 모든 값은 같은 이름의 환경 변수로 재정의할 수 있다.
+import os
+import tempfile
+
+
+def _int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def _float(name, default):
+    return float(os.environ.get(name, default))
+
+
+def _str(name, default):
+    return os.environ.get(name, default)
+
+
+# 검색 결과 캐시 (세션 간 공유)
+SEARCH_CACHE_TTL = _int('SEARCH_CACHE_TTL', 30 * 60)
+SEARCH_CACHE_STALE_TTL = _int('SEARCH_CACHE_STALE_TTL', 24 * 60 * 60)
+SEARCH_CACHE_MAX_ENTRIES = _int('SEARCH_CACHE_MAX_ENTRIES', 5000)
+SEARCH_CACHE_MAX_BYTES = _int('SEARCH_CACHE_MAX_BYTES', 64 * 1024 * 1024)
+SEARCH_CACHE_EVICTION = _str('SEARCH_CACHE_EVICTION', 'lru')  # lru, lfu, fifo
+
+# 테마 키워드 미리 가져오기
+PREFETCH_CONCURRENCY = _int('PREFETCH_CONCURRENCY', 5)
+PREFETCH_SESSION_QUOTA = _int('PREFETCH_SESSION_QUOTA', 1000)  # 세션당 prefetch 최대 사용 단위
+
+# 새로고침 페이지 커서
+PAGINATION_BUFFER_PAGES = _int('PAGINATION_BUFFER_PAGES', 2)  # 미리 받아 둘 최대 페이지 수
+PAGINATION_PREFETCH_BELOW = _int('PAGINATION_PREFETCH_BELOW', 10)  # 현재 페이지에 남은 영상이 이만큼 이하면 다음 페이지 요청
+SEEN_FILTER_BITS = _int('SEEN_FILTER_BITS', 1 << 14)  # 키워드당 본 영상 기록 크기 (비트)
+SEEN_FILTER_HASHES = _int('SEEN_FILTER_HASHES', 4)
+
+# YouTube API 할당량
+QUOTA_DAILY_BUDGET = _int('QUOTA_DAILY_BUDGET', 10000)
+QUOTA_PER_MINUTE = _int('QUOTA_PER_MINUTE', 3000)  # 분당 한도 (0이면 끔)
+QUOTA_PREFETCH_RESERVE = _float('QUOTA_PREFETCH_RESERVE', 0.3)  # prefetch가 남겨 둘 일일 예산 비율
+QUOTA_WARMUP_RESERVE = _float('QUOTA_WARMUP_RESERVE', 0.5)  # warm-up이 남겨 둘 일일 예산 비율 (같은 프로세스 사용량 기준)
+QUOTA_MAX_WAIT = _float('QUOTA_MAX_WAIT', 3.0)  # 분당 한도에 걸렸을 때 최대 대기 시간 (초)
+
+# 테마 키워드 카탈로그
+KEYWORD_CATALOG_PATH = _str(
+    'KEYWORD_CATALOG_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'keywords.json'),
+)
+
+# 유사 테마 검색 (카탈로그에 없는 테마)
+THEME_SIMILARITY_INDEX_DIR = _str(
+    'THEME_SIMILARITY_INDEX_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'theme_index'),
+)
+THEME_SIMILARITY_DIMS = _int('THEME_SIMILARITY_DIMS', 1 << 18)  # n-gram 해시 버킷 수
+THEME_SIMILARITY_TOP_K = _int('THEME_SIMILARITY_TOP_K', 5)
+THEME_SIMILARITY_MIN_SCORE = _float('THEME_SIMILARITY_MIN_SCORE', 0.2)
+THEME_SIMILARITY_MAX_DF = _float('THEME_SIMILARITY_MAX_DF', 0.02)  # 이 비율보다 흔한 n-gram은 색인하지 않음
+
+# Gemini 키워드 확장 (카탈로그에도 없고 비슷한 테마도 없는 테마)
+KEYWORD_EXPANSION_ENABLED = _int('KEYWORD_EXPANSION_ENABLED', 1)
+KEYWORD_EXPANSION_MODEL = _str('KEYWORD_EXPANSION_MODEL', 'gemini-1.5-flash')
+KEYWORD_EXPANSION_TIMEOUT = _float('KEYWORD_EXPANSION_TIMEOUT', 1.5)  # 응답 대기 예산 (초)
+KEYWORD_EXPANSION_WORKERS = _int('KEYWORD_EXPANSION_WORKERS', 4)
+KEYWORD_EXPANSION_FAILURE_TTL = _float('KEYWORD_EXPANSION_FAILURE_TTL', 60.0)  # 실패/예산 초과 후 다시 시도하지 않는 시간 (초)
+KEYWORD_EXPANSION_MEMO_PATH = _str(
+    'KEYWORD_EXPANSION_MEMO_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'keyword_memo.sqlite3'),
+)
+
+# 좋아요 저장소
+LIKED_DB_PATH = _str(
+    'LIKED_DB_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'liked.sqlite3'),
+)
+LIKED_PAGE_SIZE = _int('LIKED_PAGE_SIZE', 20)  # 저장된 플레이리스트 한 페이지에 표시할 영상 수
+
+# 저장 목록 가져오기/내보내기 (library_io.py)
+LIBRARY_IO_BATCH_SIZE = _int('LIBRARY_IO_BATCH_SIZE', 1000)  # 저장소에서 한 번에 읽고 쓰는 영상 수 (한 트랜잭션)
+LIBRARY_IO_WORKERS = _int('LIBRARY_IO_WORKERS', 2)  # 동시에 실행할 가져오기/내보내기 작업 수
+LIBRARY_IO_POLL_SECONDS = _float('LIBRARY_IO_POLL_SECONDS', 0.5)  # 작업이 끝날 때까지 진행 상황을 다시 그리는 주기
+LIBRARY_EXPORT_DIR = _str('LIBRARY_EXPORT_DIR', os.path.join(tempfile.gettempdir(), 'playlist-exports'))
+
+# 영상 상세 정보 (videos.list) 캐시
+ENRICHMENT_TTL = _int('ENRICHMENT_TTL', 7 * 24 * 60 * 60)
+ENRICHMENT_MAX_ENTRIES = _int('ENRICHMENT_MAX_ENTRIES', 200000)
+
+# 화면 갱신
+SIDEBAR_REFRESH_SECONDS = _float('SIDEBAR_REFRESH_SECONDS', 0.0)  # 사이드바 저장 목록 주기적 갱신 (0이면 끔, 끄면 좋아요/삭제 후 다음 전체 실행 때 갱신)
+
+# 영상 카드
+VIDEO_EMBED_FACADE = _int('VIDEO_EMBED_FACADE', 1)  # 썸네일을 먼저 보여 주고 클릭하면 플레이어 로드 (0이면 바로 로드)
+VIDEO_THUMBNAIL_QUALITY = _str('VIDEO_THUMBNAIL_QUALITY', 'hqdefault')  # mqdefault, hqdefault, sddefault
+
+# API 키 (Streamlit 앱은 st.secrets 값을 사용)
+YOUTUBE_API_KEY = _str('YOUTUBE_API_KEY', '')
+GOOGLE_API_KEY = _str('GOOGLE_API_KEY', '')
+
+# 큐레이션 API 서버
+CURATION_WORKERS = _int('CURATION_WORKERS', 32)  # 검색/키워드 생성을 실행할 스레드 수
+API_HOST = _str('API_HOST', '127.0.0.1')
+API_PORT = _int('API_PORT', 8080)
+API_MAX_BODY_BYTES = _int('API_MAX_BODY_BYTES', 64 * 1024)
+API_KEEPALIVE_TIMEOUT = _float('API_KEEPALIVE_TIMEOUT', 15.0)  # 유휴 keep-alive 연결을 닫기까지 (초)
+
+# YouTube API 백엔드 (live, record, replay, synthetic; youtube_backend.py 참고)
+YOUTUBE_BACKEND = _str('YOUTUBE_BACKEND', 'live')
+YOUTUBE_FIXTURE_DIR = _str(
+    'YOUTUBE_FIXTURE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'fixtures'),
+)
+YOUTUBE_SYNTHETIC_LATENCY = _float('YOUTUBE_SYNTHETIC_LATENCY', 0.05)  # 가짜 응답 지연 (초)
+YOUTUBE_SYNTHETIC_JITTER = _float('YOUTUBE_SYNTHETIC_JITTER', 0.0)  # 지연 시간 ± 범위 (초)
+YOUTUBE_SYNTHETIC_ERROR_RATE = _float('YOUTUBE_SYNTHETIC_ERROR_RATE', 0.0)  # 오류 응답 비율
+YOUTUBE_SYNTHETIC_ERROR_STATUS = _int('YOUTUBE_SYNTHETIC_ERROR_STATUS', 500)  # 오류 응답의 HTTP 상태 코드
+YOUTUBE_SYNTHETIC_SLOW_RATE = _float('YOUTUBE_SYNTHETIC_SLOW_RATE', 0.0)  # 느린 응답 비율 (꼬리 지연)
+YOUTUBE_SYNTHETIC_SLOW_LATENCY = _float('YOUTUBE_SYNTHETIC_SLOW_LATENCY', 2.0)  # 느린 응답의 지연 시간 (초)
+YOUTUBE_SYNTHETIC_QUOTA = _int('YOUTUBE_SYNTHETIC_QUOTA', 0)  # 이 단위를 쓰면 quotaExceeded (0이면 무제한)
+YOUTUBE_SYNTHETIC_SEED = _int('YOUTUBE_SYNTHETIC_SEED', 0)
+
+# YouTube API 호출 복원력 (resilience.py)
+RESILIENCE_DEADLINE = _float('RESILIENCE_DEADLINE', 8.0)  # 호출 하나가 재시도까지 쓸 수 있는 시간 (0이면 제한 없음, 초)
+RESILIENCE_ATTEMPT_TIMEOUT = _float('RESILIENCE_ATTEMPT_TIMEOUT', 4.0)  # 시도 하나를 기다릴 최대 시간 (0이면 제한 없음, 초)
+RESILIENCE_WORKERS = _int('RESILIENCE_WORKERS', 32)  # 시도를 실행할 스레드 수
+RETRY_ATTEMPTS = _int('RETRY_ATTEMPTS', 3)  # 첫 시도를 포함한 최대 시도 수
+RETRY_BACKOFF_BASE = _float('RETRY_BACKOFF_BASE', 0.2)  # 첫 재시도 전 최대 대기 시간 (시도마다 두 배, 초)
+RETRY_BACKOFF_MAX = _float('RETRY_BACKOFF_MAX', 2.0)  # 재시도 전 대기 시간 상한 (초)
+HEDGE_METHODS = _str('HEDGE_METHODS', 'youtube.videos.list')  # hedge할 메서드 (쉼표로 구분, search.list는 hedge마다 100 단위)
+HEDGE_PERCENTILE = _float('HEDGE_PERCENTILE', 0.95)  # 최근 응답 지연 시간의 이 분위수가 지나면 hedge
+HEDGE_MIN_DELAY = _float('HEDGE_MIN_DELAY', 0.2)  # hedge 전 최소 대기 시간 (초)
+BREAKER_FAILURES = _int('BREAKER_FAILURES', 5)  # 이만큼 연속 실패하면 회로를 엶 (0이면 끔)
+BREAKER_OPEN_SECONDS = _float('BREAKER_OPEN_SECONDS', 30.0)  # 회로를 열어 두는 시간 (초)
+
+# 성능 추적 (tracing.py)
+TRACING_ENABLED = _int('TRACING_ENABLED', 0)
+TRACING_BUFFER_SIZE = _int('TRACING_BUFFER_SIZE', 20000)  # 메모리에 보관할 최근 span 수
+TRACING_LOG_PATH = _str('TRACING_LOG_PATH', '')  # span을 JSON lines로 덧붙여 쓸 파일 (비우면 쓰지 않음)
+TRACING_METRICS_PORT = _int('TRACING_METRICS_PORT', 0)  # Streamlit 앱 프로세스의 /metrics 포트 (0이면 끔)
+
+# 레플리카 공유 캐시 (shared_cache.py)
+SHARED_CACHE_URL = _str('SHARED_CACHE_URL', '')  # sqlite:////공유볼륨/경로 또는 redis://호스트:포트/DB (비우면 끔)
+SHARED_CACHE_SEARCH_TTL = _int('SHARED_CACHE_SEARCH_TTL', SEARCH_CACHE_TTL)
+SHARED_CACHE_DETAILS_TTL = _int('SHARED_CACHE_DETAILS_TTL', ENRICHMENT_TTL)
+SHARED_CACHE_LEASE_SECONDS = _float('SHARED_CACHE_LEASE_SECONDS', 10.0)  # 다른 레플리카의 갱신을 기다리는 최대 시간
+SHARED_CACHE_USER_WAIT = _float('SHARED_CACHE_USER_WAIT', 1.0)  # 사용자 요청이 기다리는 최대 시간 (지나면 직접 가져옴)
+SHARED_CACHE_LEASE_POLL = _float('SHARED_CACHE_LEASE_POLL', 0.05)  # 기다리는 동안 확인 간격 (초)
+SHARED_CACHE_TIMEOUT = _float('SHARED_CACHE_TIMEOUT', 0.5)  # Redis 연결/응답 시간 제한 (초)
+SHARED_CACHE_RETRY_SECONDS = _float('SHARED_CACHE_RETRY_SECONDS', 5.0)  # 오류 후 공유 캐시를 건너뛰는 시간
+SHARED_CACHE_COMPRESS_MIN_BYTES = _int('SHARED_CACHE_COMPRESS_MIN_BYTES', 512)  # 이보다 큰 값은 zlib 압축
+
+# 키워드 사용 기록 (usage_log.py)
+USAGE_LOG_ENABLED = _int('USAGE_LOG_ENABLED', 1)
+USAGE_DB_PATH = _str(
+    'USAGE_DB_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'usage.sqlite3'),
+)
+
+# 캐시 warm-up 작업 (warmup.py)
+WARMUP_QUOTA_BUDGET = _int('WARMUP_QUOTA_BUDGET', 3000)  # 한 번 실행에서 쓸 수 있는 최대 할당량 단위 (별도 프로세스에서는 유일한 한도)
+WARMUP_CONCURRENCY = _int('WARMUP_CONCURRENCY', 4)  # 동시에 가져올 검색 수
+WARMUP_TOP_KEYWORDS = _int('WARMUP_TOP_KEYWORDS', 30)  # 사용 기록에서 가져올 인기 키워드 수
+WARMUP_USAGE_DAYS = _int('WARMUP_USAGE_DAYS', 7)  # 인기 키워드를 집계할 기간 (일)
+WARMUP_REFRESH_WINDOW = _int('WARMUP_REFRESH_WINDOW', 600)  # 신선한 기간이 이보다 적게 남은 항목만 다시 가져옴 (초)
+WARMUP_MAX_WAIT = _float('WARMUP_MAX_WAIT', 120.0)  # 분당 한도에 걸렸을 때 최대 대기 시간 (배치 작업이라 길게, 초)
+
+# 로컬 영상 카탈로그 (video_catalog.py)
+CATALOG_ENABLED = _int('CATALOG_ENABLED', 1)  # 키워드 검색을 카탈로그에서 먼저 찾음 (0이면 항상 API 검색)
+CATALOG_DIR = _str('CATALOG_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'catalog'))
+CATALOG_MIN_RESULTS = _int('CATALOG_MIN_RESULTS', 20)  # 카탈로그 결과가 이보다 적으면 API로 검색해서 채움
+CATALOG_PAGE_SIZE = _int('CATALOG_PAGE_SIZE', 100)  # 카탈로그 검색 한 번에 가져올 최대 후보 수
+CATALOG_FLUSH_RECORDS = _int('CATALOG_FLUSH_RECORDS', 1000)  # 메모리 레코드가 이만큼 모이면 세그먼트 파일로 씀
@@ -0,0 +1,318 @@
+# 플레이리스트 큐레이션 핵심 로직
+# 테마 분류 → 키워드 생성 → 키워드별 검색 → 영상 선택을 Streamlit 없이 수행한다.
+# 오류는 화면에 표시하지 않고 CurationError(code, message)로 올려 보내므로,
+# Streamlit 앱과 API 서버(api_server.py)가 같은 로직을 쓰고 각자 알맞게 표시한다.
+import asyncio
+import contextvars
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from googleapiclient.errors import HttpError
+
+import config
+import keyword_expansion
+import keyword_index
+import prefetch
+import quota
+import ranking
+import resilience
+import theme_similarity
+import tracing
+import video_catalog
+import youtube_backend
+import youtube_client
+from pagination import KeywordCursor
+from video_record import VideoRecord
+from search_cache import SearchCache, search_cache, search_key
+
+logger = logging.getLogger(__name__)
+
+QUOTA_MESSAGE = "오늘 사용할 수 있는 YouTube 검색량을 모두 사용했습니다. 잠시 후 다시 시도해 주세요."
+UNAVAILABLE_MESSAGE = "YouTube 검색이 잠시 원활하지 않습니다. 잠시 후 다시 시도해 주세요."
+
+
+# 호출자에게 돌려줄 구조화된 오류
+# code: missing_api_key, quota_exhausted, youtube_unavailable, youtube_error, internal_error
+class CurationError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+    def to_dict(self):
+        return {'code': self.code, 'message': self.message}
+
+
+# 외부 API 오류를 CurationError로 변환
+@contextmanager
+def translate_errors():
+    try:
+        yield
+    except CurationError:
+        raise
+    except quota.QuotaExhausted as e:
+        raise CurationError('quota_exhausted', QUOTA_MESSAGE) from e
+    except resilience.UpstreamUnavailable as e:
+        raise CurationError('youtube_unavailable', UNAVAILABLE_MESSAGE) from e
+    except HttpError as e:
+        raise CurationError('youtube_error', f"YouTube API 오류: {str(e)}") from e
+    except Exception as e:
+        logger.exception("큐레이션 처리 중 오류")
+        raise CurationError('internal_error', f"예상치 못한 오류 발생: {str(e)}") from e
+
+
+_youtube = None
+
+
+# API 키 설정 (None이면 같은 이름의 환경 변수 값 사용)
+# Gemini 키가 있으면 키워드 확장 클라이언트도 설정한다
+def configure(youtube_api_key=None, google_api_key=None):
+    global _youtube
+    youtube_api_key = config.YOUTUBE_API_KEY if youtube_api_key is None else youtube_api_key
+    google_api_key = config.GOOGLE_API_KEY if google_api_key is None else google_api_key
+    if not youtube_api_key and not youtube_backend.is_offline(config.YOUTUBE_BACKEND):
+        raise CurationError('missing_api_key', "YouTube API 키가 설정되지 않았습니다")
+    _youtube = youtube_client.get_client(youtube_api_key)
+    if google_api_key:
+        keyword_expansion.configure(google_api_key)
+
+
+# 테스트나 벤치마크에서 사용할 YouTube 클라이언트 지정
+# (search().list(...)와 videos().list(...)가 methodId와 execute(http=...)를 가진 요청을 반환)
+def set_youtube_client(client):
+    global _youtube
+    _youtube = client
+
+
+def get_youtube():
+    if _youtube is None:
+        configure()
+    return _youtube
+
+
+# 테마 분류 (입력에서 조사 제거)
+THEME_PARTICLES = re.compile('할 때|에서|에|을|를')
+
+
+def classify_theme(user_input):
+    return THEME_PARTICLES.sub('', user_input).strip()
+
+
+# 테마별 키워드 생성 (추적 span에 어느 경로에서 만들었는지 기록)
+def generate_keywords(theme):
+    with tracing.span('curation.generate_keywords') as span:
+        # 카탈로그에서 가장 길게 일치하는 테마의 키워드 (인덱스는 프로세스당 한 번만 로드)
+        index = keyword_index.get_index()
+        keywords = index.lookup(theme)
+        if keywords:
+            span.set('source', 'catalog')
+            return keywords
+
+        # 비슷한 테마들의 키워드를 섞어서 사용 (1ms 미만이므로 모델 호출보다 먼저)
+        keywords = theme_similarity.similar_keywords(theme)
+        if keywords:
+            span.set('source', 'similar')
+            return keywords
+
+        # 비슷한 테마도 없으면 Gemini로 확장 (시간 예산을 넘기면 기본 키워드 사용)
+        if config.KEYWORD_EXPANSION_ENABLED:
+            keywords = keyword_expansion.expand_keywords(theme)
+            if keywords:
+                span.set('source', 'expansion')
+                return keywords
+
+        # 비슷한 테마도 없는 경우, 일반적인 분위기 키워드 반환
+        span.set('source', 'default')
+        return index.default_keywords
+
+
+# YouTube 검색 API 호출 (순위에 필요한 필드만 남겨서 캐시 메모리를 줄임)
+def fetch_search_page(youtube, keyword, max_results, page_token=None, priority=quota.PRIORITY_USER):
+    search_response = youtube_client.execute(youtube.search().list(
+        q=f"playlist 음악 {keyword}",
+        part='snippet',
+        maxResults=max_results * 4,  # 더 많은 결과를 가져와서 필터링
+        type='video',
+        videoEmbeddable='true',
+        videoDuration='medium',
+        pageToken=page_token
+    ), priority)
+    items = [
+        {
+            'id': item['id']['videoId'],
+            'title': item['snippet']['title'],
+            'channel': item['snippet']['channelTitle'],
+        }
+        for item in search_response.get('items', [])
+    ]
+    # 후보를 videos.list 한 번으로 보강하고 점수 순으로 정렬해서 캐시에 저장
+    items = ranking.rank_items(ranking.enrich_items(youtube, items, priority))
+    # 가져온 결과는 로컬 카탈로그에도 넣어서 다음 검색은 할당량 없이 처리한다
+    if config.CATALOG_ENABLED:
+        try:
+            video_catalog.get_catalog().add_search_page(keyword, items)
+        except OSError:
+            logger.warning("카탈로그에 검색 결과 추가 실패: %s", keyword, exc_info=True)
+    return {
+        'items': items,
+        'next_page_token': search_response.get('nextPageToken'),
+    }
+
+
+# 검색 캐시 키와 loader (prefetch와 검색이 같은 키를 사용)
+def search_request(youtube, keyword, max_results=5, page_token=None, priority=quota.PRIORITY_USER):
+    return (
+        search_key(keyword, max_results * 4, page_token=page_token),
+        lambda: fetch_search_page(youtube, keyword, max_results, page_token, priority)
+    )
+
+
+# 카탈로그 페이지 다음에 이어지는 API 검색 첫 페이지의 토큰
+CATALOG_NEXT_PAGE = 'catalog:api'
+
+# 카탈로그 검색 페이지 메모 (키에 카탈로그 version이 들어가므로 레코드가 추가되면 다시 검색한다)
+catalog_pages = SearchCache(ttl=config.SEARCH_CACHE_TTL, max_entries=config.SEARCH_CACHE_MAX_ENTRIES)
+
+
+def _search_catalog(catalog, keyword, max_results, min_results=None):
+    with tracing.span('curation.catalog_search') as span:
+        items = catalog.search(keyword, max(config.CATALOG_PAGE_SIZE, max_results * 4))
+        span.set('results', len(items))
+        if min_results is None:
+            min_results = max(config.CATALOG_MIN_RESULTS, max_results)
+        if not items or len(items) < min_results:
+            return None
+        return {'items': ranking.rank_items(items), 'next_page_token': CATALOG_NEXT_PAGE}
+
+
+# 로컬 카탈로그에서 만든 검색 페이지 (결과가 CATALOG_MIN_RESULTS보다 적으면 None → API 검색)
+# 카탈로그에서 찾은 후보를 모두 한 페이지로 주고, 다음 페이지(CATALOG_NEXT_PAGE)는 API 검색의 첫 페이지다
+def catalog_page(keyword, max_results=5):
+    if not config.CATALOG_ENABLED:
+        return None
+    catalog = video_catalog.get_catalog()
+    key = (search_key(keyword, max_results * 4), catalog.version)
+    return catalog_pages.get_or_load(key, lambda: _search_catalog(catalog, keyword, max_results))
+
+
+# upstream에 문제가 있을 때 대신 보여 줄 마지막 결과
+# 만료된 캐시 항목, 없으면 (첫 페이지라면) 결과가 적더라도 카탈로그 검색 결과. 다음 페이지는 없다
+def _fallback_page(key, keyword, max_results, first_page):
+    page = search_cache.peek(key, allow_expired=True)
+    if page is None and first_page and config.CATALOG_ENABLED:
+        page = _search_catalog(video_catalog.get_catalog(), keyword, max_results, min_results=1)
+        if page is not None:
+            page = {**page, 'next_page_token': None}
+    return page
+
+
+# 카탈로그 → 캐시 순서로 검색 페이지 가져오기
+# 할당량이 부족하거나 upstream이 응답하지 않으면 (재시도 소진, 회로 열림) 남아 있는 결과를 대신 반환한다
+def load_search_page(youtube, keyword, max_results=5, page_token=None, priority=quota.PRIORITY_USER):
+    first_page = page_token is None or page_token == CATALOG_NEXT_PAGE
+    if page_token is None:
+        page = catalog_page(keyword, max_results)
+        if page is not None:
+            return page
+    elif page_token == CATALOG_NEXT_PAGE:
+        page_token = None
+    key, loader = search_request(youtube, keyword, max_results, page_token, priority)
+    try:
+        return search_cache.get_or_load(key, loader, priority)
+    except (quota.QuotaExhausted, resilience.UpstreamUnavailable) as e:
+        with tracing.span('curation.fallback', reason=type(e).__name__) as span:
+            page = _fallback_page(key, keyword, max_results, first_page)
+            span.set('served', page is not None)
+        if page is None:
+            raise
+        return page
+
+
+# 키워드 검색을 백그라운드에서 미리 실행하고 사용한 할당량 단위를 반환
+def prefetch_keywords(keywords, max_units):
+    if max_units <= 0:
+        return 0
+    youtube = get_youtube()
+    requests = [
+        search_request(youtube, keyword, priority=quota.PRIORITY_PREFETCH)
+        for keyword in keywords
+        if catalog_page(keyword) is None
+    ]
+    return prefetch.prefetch_searches(requests, max_units)
+
+
+# 검색 결과에서 보여줄 영상 선택 (페이지 항목은 이미 점수 순으로 정렬되어 있음)
+def select_videos(items, keyword, max_results, exclude_ids):
+    videos = []
+
+    for item in items:
+        if len(videos) >= max_results:
+            break
+
+        video_id = item['id']
+        # 이미 표시된 비디오는 제외
+        if video_id in exclude_ids:
+            continue
+
+        videos.append(VideoRecord(video_id, item['title'], item['channel'], keyword))
+
+    return videos
+
+
+# 키워드의 영상 검색 (같은 검색 조건은 모든 호출자가 캐시를 공유하고, 동시 요청은 한 번만 호출)
+def search_videos(keyword, max_results=5, exclude_ids=None):
+    with translate_errors():
+        page = load_search_page(get_youtube(), keyword, max_results)
+        return select_videos(page['items'], keyword, max_results, set(exclude_ids or ()))
+
+
+# 키워드의 페이지 커서 (다음 페이지 미리 받기는 사용자 요청보다 낮은 우선순위로 처리)
+def new_cursor(keyword, max_results=5):
+    youtube = get_youtube()
+    return KeywordCursor(
+        lambda page_token, background: load_search_page(
+            youtube, keyword, max_results, page_token,
+            quota.PRIORITY_PREFETCH if background else quota.PRIORITY_USER
+        )
+    )
+
+
+# 커서에서 아직 보지 않은 다음 영상
+def next_videos(cursor, keyword, max_results=5):
+    with translate_errors():
+        return cursor.take(
+            max_results,
+            lambda items, count, seen: select_videos(items, keyword, count, seen)
+        )
+
+
+# 키워드 하나의 검색 결과 (오류는 예외 대신 결과에 담는다)
+def search_result(keyword, max_results=5):
+    try:
+        return {'keyword': keyword, 'videos': search_videos(keyword, max_results)}
+    except CurationError as e:
+        return {'keyword': keyword, 'error': e.to_dict()}
+
+
+_executor = ThreadPoolExecutor(max_workers=config.CURATION_WORKERS, thread_name_prefix='curation')
+
+
+# 블로킹 함수를 큐레이션 스레드 풀에서 실행 (이벤트 루프를 막지 않도록)
+# 추적 span이 요청 ID를 이어받도록 현재 context를 함께 넘긴다
+async def run_blocking(fn, *args):
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(_executor, context.run, fn, *args)
+
+
+# 테마 하나를 큐레이션: 키워드를 만들고 키워드별 검색을 동시에 실행한다
+# 키워드 검색 하나가 실패해도 나머지 결과는 그대로 반환한다
+async def curate(theme, max_results=5, keyword_count=5):
+    theme = classify_theme(theme)
+    keywords = (await run_blocking(generate_keywords, theme))[:keyword_count]
+    results = await asyncio.gather(*(
+        run_blocking(search_result, keyword, max_results)
+        for keyword in keywords
+    ))
+    return {'theme': theme, 'keywords': keywords, 'results': results}
@@ -0,0 +1,77 @@
+# 영상 카드 HTML
+# 카드마다 YouTube 플레이어를 바로 띄우지 않고 썸네일만 있는 가벼운 facade를 보여 준다.
+# facade를 누르면 그리드 컴포넌트가 그 자리에 실제 플레이어(autoplay)를 넣는다.
+# 썸네일은 loading="lazy"라서 화면 밖 카드는 스크롤해서 가까워질 때까지 받지 않는다.
+# 카드 템플릿은 모듈을 불러올 때 한 번만 만들고, 같은 영상의 카드 HTML은 캐시해서 재사용한다.
+import html
+from functools import lru_cache
+from string import Template
+
+import config
+from video_record import VideoRecord
+
+PLAYER_ALLOW = "accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture"
+
+PLAYER_TEMPLATE = Template(
+    '<iframe src="$src" title="$title" frameborder="0" allow="$allow" allowfullscreen></iframe>'
+)
+FACADE_TEMPLATE = Template(
+    '<button class="facade" data-src="$autoplay_src" title="$title">'
+    '<img src="$thumbnail" alt="$title" loading="lazy"><span>▶</span></button>'
+)
+# 좋아요/삭제 버튼의 모양은 그리드 컴포넌트가 채운다
+CARD_TEMPLATE = Template(
+    '<div class="video-card">'
+    '<div class="iframe-container">$player</div>'
+    '<div class="video-info"><div>'
+    '<div class="video-title">$title</div>'
+    '<div class="channel-name">$channel</div>'
+    '</div>'
+    '<button class="card-action" data-id="$id"></button>'
+    '</div>'
+    '</div>'
+)
+
+
+def embed_url(video_id, autoplay=False):
+    url = f"https://www.youtube.com/embed/{video_id}"
+    return f"{url}?autoplay=1" if autoplay else url
+
+
+def thumbnail_url(video_id):
+    return f"https://i.ytimg.com/vi/{video_id}/{config.VIDEO_THUMBNAIL_QUALITY}.jpg"
+
+
+# 카드의 플레이어 영역 (facade 또는 바로 로드하는 플레이어)
+def player_html(video, facade=None):
+    facade = config.VIDEO_EMBED_FACADE if facade is None else facade
+    title = html.escape(video.title)
+    if not facade:
+        return PLAYER_TEMPLATE.substitute(src=embed_url(video.id), title=title, allow=PLAYER_ALLOW)
+    return FACADE_TEMPLATE.substitute(
+        autoplay_src=embed_url(video.id, autoplay=True),
+        title=title,
+        thumbnail=thumbnail_url(video.id),
+    )
+
+
+@lru_cache(maxsize=4096)
+def _card_html(video_id, title, channel, facade):
+    video = VideoRecord(video_id, title, channel, '')
+    return CARD_TEMPLATE.substitute(
+        player=player_html(video, facade),
+        title=html.escape(title),
+        channel=html.escape(channel),
+        id=html.escape(video_id),
+    )
+
+
+# 영상 카드 전체 HTML
+def video_card_html(video, facade=None):
+    facade = config.VIDEO_EMBED_FACADE if facade is None else facade
+    return _card_html(video.id, video.title, video.channel, bool(facade))
+
+
+# 여러 카드를 한 번에 (그리드 컴포넌트에 보내는 payload)
+def cards_html(videos, facade=None):
+    return ''.join(video_card_html(video, facade) for video in videos)
@@ -0,0 +1,196 @@
+# Gemini 키워드 확장
+# 카탈로그에도 없고 비슷한 테마도 없는 테마를 Gemini로 키워드 목록으로 확장한다.
+# - 클라이언트 설정은 프로세스당 한 번만 한다
+# - 결과는 정규화된 테마를 키로 SQLite에 저장해서 재시작 후에도 재사용한다
+# - 응답이 latency 예산을 넘으면 None을 반환하고 (호출자가 기본 키워드 사용),
+#   진행 중인 요청은 끝까지 실행해서 다음 요청부터 저장된 결과를 쓴다
+# - 같은 테마에 대한 동시 요청은 하나의 모델 호출로 합친다
+# - 실패하거나 예산을 넘긴 테마는 KEYWORD_EXPANSION_FAILURE_TTL 동안 다시 기다리지 않는다
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import config
+import keyword_index
+
+logger = logging.getLogger(__name__)
+
+PROMPT = (
+    "'{theme}' 상황이나 분위기에 어울리는 음악을 유튜브에서 찾기 위한 검색 키워드 {count}개를 "
+    "쉼표로 구분해서 한 줄로만 답해 주세요. 각 키워드는 한두 단어로 해 주세요."
+)
+
+_lock = threading.Lock()
+_db_lock = threading.Lock()  # SQLite 읽기/쓰기는 _lock 밖에서 (디스크 I/O 동안 통계와 진행 중 목록을 막지 않음)
+_configured_key = None
+_model = None
+_memo = {}
+_failed = {}  # 테마 -> 다시 시도할 수 있는 시각 (monotonic)
+_db = None
+_in_flight = {}
+_executor = ThreadPoolExecutor(max_workers=config.KEYWORD_EXPANSION_WORKERS, thread_name_prefix='genai')
+_stats = {'memo_hits': 0, 'calls': 0, 'coalesced': 0, 'timeouts': 0, 'errors': 0, 'failure_hits': 0}
+
+
+# Gemini 클라이언트 설정 (같은 키로 다시 호출하면 아무 것도 하지 않음)
+# 키만 기억하고 SDK는 처음 모델이 필요할 때 불러온다 (import에 0.5초 이상 걸려 첫 화면이 늦어지므로)
+def configure(api_key):
+    global _configured_key, _model
+    if api_key == _configured_key:
+        return
+    with _lock:
+        if api_key != _configured_key:
+            _configured_key = api_key
+            _model = None
+
+
+# 테스트나 로컬 실행에서 사용할 모델 지정 (generate_content(prompt).text 를 제공하는 객체)
+def set_model(model):
+    global _model
+    with _lock:
+        _model = model
+
+
+def _get_model():
+    global _model
+    with _lock:
+        if _model is None:
+            import google.generativeai as genai
+            genai.configure(api_key=_configured_key)
+            _model = genai.GenerativeModel(config.KEYWORD_EXPANSION_MODEL)
+        return _model
+
+
+# _db_lock을 잡은 상태에서 호출
+def _open_db():
+    global _db
+    if _db is None:
+        directory = os.path.dirname(config.KEYWORD_EXPANSION_MEMO_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        _db = sqlite3.connect(config.KEYWORD_EXPANSION_MEMO_PATH, check_same_thread=False)
+        _db.execute(
+            "CREATE TABLE IF NOT EXISTS keyword_memo ("
+            " theme TEXT PRIMARY KEY, keywords TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        _db.commit()
+    return _db
+
+
+def _memo_get(theme):
+    with _lock:
+        keywords = _memo.get(theme)
+    if keywords is not None:
+        return keywords
+    with _db_lock:
+        row = _open_db().execute("SELECT keywords FROM keyword_memo WHERE theme = ?", (theme,)).fetchone()
+    if row is None:
+        return None
+    keywords = json.loads(row[0])
+    with _lock:
+        _memo[theme] = keywords
+    return keywords
+
+
+def _memo_put(theme, keywords):
+    with _lock:
+        _memo[theme] = keywords
+        _failed.pop(theme, None)
+    with _db_lock:
+        db = _open_db()
+        db.execute(
+            "INSERT OR REPLACE INTO keyword_memo (theme, keywords, created_at) VALUES (?, ?, ?)",
+            (theme, json.dumps(keywords, ensure_ascii=False), time.time()),
+        )
+        db.commit()
+
+
+# _lock을 잡은 상태에서 호출
+def _remember_failure(theme):
+    _failed[theme] = time.monotonic() + config.KEYWORD_EXPANSION_FAILURE_TTL
+
+
+# 모델 응답에서 키워드 목록 추출 ("1. 비오는날, #감성" 같은 형식도 처리)
+def parse_keywords(text, count):
+    keywords = []
+    for part in re.split(r'[,\n、]', text or ''):
+        keyword = re.sub(r'^\s*(?:\d+[.)]\s*|[-*•]\s*)', '', part).strip().strip('#"\'').strip()
+        if keyword and keyword not in keywords:
+            keywords.append(keyword)
+        if len(keywords) >= count:
+            break
+    return keywords
+
+
+def _generate(theme, count):
+    try:
+        with _lock:
+            _stats['calls'] += 1
+        response = _get_model().generate_content(PROMPT.format(theme=theme, count=count))
+        keywords = parse_keywords(response.text, count)
+        if keywords:
+            _memo_put(theme, keywords)
+        else:
+            with _lock:
+                _remember_failure(theme)
+        return keywords or None
+    except Exception:
+        with _lock:
+            _stats['errors'] += 1
+            _remember_failure(theme)
+        logger.warning("Gemini 키워드 확장 실패: %s", theme, exc_info=True)
+        return None
+    finally:
+        with _lock:
+            _in_flight.pop(theme, None)
+
+
+# 테마를 키워드 목록으로 확장. 예산 안에 답을 얻지 못하면 None
+def expand_keywords(theme, count=5, timeout=None):
+    timeout = config.KEYWORD_EXPANSION_TIMEOUT if timeout is None else timeout
+    if _configured_key is None and _model is None:
+        return None
+    key = keyword_index.normalize_theme(theme)
+    if not key:
+        return None
+
+    keywords = _memo_get(key)
+    if keywords is not None:
+        with _lock:
+            _stats['memo_hits'] += 1
+        return keywords[:count]
+
+    with _lock:
+        # 최근에 실패했거나 예산을 넘긴 테마는 기다리지 않음
+        if _failed.get(key, 0) > time.monotonic():
+            _stats['failure_hits'] += 1
+            return None
+        _failed.pop(key, None)
+        future = _in_flight.get(key)
+        if future is None:
+            future = _in_flight[key] = _executor.submit(_generate, key, count)
+        else:
+            _stats['coalesced'] += 1
+    try:
+        return future.result(timeout=timeout)
+    except TimeoutError:
+        with _lock:
+            _stats['timeouts'] += 1
+            # 진행 중인 호출이 끝나서 저장되면 _memo_put이 지운다
+            if key not in _memo:
+                _remember_failure(key)
+        return None
+
+
+def get_stats():
+    with _lock:
+        stats = dict(_stats)
+        stats['memo_size'] = len(_memo)
+        stats['failed'] = len(_failed)
+        stats['in_flight'] = len(_in_flight)
+    return stats
@@ -0,0 +1,114 @@
+# 테마 → 키워드 인덱스
+# 테마 카탈로그(data/keywords.json)를 프로세스당 한 번 읽어서 Aho–Corasick 자동자로 만든다.
+# 입력 길이에 비례하는 시간에 가장 긴 테마를 찾으므로 '비'보다 '비 오는 날'이 먼저 선택된다.
+import json
+import re
+import threading
+from collections import deque
+
+import config
+
+# 테마 입력에서 제거할 조사/수식어 (한 번의 정규식 치환으로 처리)
+_THEME_NOISE = re.compile('할 때|에서|에|을|를|듣기 좋은|노래')
+
+
+def normalize_theme(theme):
+    return _THEME_NOISE.sub('', theme).strip()
+
+
+class KeywordIndex:
+    def __init__(self, themes, default_keywords):
+        self.default_keywords = list(default_keywords)
+        # 노드별 자식, 실패 링크, 해당 노드에서 끝나는 가장 긴 테마
+        self._children = [{}]
+        self._fail = [0]
+        self._output = [None]
+        self._keywords = {}
+        for theme, keywords in themes.items():
+            # 카탈로그 키도 입력과 같은 방식으로 정규화 ('운동할 때' → '운동'), 먼저 나온 항목 우선
+            key = normalize_theme(theme)
+            if key and key not in self._keywords:
+                self._keywords[key] = list(keywords)
+                self._insert(key)
+        self._build_links()
+
+    def __len__(self):
+        return len(self._keywords)
+
+    def _insert(self, key):
+        node = 0
+        for ch in key:
+            nxt = self._children[node].get(ch)
+            if nxt is None:
+                nxt = len(self._children)
+                self._children[node][ch] = nxt
+                self._children.append({})
+                self._fail.append(0)
+                self._output.append(None)
+            node = nxt
+        self._output[node] = key
+
+    # BFS로 실패 링크를 만들고, 각 노드의 출력을 실패 링크를 따라 가장 긴 테마로 채운다
+    def _build_links(self):
+        queue = deque(self._children[0].values())
+        while queue:
+            node = queue.popleft()
+            fallback = self._output[self._fail[node]]
+            if fallback is not None and (self._output[node] is None or len(fallback) > len(self._output[node])):
+                self._output[node] = fallback
+            for ch, child in self._children[node].items():
+                state = self._fail[node]
+                while state and ch not in self._children[state]:
+                    state = self._fail[state]
+                target = self._children[state].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                queue.append(child)
+
+    # 정규화된 텍스트에서 가장 긴 테마 찾기 (길이가 같으면 앞쪽 우선)
+    def longest_match(self, text):
+        children = self._children
+        fail = self._fail
+        output = self._output
+        node = 0
+        best = None
+        for ch in text:
+            while node and ch not in children[node]:
+                node = fail[node]
+            node = children[node].get(ch, 0)
+            found = output[node]
+            if found is not None and (best is None or len(found) > len(best)):
+                best = found
+        return best
+
+    # 테마에 맞는 키워드 목록 (일치하는 테마가 없으면 None)
+    def lookup(self, theme):
+        key = self.longest_match(normalize_theme(theme))
+        if key is None:
+            return None
+        return self._keywords[key]
+
+    def themes(self):
+        return self._keywords.keys()
+
+    def keywords_for(self, key):
+        return self._keywords.get(key, [])
+
+
+def load_index(path):
+    with open(path, encoding='utf-8') as f:
+        catalog = json.load(f)
+    return KeywordIndex(catalog['themes'], catalog['default'])
+
+
+_lock = threading.Lock()
+_index = None
+
+
+# 프로세스 전체에서 공유하는 인덱스 (처음 사용할 때 한 번만 로드)
+def get_index():
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index = load_index(config.KEYWORD_CATALOG_PATH)
+    return _index
@@ -0,0 +1,403 @@
+# 저장 목록(좋아요 라이브러리) 가져오기/내보내기
+# 전체 라이브러리나 키워드 플레이리스트 하나를 JSONL, M3U, URL 목록으로 내보내고 같은 형식을 다시 가져온다.
+# 모든 단계가 제너레이터로 이어지므로 라이브러리 크기와 관계없이 메모리 사용량이 일정하다.
+# - 내보내기: 저장소를 배치 단위로 읽기 (liked_store.iter_videos) → 형식별 줄 → 64KB 단위 bytes 조각 → 파일
+# - 가져오기: 파일 줄 → 형식별 파싱과 검증 → 배치 단위 중복 제거 → 한 트랜잭션으로 저장 (liked_store.like_many)
+#   파일 안의 중복과 이미 저장된 영상은 저장소의 (user, video) 기본 키로 걸러지므로 전체 ID 집합을 들고 있지 않는다
+# Streamlit 앱은 start_export / start_import로 작업을 백그라운드 스레드에서 실행하고 진행 상황만 확인한다.
+#
+#   python library_io.py export --user USER_ID --format m3u --keyword 빗소리 -o rain.m3u
+#   python library_io.py import --user USER_ID library.jsonl
+import argparse
+import io
+import itertools
+import json
+import math
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+import liked_store
+from video_record import VideoRecord
+
+FORMATS = ('jsonl', 'm3u', 'urls')
+EXTENSIONS = {'jsonl': 'jsonl', 'm3u': 'm3u8', 'urls': 'txt'}
+MIME_TYPES = {'jsonl': 'application/x-ndjson', 'm3u': 'audio/x-mpegurl', 'urls': 'text/plain'}
+IMPORT_EXTENSIONS = ('jsonl', 'json', 'm3u', 'm3u8', 'txt')
+CHUNK_BYTES = 64 * 1024
+MAX_REPORTED_ERRORS = 20
+MAX_TEXT_LENGTH = 500
+DEFAULT_IMPORT_KEYWORD = "가져온 영상"
+WATCH_URL = "https://www.youtube.com/watch?v={}"
+
+_VIDEO_ID = re.compile(r'^[A-Za-z0-9_-]{11}$')
+_URL_VIDEO_ID = re.compile(
+    r'(?:youtube(?:-nocookie)?\.com/(?:watch\?(?:[^#\s]*&)?v=|embed/|shorts/|live/|v/)|youtu\.be/)([A-Za-z0-9_-]{11})'
+)
+
+_executor = ThreadPoolExecutor(max_workers=config.LIBRARY_IO_WORKERS, thread_name_prefix='library-io')
+
+
+# ---- 내보내기 ----
+
+def jsonl_lines(videos):
+    for video in videos:
+        yield json.dumps({
+            'id': video.id,
+            'title': video.title,
+            'channel': video.channel,
+            'keyword': video.keyword,
+            'liked_at': video.liked_at,
+            'url': WATCH_URL.format(video.id),
+        }, ensure_ascii=False) + '\n'
+
+
+# 확장 M3U: 키워드는 #EXTGRP, 채널과 제목은 #EXTINF로 (가져올 때 그대로 복원)
+def m3u_lines(videos, playlist=None):
+    yield '#EXTM3U\n'
+    if playlist:
+        yield f"#PLAYLIST:{_one_line(playlist)}\n"
+    keyword = None
+    for video in videos:
+        if video.keyword != keyword:
+            keyword = video.keyword
+            yield f"#EXTGRP:{_one_line(keyword)}\n"
+        yield f"#EXTINF:-1,{_one_line(video.channel)} - {_one_line(video.title)}\n"
+        yield WATCH_URL.format(video.id) + '\n'
+
+
+def url_lines(videos):
+    for video in videos:
+        yield WATCH_URL.format(video.id) + '\n'
+
+
+def _one_line(text):
+    return ' '.join(str(text).split())
+
+
+def export_lines(videos, fmt, playlist=None):
+    if fmt == 'jsonl':
+        return jsonl_lines(videos)
+    if fmt == 'm3u':
+        return m3u_lines(videos, playlist)
+    if fmt == 'urls':
+        return url_lines(videos)
+    raise ValueError(f"지원하지 않는 형식입니다: {fmt} ({', '.join(FORMATS)} 중 하나)")
+
+
+# 줄을 모아 chunk_bytes 정도의 UTF-8 bytes 조각으로
+def encode_chunks(lines, chunk_bytes=CHUNK_BYTES):
+    parts = []
+    size = 0
+    for line in lines:
+        parts.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield ''.join(parts).encode('utf-8')
+            parts = []
+            size = 0
+    if parts:
+        yield ''.join(parts).encode('utf-8')
+
+
+# 지나가는 항목 수를 progress['items']에 센다
+def _counted(items, progress):
+    for item in items:
+        progress['items'] += 1
+        yield item
+
+
+# 사용자의 저장 목록(keyword가 있으면 그 플레이리스트)을 bytes 조각으로 내보낸다
+def export_chunks(store, user_id, fmt, keyword=None, progress=None, batch_size=None):
+    batch_size = config.LIBRARY_IO_BATCH_SIZE if batch_size is None else batch_size
+    videos = store.iter_videos(user_id, keyword, batch_size)
+    if progress is not None:
+        videos = _counted(videos, progress)
+    return encode_chunks(export_lines(videos, fmt, playlist=keyword))
+
+
+def export_to_file(store, user_id, path, fmt, keyword=None, progress=None, batch_size=None):
+    progress = {'items': 0} if progress is None else progress
+    started = time.perf_counter()
+    written = 0
+    with open(path, 'wb') as f:
+        for chunk in export_chunks(store, user_id, fmt, keyword, progress, batch_size):
+            f.write(chunk)
+            written += len(chunk)
+    return {
+        'path': path,
+        'items': progress['items'],
+        'bytes': written,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def export_file_name(fmt, keyword=None):
+    name = re.sub(r'[\\/:*?"<>|\s]+', '_', keyword).strip('_') if keyword else 'liked'
+    return f"{name or 'liked'}.{EXTENSIONS[fmt]}"
+
+
+# ---- 가져오기 ----
+
+def video_id_from(text):
+    text = text.strip()
+    if _VIDEO_ID.match(text):
+        return text
+    match = _URL_VIDEO_ID.search(text)
+    return match.group(1) if match else None
+
+
+def _url_video_id(line):
+    video_id = video_id_from(line)
+    if video_id is None:
+        raise ValueError(f"YouTube 영상 주소가 아닙니다: {line[:80]}")
+    return video_id
+
+
+# 첫 줄로 형식 추측
+def detect_format(first_line, name=None):
+    stripped = first_line.lstrip('\ufeff').strip()
+    if stripped.startswith('{'):
+        return 'jsonl'
+    if stripped.upper().startswith('#EXTM3U'):
+        return 'm3u'
+    extension = os.path.splitext(name or '')[1].lower().lstrip('.')
+    if extension in ('jsonl', 'json'):
+        return 'jsonl'
+    if extension in ('m3u', 'm3u8'):
+        return 'm3u'
+    return 'urls'
+
+
+def _text(value, limit=MAX_TEXT_LENGTH):
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        raise ValueError("문자열이 아닙니다")
+    return _one_line(value)[:limit]
+
+
+# 검증한 VideoRecord를 만든다 (잘못된 값은 ValueError)
+def make_video(video_id, title, channel, keyword, liked_at):
+    if not isinstance(video_id, str) or not _VIDEO_ID.match(video_id):
+        raise ValueError(f"잘못된 영상 ID: {video_id!r}")
+    keyword = _text(keyword, 100)
+    if not keyword:
+        raise ValueError("키워드가 비어 있습니다")
+    if liked_at is not None and (
+        isinstance(liked_at, bool) or not isinstance(liked_at, (int, float)) or not math.isfinite(liked_at)
+    ):
+        raise ValueError(f"잘못된 liked_at: {liked_at!r}")
+    return VideoRecord(video_id, _text(title) or video_id, _text(channel), keyword, liked_at)
+
+
+# 파서는 (줄 번호, VideoRecord 또는 None, 오류 메시지) 를 내보낸다
+def parse_jsonl(lines, keyword):
+    for number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"JSON 형식이 아닙니다 ({e.msg})")
+            if not isinstance(row, dict):
+                raise ValueError("JSON 객체가 아닙니다")
+            video_id = row.get('id') or row.get('video_id') or video_id_from(str(row.get('url') or ''))
+            video = make_video(
+                video_id, row.get('title'), row.get('channel'), row.get('keyword') or keyword, row.get('liked_at'),
+            )
+        except ValueError as e:
+            yield number, None, str(e)
+            continue
+        yield number, video, None
+
+
+def parse_m3u(lines, keyword):
+    group = keyword
+    title = channel = None
+    for number, line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('#'):
+            directive, _, value = line.partition(':')
+            directive = directive.upper()
+            if directive == '#PLAYLIST' and value.strip():
+                group = value.strip()
+            elif directive == '#EXTGRP' and value.strip():
+                group = value.strip()
+            elif directive == '#EXTINF':
+                info = value.partition(',')[2].strip()
+                channel, separator, title = info.partition(' - ')
+                if not separator:
+                    channel, title = '', info
+            continue
+        try:
+            yield number, make_video(_url_video_id(line), title, channel, group, None), None
+        except ValueError as e:
+            yield number, None, str(e)
+        title = channel = None
+
+
+def parse_urls(lines, keyword):
+    for number, line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            yield number, make_video(_url_video_id(line), None, None, keyword, None), None
+        except ValueError as e:
+            yield number, None, str(e)
+
+
+_PARSERS = {'jsonl': parse_jsonl, 'm3u': parse_m3u, 'urls': parse_urls}
+
+
+def batched(items, size):
+    items = iter(items)
+    while True:
+        batch = list(itertools.islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+# 텍스트 줄(파일, 업로드 등)을 가져와서 사용자 저장 목록에 추가하고 결과 요약을 반환
+# - fmt가 None이면 첫 줄(과 name의 확장자)로 형식을 정한다
+# - keyword는 키워드가 없는 항목(URL 목록, #EXTGRP 없는 M3U)에 붙일 키워드
+# - liked_at이 없는 항목은 파일 순서대로 지금 시각부터 1마이크로초씩 늘려서 저장 목록에서도 같은 순서로 보인다
+def import_lines(store, user_id, lines, fmt=None, keyword=None, name=None, progress=None, batch_size=None):
+    batch_size = config.LIBRARY_IO_BATCH_SIZE if batch_size is None else batch_size
+    progress = {'items': 0} if progress is None else progress
+    keyword = keyword or DEFAULT_IMPORT_KEYWORD
+    numbered = enumerate(lines, 1)
+    first = next(numbered, None)
+    report = {'format': fmt, 'read': 0, 'added': 0, 'duplicates': 0, 'invalid': 0, 'errors': [], 'seconds': 0.0}
+    if first is None:
+        return report
+    report['format'] = fmt = fmt or detect_format(first[1], name)
+    if fmt not in _PARSERS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt} ({', '.join(FORMATS)} 중 하나)")
+    first = (first[0], first[1].lstrip('\ufeff'))
+    started = time.perf_counter()
+    base = time.time()
+    order = itertools.count()
+
+    for batch in batched(_PARSERS[fmt](itertools.chain([first], numbered), keyword), batch_size):
+        unique = {}
+        valid = 0
+        for number, video, error in batch:
+            if video is None:
+                report['invalid'] += 1
+                if len(report['errors']) < MAX_REPORTED_ERRORS:
+                    report['errors'].append(f"{number}번째 줄: {error}")
+                continue
+            valid += 1
+            if video.liked_at is None:
+                video.liked_at = base + next(order) * 1e-6
+            # 배치 안의 중복은 처음 나온 것만 (이전 배치나 저장 목록과의 중복은 like_many가 무시)
+            unique.setdefault(video.id, video)
+        added = store.like_many(user_id, unique.values()) if unique else 0
+        report['read'] += len(batch)
+        report['added'] += added
+        report['duplicates'] += valid - added
+        progress['items'] = report['read']
+    report['seconds'] = time.perf_counter() - started
+    return report
+
+
+# 바이너리 스트림(열린 파일, 업로드된 파일)을 UTF-8 줄 단위로 가져온다
+def import_stream(store, user_id, stream, fmt=None, keyword=None, name=None, progress=None, batch_size=None):
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline=None)
+    try:
+        return import_lines(store, user_id, text, fmt, keyword, name, progress, batch_size)
+    finally:
+        text.detach()
+
+
+# ---- 백그라운드 작업 (Streamlit 앱용) ----
+
+class Job:
+    def __init__(self, kind, description):
+        self.kind = kind
+        self.description = description
+        self.progress = {'items': 0}
+        self.future = None
+
+    def done(self):
+        return self.future.done()
+
+    # 끝난 작업의 결과 (실패했으면 예외를 다시 올린다)
+    def result(self):
+        return self.future.result()
+
+
+# 내보내기 파일을 임시 디렉터리에 만든다 (결과의 'path', 'file_name', 'mime')
+def start_export(store, user_id, fmt, keyword=None):
+    job = Job('export', f"{keyword or '전체'} {fmt} 내보내기")
+    file_name = export_file_name(fmt, keyword)
+    os.makedirs(config.LIBRARY_EXPORT_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix='export-', suffix=f"-{file_name}", dir=config.LIBRARY_EXPORT_DIR)
+    os.close(fd)
+
+    def run():
+        result = export_to_file(store, user_id, path, fmt, keyword, job.progress)
+        return {**result, 'file_name': file_name, 'mime': MIME_TYPES[fmt]}
+
+    job.future = _executor.submit(run)
+    return job
+
+
+# 업로드된 파일(바이너리 스트림)을 가져온다
+def start_import(store, user_id, stream, name=None, keyword=None):
+    job = Job('import', f"{name or '파일'} 가져오기")
+    job.future = _executor.submit(import_stream, store, user_id, stream, None, keyword, name, job.progress)
+    return job
+
+
+# 끝난 내보내기 작업의 파일 삭제
+def discard(job):
+    if job is not None and job.kind == 'export' and job.done() and job.future.exception() is None:
+        try:
+            os.remove(job.result()['path'])
+        except OSError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="저장 목록 가져오기/내보내기")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export_parser = commands.add_parser('export', help="저장 목록 내보내기")
+    export_parser.add_argument('--user', required=True)
+    export_parser.add_argument('--format', choices=FORMATS, default='jsonl')
+    export_parser.add_argument('--keyword', help="이 키워드 플레이리스트만")
+    export_parser.add_argument('-o', '--output', help="출력 파일 (없으면 표준 출력)")
+    import_parser = commands.add_parser('import', help="파일 가져오기")
+    import_parser.add_argument('--user', required=True)
+    import_parser.add_argument('--format', choices=FORMATS, help="없으면 파일 내용으로 추측")
+    import_parser.add_argument('--keyword', help="키워드가 없는 항목에 붙일 키워드")
+    import_parser.add_argument('paths', nargs='+')
+    args = parser.parse_args()
+
+    store = liked_store.get_store()
+    if args.command == 'export':
+        if args.output:
+            result = export_to_file(store, args.user, args.output, args.format, args.keyword)
+            print(f"{result['items']}개, {result['bytes']:,} bytes, {result['seconds']:.2f} s", file=sys.stderr)
+        else:
+            for chunk in export_chunks(store, args.user, args.format, args.keyword):
+                sys.stdout.buffer.write(chunk)
+    else:
+        for path in args.paths:
+            with open(path, 'rb') as f:
+                report = import_stream(store, args.user, f, args.format, args.keyword, name=path)
+            print(f"{path}: {json.dumps(report, ensure_ascii=False)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+# 저장 목록 가져오기/내보내기 화면
+# 파일 작업은 library_io의 백그라운드 스레드에서 실행하고, 실행 중에는 진행 상황 부분만 주기적으로 다시 실행한다.
+# video_grid처럼 app.py 밖의 모듈로 두고, app.py는 사이드바 버튼을 눌렀을 때만 이 화면을 그린다.
+import streamlit as st
+
+import config
+import library_io
+import liked_store
+import tracing
+
+
+# 가져오기/내보내기 화면 (사이드바 버튼으로 열림)
+@st.fragment
+@tracing.traced_rerun('app.library_io', lambda: st.session_state.trace_session_id)
+def show_library_io(user_id):
+    st.markdown("## 📦 가져오기 / 내보내기")
+    job = st.session_state.library_job
+    if job is not None and not job.done():
+        _show_progress(job)
+        return
+    if job is not None:
+        _show_result(job)
+
+    export_col, import_col = st.columns(2)
+    with export_col:
+        st.markdown("#### 내보내기")
+        scopes = [None] + [keyword for keyword, _ in liked_store.get_store().keyword_counts(user_id)]
+        st.selectbox(
+            "범위", scopes, key="library_scope",
+            format_func=lambda keyword: "전체 저장 목록" if keyword is None else keyword
+        )
+        st.selectbox(
+            "형식", library_io.FORMATS, key="library_format",
+            format_func=lambda fmt: {'jsonl': "JSONL (전체 정보)", 'm3u': "M3U 플레이리스트", 'urls': "URL 목록"}[fmt]
+        )
+        st.button("내보내기 준비", key="library_export", disabled=len(scopes) == 1,
+                  on_click=_start_export, args=(user_id,))
+    with import_col:
+        st.markdown("#### 가져오기")
+        uploaded = st.file_uploader(
+            "가져올 파일", type=list(library_io.IMPORT_EXTENSIONS), key="library_upload"
+        )
+        st.text_input(
+            "키워드가 없는 항목의 키워드", value=library_io.DEFAULT_IMPORT_KEYWORD, key="library_import_keyword"
+        )
+        st.button("가져오기", key="library_import", disabled=uploaded is None,
+                  on_click=_start_import, args=(user_id,))
+
+
+# 실행 중인 작업의 진행 상황 (끝나면 앱 전체를 다시 실행해서 결과와 바뀐 저장 목록을 보여 줌)
+@st.fragment(run_every=config.LIBRARY_IO_POLL_SECONDS)
+def _show_progress(job):
+    if job.done():
+        st.rerun()
+    st.caption(f"{job.description} 중... {job.progress['items']:,}개")
+
+
+# 새 작업 시작 (버튼 콜백, 이전 내보내기 파일은 삭제)
+def _start_job(job):
+    library_io.discard(st.session_state.library_job)
+    st.session_state.library_job = job
+
+
+def _start_export(user_id):
+    _start_job(library_io.start_export(
+        liked_store.get_store(), user_id, st.session_state.library_format, st.session_state.library_scope
+    ))
+
+
+def _start_import(user_id):
+    uploaded = st.session_state.library_upload
+    if uploaded is None:
+        return
+    uploaded.seek(0)
+    _start_job(library_io.start_import(
+        liked_store.get_store(), user_id, uploaded, uploaded.name, st.session_state.library_import_keyword
+    ))
+
+
+# 끝난 작업의 결과 (내보내기는 다운로드 버튼, 가져오기는 요약)
+def _show_result(job):
+    try:
+        result = job.result()
+    except Exception as e:
+        st.error(f"{job.description} 실패: {str(e)}")
+        return
+    if job.kind == 'export':
+        st.caption(f"{result['items']:,}개 · {result['bytes'] / 1024:,.0f} KB")
+        # download_button은 파일 내용을 그대로 Streamlit 미디어 저장소에 올린다 (만드는 과정만 스트리밍)
+        with open(result['path'], 'rb') as f:
+            st.download_button(
+                "⬇️ 다운로드", f, file_name=result['file_name'], mime=result['mime'], key="library_download"
+            )
+    else:
+        st.success(
+            f"{result['read']:,}개 중 {result['added']:,}개 추가 "
+            f"(이미 있음 {result['duplicates']:,}, 잘못된 항목 {result['invalid']:,})"
+        )
+        for error in result['errors'][:5]:
+            st.caption(error)
@@ -0,0 +1,203 @@
+# 좋아요 누른 영상 저장소 (SQLite, WAL 모드)
+# 사용자별로 영상을 저장하고 (user, keyword) 인덱스와 키워드별 개수 테이블을 유지한다.
+# 개수는 트리거로 갱신되므로 좋아요/취소는 한 번의 인덱스 쓰기로 끝나고,
+# 사이드바와 플레이리스트는 전체 목록을 훑지 않고 필요한 만큼만 읽는다.
+import os
+import sqlite3
+import threading
+import time
+
+import config
+from video_record import VideoRecord
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS liked_videos (
+    user_id TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    title TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    liked_at REAL NOT NULL,
+    PRIMARY KEY (user_id, video_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS liked_videos_by_keyword
+    ON liked_videos (user_id, keyword, liked_at, video_id);
+
+CREATE TABLE IF NOT EXISTS liked_counts (
+    user_id TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (user_id, keyword)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS liked_videos_insert AFTER INSERT ON liked_videos BEGIN
+    INSERT INTO liked_counts (user_id, keyword, count) VALUES (NEW.user_id, NEW.keyword, 1)
+    ON CONFLICT (user_id, keyword) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS liked_videos_delete AFTER DELETE ON liked_videos BEGIN
+    UPDATE liked_counts SET count = count - 1
+    WHERE user_id = OLD.user_id AND keyword = OLD.keyword;
+    DELETE FROM liked_counts
+    WHERE user_id = OLD.user_id AND keyword = OLD.keyword AND count <= 0;
+END;
+"""
+
+_COLUMNS = 'video_id, keyword, title, channel, liked_at'
+
+
+def _row_to_video(row):
+    video_id, keyword, title, channel, liked_at = row
+    return VideoRecord(video_id, title, channel, keyword, liked_at)
+
+
+class LikedStore:
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 연결 하나를 잠금으로 보호해서 모든 세션 스레드가 공유
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+
+    # 좋아요 추가 (이미 있으면 무시). 새로 추가됐으면 True
+    def like(self, user_id, video):
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO liked_videos (user_id, video_id, keyword, title, channel, liked_at)"
+                " VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (user_id, video_id) DO NOTHING",
+                (user_id, video.id, video.keyword, video.title, video.channel, time.time()),
+            )
+            return cursor.rowcount > 0
+
+    # 여러 영상을 한 트랜잭션으로 추가 (이미 있는 영상은 무시). 새로 추가한 수를 반환
+    # liked_at이 없는 영상은 지금 시각으로 저장한다
+    def like_many(self, user_id, videos):
+        now = time.time()
+        rows = [
+            (user_id, video.id, video.keyword, video.title, video.channel,
+             now if video.liked_at is None else video.liked_at)
+            for video in videos
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                cursor = self._conn.executemany(
+                    "INSERT INTO liked_videos (user_id, video_id, keyword, title, channel, liked_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (user_id, video_id) DO NOTHING",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return cursor.rowcount
+
+    # 좋아요 취소. 삭제됐으면 True
+    def unlike(self, user_id, video_id):
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM liked_videos WHERE user_id = ? AND video_id = ?",
+                (user_id, video_id),
+            )
+            return cursor.rowcount > 0
+
+    # 주어진 영상 중 좋아요 누른 영상 ID
+    def liked_ids(self, user_id, video_ids):
+        video_ids = list(video_ids)
+        if not video_ids:
+            return set()
+        placeholders = ','.join('?' * len(video_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT video_id FROM liked_videos WHERE user_id = ? AND video_id IN ({placeholders})",
+                (user_id, *video_ids),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    # 키워드별 저장 개수 [(keyword, count), ...]
+    def keyword_counts(self, user_id):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT keyword, count FROM liked_counts WHERE user_id = ? ORDER BY keyword",
+                (user_id,),
+            ).fetchall()
+
+    def count(self, user_id, keyword):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT count FROM liked_counts WHERE user_id = ? AND keyword = ?",
+                (user_id, keyword),
+            ).fetchone()
+        return row[0] if row else 0
+
+    # 키워드의 저장 영상을 좋아요 순서대로 limit개씩 읽는다 (keyset 페이지네이션)
+    # after는 이전 페이지 마지막 영상의 (liked_at, video_id)
+    def videos_for_keyword(self, user_id, keyword, limit, after=None):
+        with self._lock:
+            if after is None:
+                rows = self._conn.execute(
+                    f"SELECT {_COLUMNS} FROM liked_videos WHERE user_id = ? AND keyword = ?"
+                    " ORDER BY liked_at, video_id LIMIT ?",
+                    (user_id, keyword, limit),
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    f"SELECT {_COLUMNS} FROM liked_videos WHERE user_id = ? AND keyword = ?"
+                    " AND (liked_at, video_id) > (?, ?)"
+                    " ORDER BY liked_at, video_id LIMIT ?",
+                    (user_id, keyword, after[0], after[1], limit),
+                ).fetchall()
+        return [_row_to_video(row) for row in rows]
+
+    # 저장 영상 전체 (keyword가 있으면 그 키워드만)를 키워드, 좋아요 순서로 하나씩 내보낸다
+    # batch_size개씩 읽고 배치 사이에는 잠금을 놓으므로, 큰 라이브러리를 읽는 동안에도 다른 세션이 기다리지 않는다
+    def iter_videos(self, user_id, keyword=None, batch_size=1000):
+        if keyword is not None:
+            after = None
+            while True:
+                page = self.videos_for_keyword(user_id, keyword, batch_size, after)
+                yield from page
+                if len(page) < batch_size:
+                    return
+                after = (page[-1].liked_at, page[-1].id)
+        after = None
+        while True:
+            with self._lock:
+                if after is None:
+                    rows = self._conn.execute(
+                        f"SELECT {_COLUMNS} FROM liked_videos WHERE user_id = ?"
+                        " ORDER BY keyword, liked_at, video_id LIMIT ?",
+                        (user_id, batch_size),
+                    ).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        f"SELECT {_COLUMNS} FROM liked_videos WHERE user_id = ?"
+                        " AND (keyword, liked_at, video_id) > (?, ?, ?)"
+                        " ORDER BY keyword, liked_at, video_id LIMIT ?",
+                        (user_id, *after, batch_size),
+                    ).fetchall()
+            yield from (_row_to_video(row) for row in rows)
+            if len(rows) < batch_size:
+                return
+            video_id, last_keyword, _, _, liked_at = rows[-1]
+            after = (last_keyword, liked_at, video_id)
+
+
+_store_lock = threading.Lock()
+_store = None
+
+
+# 프로세스 전체에서 공유하는 저장소
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = LikedStore(config.LIKED_DB_PATH)
+    return _store
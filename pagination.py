@@ -0,0 +1,134 @@
+# 키워드별 검색 페이지 커서
+# 새로고침할 때 첫 페이지를 다시 요청하지 않고 nextPageToken으로 다음 페이지를 이어서 가져온다.
+# 현재 페이지에 남은 영상이 PAGINATION_PREFETCH_BELOW개 이하가 되면 다음 페이지를 백그라운드에서 받아 두므로
+# 새로고침은 대기 없이 바로 표시되고, 후보가 많은 페이지(로컬 카탈로그)에서는 쓰지 않을 API 요청을 하지 않는다.
+import hashlib
+import logging
+from collections import deque
+
+import config
+import prefetch
+
+logger = logging.getLogger(__name__)
+
+
+# 이미 본 비디오 ID 기록 (Bloom filter)
+# 세션이 길어져도 메모리가 고정 크기로 유지된다. 드물게 새 영상을 본 것으로 판단할 수 있다.
+class SeenIds:
+    __slots__ = ('_bits', '_size', '_hashes', 'count')
+
+    def __init__(self, size_bits=None, hashes=None):
+        self._size = size_bits or config.SEEN_FILTER_BITS
+        self._hashes = hashes or config.SEEN_FILTER_HASHES
+        self._bits = bytearray((self._size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, video_id):
+        digest = hashlib.blake2b(video_id.encode('utf-8'), digest_size=8 * self._hashes).digest()
+        for i in range(self._hashes):
+            yield int.from_bytes(digest[i * 8:(i + 1) * 8], 'little') % self._size
+
+    def add(self, video_id):
+        for pos in self._positions(video_id):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def update(self, video_ids):
+        for video_id in video_ids:
+            self.add(video_id)
+
+    def __contains__(self, video_id):
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(video_id))
+
+
+class KeywordCursor:
+    # fetch_page(page_token, background) -> {'items': [...], 'next_page_token': str 또는 None}
+    def __init__(self, fetch_page, buffer_pages=None, prefetch_below=None):
+        self._fetch_page = fetch_page
+        self._buffer = deque()
+        self._buffer_pages = buffer_pages or config.PAGINATION_BUFFER_PAGES
+        self._prefetch_below = config.PAGINATION_PREFETCH_BELOW if prefetch_below is None else prefetch_below
+        self._next_token = None
+        self._started = False
+        self._pending = None
+        self._prefetch_failed = False
+        self._current = []
+        self.seen = SeenIds()
+
+    @property
+    def exhausted(self):
+        return (
+            self._started and self._next_token is None and self._pending is None
+            and not self._buffer and not self._current
+        )
+
+    # 완료된 백그라운드 요청을 버퍼로 옮기고, 버퍼에 여유가 있으면 다음 페이지를 요청
+    # 백그라운드 요청이 실패하면 페이지 토큰은 그대로 두고, 다음 페이지는 _next_page가 사용자 우선순위로 가져온다
+    def _fill(self):
+        if self._pending is not None and self._pending.done():
+            pending, self._pending = self._pending, None
+            try:
+                page = pending.result()
+            except Exception as e:
+                self._prefetch_failed = True
+                logger.info("다음 페이지 미리 가져오기 실패 (새로고침 때 다시 요청): %s", e)
+            else:
+                self._next_token = page.get('next_page_token')
+                self._buffer.append(page['items'])
+        if (
+            self._pending is None and self._started and self._next_token and not self._prefetch_failed
+            and len(self._buffer) < self._buffer_pages
+        ):
+            self._pending = prefetch.submit(self._fetch_page, self._next_token, True)
+
+    def _next_page(self):
+        if not self._started:
+            page = self._fetch_page(None, False)
+            self._started = True
+            self._next_token = page.get('next_page_token')
+            return page['items']
+        self._fill()
+        if not self._buffer and self._pending is not None:
+            # 백그라운드 요청이 아직 진행 중이면 기다린다
+            self._pending.exception()
+            self._fill()
+        if self._buffer:
+            items = self._buffer.popleft()
+        elif self._next_token:
+            # 백그라운드 요청이 실패했으면 사용자 우선순위로 직접 가져온다 (실패하면 호출자에게 전달)
+            page = self._fetch_page(self._next_token, False)
+            self._next_token = page.get('next_page_token')
+            self._prefetch_failed = False
+            items = page['items']
+        else:
+            return None
+        self._fill()
+        return items
+
+    # 아직 보지 않은 영상을 최대 count개 반환
+    # select(items, count, exclude_ids)는 후보 중에서 보여줄 영상을 고른다.
+    def take(self, count, select):
+        videos = []
+        while len(videos) < count:
+            if not self._current:
+                try:
+                    items = self._next_page()
+                except Exception:
+                    # 이미 고른 영상은 본 것으로 기록했으므로 버리지 않고 반환 (다음 새로고침에서 다시 시도)
+                    if videos:
+                        break
+                    raise
+                if items is None:
+                    break
+                self._current = [item for item in items if item['id'] not in self.seen]
+                continue
+            chosen = select(self._current, count - len(videos), self.seen)
+            if not chosen:
+                self._current = []
+                continue
+            videos.extend(chosen)
+            self.seen.update(video.id for video in chosen)
+            self._current = [item for item in self._current if item['id'] not in self.seen]
+        if len(self._current) <= self._prefetch_below:
+            self._fill()
+        return videos
@@ -0,0 +1,53 @@
+# 테마 키워드 검색 미리 가져오기
+# 테마가 정해지면 해시태그를 누르기 전에 키워드 검색을 병렬로 실행해서 캐시를 채운다.
+# 해시태그 클릭 시 같은 키로 캐시를 조회하므로, 진행 중인 요청이 있으면 그 결과를 기다린다.
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+import quota
+import resilience
+from search_cache import search_cache
+
+# search.list 한 번에 드는 할당량 단위
+SEARCH_LIST_UNITS = quota.method_cost('youtube.search.list')
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(
+    max_workers=config.PREFETCH_CONCURRENCY,
+    thread_name_prefix='prefetch',
+)
+
+
+def _warm(key, loader):
+    try:
+        search_cache.get_or_load(key, loader, quota.PRIORITY_PREFETCH)
+    except quota.QuotaExhausted:
+        logger.info("할당량 부족으로 prefetch 건너뜀: %s", key)
+    except resilience.UpstreamUnavailable:
+        logger.info("YouTube API가 응답하지 않아 prefetch 건너뜀: %s", key)
+    except Exception:
+        logger.warning("prefetch 실패: %s", key, exc_info=True)
+
+
+# (캐시 키, loader) 목록을 백그라운드에서 가져온다.
+# 이미 캐시에 있거나 가져오는 중인 키는 건너뛰고, max_units를 넘지 않는 만큼만 요청한다.
+# 실제로 요청한 할당량 단위를 반환한다.
+def prefetch_searches(requests, max_units):
+    spent = 0
+    for key, loader in requests:
+        if search_cache.has(key):
+            continue
+        if spent + SEARCH_LIST_UNITS > max_units:
+            break
+        spent += SEARCH_LIST_UNITS
+        _executor.submit(contextvars.copy_context().run, _warm, key, loader)
+    return spent
+
+
+# 임의의 작업을 prefetch 스레드 풀에서 실행
+# (현재 context를 넘겨서 백그라운드 API 호출도 요청한 세션과 rerun의 추적 span으로 기록된다)
+def submit(fn, *args):
+    return _executor.submit(contextvars.copy_context().run, fn, *args)
@@ -0,0 +1,200 @@
+# YouTube Data API 할당량 스케줄러
+# 모든 API 호출은 이 스케줄러를 거친다. 메서드별 비용으로 일일 예산과 분당 한도(토큰 버킷)를
+# 관리하고, 예산이 부족할 때는 사용자 요청을 먼저 처리한 뒤 prefetch/warm-up 작업을 처리한다.
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import config
+
+# 메서드별 할당량 비용 (https://developers.google.com/youtube/v3/determine_quota_cost)
+METHOD_COSTS = {
+    'youtube.search.list': 100,
+    'youtube.videos.list': 1,
+}
+DEFAULT_COST = 1
+
+# 우선순위 (숫자가 작을수록 먼저 처리)
+PRIORITY_USER = 0
+PRIORITY_PREFETCH = 1
+PRIORITY_WARMUP = 2
+
+# YouTube 할당량은 태평양 시간 자정에 초기화된다
+QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+
+
+class QuotaExhausted(Exception):
+    pass
+
+
+# HttpError가 할당량 초과(403 quotaExceeded / dailyLimitExceeded)인지 확인
+def is_quota_error(error):
+    resp = getattr(error, 'resp', None)
+    if resp is None or getattr(resp, 'status', None) != 403:
+        return False
+    content = getattr(error, 'content', b'') or b''
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', 'replace')
+    return 'quotaExceeded' in content or 'dailyLimitExceeded' in content
+
+
+def method_cost(method):
+    return METHOD_COSTS.get(method, DEFAULT_COST)
+
+
+def _next_reset(now):
+    local = datetime.fromtimestamp(now, QUOTA_TIMEZONE)
+    midnight = (local + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight.timestamp()
+
+
+class QuotaScheduler:
+    def __init__(self, daily_budget, per_minute, reserves=None, max_wait=None, clock=time.time):
+        self.daily_budget = daily_budget
+        self.per_minute = per_minute
+        # 우선순위별로 남겨 둬야 하는 일일 예산 비율 (사용자 요청을 위한 여유분)
+        self.reserves = reserves or {
+            PRIORITY_USER: 0.0,
+            PRIORITY_PREFETCH: config.QUOTA_PREFETCH_RESERVE,
+            PRIORITY_WARMUP: config.QUOTA_WARMUP_RESERVE,
+        }
+        self.max_wait = config.QUOTA_MAX_WAIT if max_wait is None else max_wait
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+        # 버킷 용량은 가장 비싼 호출 한 번은 담을 수 있어야 한다
+        self._capacity = float(max(per_minute, max(METHOD_COSTS.values())))
+        self._tokens = self._capacity
+        self._refilled_at = clock()
+        self._reset_at = _next_reset(clock())
+        self._spent = 0
+        self._spent_by_method = {}
+        self._recent = deque()
+        self._rejected = {}
+        self._upstream_exhausted = False
+
+    def _roll_day(self, now):
+        if now >= self._reset_at:
+            self._reset_at = _next_reset(now)
+            self._spent = 0
+            self._spent_by_method = {}
+            self._recent.clear()
+            self._upstream_exhausted = False
+
+    def _refill(self, now):
+        elapsed = max(0.0, now - self._refilled_at)
+        self._tokens = min(self._capacity, self._tokens + elapsed * self.per_minute / 60.0)
+        self._refilled_at = now
+
+    def _remaining(self):
+        if self._upstream_exhausted:
+            return 0
+        return max(0, self.daily_budget - self._spent)
+
+    def _reject(self, priority, reason):
+        self._rejected[priority] = self._rejected.get(priority, 0) + 1
+        raise QuotaExhausted(reason)
+
+    # 비용만큼 할당량을 확보한다. 확보하지 못하면 QuotaExhausted
+    def acquire(self, method, priority=PRIORITY_USER, max_wait=None):
+        cost = method_cost(method)
+        max_wait = self.max_wait if max_wait is None else max_wait
+        with self._cond:
+            now = self._clock()
+            self._roll_day(now)
+            reserve = self.daily_budget * self.reserves.get(priority, 0.0)
+            if self._remaining() - cost < reserve:
+                self._reject(priority, "일일 할당량이 부족합니다")
+
+            deadline = now + max_wait
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    now = self._clock()
+                    self._refill(now)
+                    if self._waiters[0] == ticket and (self.per_minute <= 0 or self._tokens >= cost):
+                        # 기다리는 동안 다른 호출이 예산을 썼을 수 있으므로 쓰기 직전에 다시 확인
+                        self._roll_day(now)
+                        if self._remaining() - cost < reserve:
+                            self._reject(priority, "일일 할당량이 부족합니다")
+                        break
+                    if now >= deadline:
+                        self._reject(priority, "분당 요청 한도를 초과했습니다")
+                    wait = deadline - now
+                    if self._waiters[0] == ticket:
+                        wait = min(wait, (cost - self._tokens) * 60.0 / self.per_minute)
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+            if self.per_minute > 0:
+                self._tokens -= cost
+            self._spent += cost
+            self._spent_by_method[method] = self._spent_by_method.get(method, 0) + cost
+            self._recent.append((now, cost))
+
+    # 할당량을 확보한 뒤 fn()을 실행
+    def run(self, method, fn, priority=PRIORITY_USER):
+        self.acquire(method, priority)
+        try:
+            return fn()
+        except Exception as e:
+            self.check_error(e)
+            raise
+
+    # upstream 할당량 초과 응답이면 QuotaExhausted로 바꿔서 올린다
+    def check_error(self, error):
+        if is_quota_error(error):
+            self.mark_exhausted()
+            raise QuotaExhausted("YouTube API 할당량이 소진되었습니다") from error
+
+    # upstream에서 할당량 초과 응답을 받으면 다음 초기화 시각까지 요청을 막는다
+    def mark_exhausted(self):
+        with self._cond:
+            self._upstream_exhausted = True
+
+    def get_stats(self):
+        with self._cond:
+            now = self._clock()
+            self._roll_day(now)
+            self._refill(now)
+            # 최근 1시간 사용 속도로 소진 예상 시각 계산
+            while self._recent and self._recent[0][0] < now - 3600:
+                self._recent.popleft()
+            remaining = self._remaining()
+            projected = None
+            if remaining == 0:
+                projected = now
+            elif self._recent:
+                window = max(60.0, now - self._recent[0][0])
+                rate = sum(cost for _, cost in self._recent) / window
+                exhaust_at = now + remaining / rate
+                if exhaust_at < self._reset_at:
+                    projected = exhaust_at
+            return {
+                'daily_budget': self.daily_budget,
+                'spent_today': self._spent,
+                'remaining_today': remaining,
+                'spent_by_method': dict(self._spent_by_method),
+                'minute_tokens': int(self._tokens),
+                'waiting': len(self._waiters),
+                'rejected_by_priority': dict(self._rejected),
+                'upstream_exhausted': self._upstream_exhausted,
+                'projected_exhaustion_at': projected,
+                'resets_at': self._reset_at,
+            }
+
+
+# 프로세스 전체에서 공유하는 스케줄러
+scheduler = QuotaScheduler(
+    daily_budget=config.QUOTA_DAILY_BUDGET,
+    per_minute=config.QUOTA_PER_MINUTE,
+)
@@ -0,0 +1,100 @@
+# 검색 결과 보강과 순위 매기기
+# 검색 후보 ID를 videos.list로 한 번에(최대 50개씩) 조회해서 재생 시간과 조회수를 붙이고,
+# 플레이리스트다운 제목/재생 시간/조회수를 합친 점수로 한 번에 정렬한다.
+# 보강 결과는 영상 ID별로 오래 캐시하므로 같은 영상은 모든 사용자와 키워드를 통틀어 한 번만 조회한다.
+import math
+import re
+
+from googleapiclient.errors import HttpError
+
+import config
+import quota
+import resilience
+import shared_cache
+import youtube_client
+from search_cache import SearchCache, register_metrics
+
+VIDEOS_LIST_BATCH = 50
+PLAYLIST_MARKERS = ('playlist', '플레이리스트', 'mix', '모음')
+
+_ISO_DURATION = re.compile(r'P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?')
+
+details_cache = SearchCache(
+    ttl=config.ENRICHMENT_TTL,
+    max_entries=config.ENRICHMENT_MAX_ENTRIES,
+    eviction='lru',
+    shared=shared_cache.tier('details', config.SHARED_CACHE_DETAILS_TTL),
+)
+register_metrics('details', details_cache)
+
+
+# ISO 8601 재생 시간 (PT1H2M3S) → 초
+def parse_duration(value):
+    match = _ISO_DURATION.fullmatch(value or '')
+    if not match:
+        return None
+    days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def _parse_details(item):
+    statistics = item.get('statistics', {})
+    views = statistics.get('viewCount')
+    return {
+        'duration': parse_duration(item.get('contentDetails', {}).get('duration')),
+        'views': int(views) if views is not None else None,
+    }
+
+
+# 영상 ID별 상세 정보 {id: {'duration': 초, 'views': 조회수}}
+# 메모리 캐시 → 공유 캐시 순서로 찾고, 둘 다 없는 ID만 50개씩 묶어서 조회한다
+def fetch_details(youtube, video_ids, priority=quota.PRIORITY_USER):
+    video_ids = list(dict.fromkeys(video_ids))
+    details = details_cache.get_many(video_ids)
+    missing = [video_id for video_id in video_ids if video_id not in details]
+    if missing:
+        details.update(details_cache.fetch_shared(missing))
+        missing = [video_id for video_id in missing if video_id not in details]
+
+    for start in range(0, len(missing), VIDEOS_LIST_BATCH):
+        batch = missing[start:start + VIDEOS_LIST_BATCH]
+        response = youtube_client.execute(youtube.videos().list(
+            id=','.join(batch),
+            part='contentDetails,statistics',
+            maxResults=len(batch)
+        ), priority)
+        fetched = {item['id']: _parse_details(item) for item in response.get('items', [])}
+        details_cache.put_many(fetched)
+        details.update(fetched)
+    return details
+
+
+# 검색 결과 항목에 상세 정보 붙이기 (조회에 실패하면 제목만으로 순위를 매김)
+# OSError는 소켓 시간 초과나 연결 끊김
+def enrich_items(youtube, items, priority=quota.PRIORITY_USER):
+    try:
+        details = fetch_details(youtube, [item['id'] for item in items], priority)
+    except (quota.QuotaExhausted, resilience.UpstreamUnavailable, HttpError, OSError):
+        return items
+    return [{**item, **details.get(item['id'], {})} for item in items]
+
+
+def score_item(item):
+    title = item['title'].lower()
+    score = 0.0
+    # 플레이리스트 영상을 우선 (기존 필터와 같은 기준)
+    if any(marker in title for marker in PLAYLIST_MARKERS):
+        score += 10.0
+    # 긴 영상일수록 플레이리스트일 가능성이 높음 (1시간 이상은 같은 점수)
+    duration = item.get('duration')
+    if duration:
+        score += 3.0 * min(duration, 3600) / 3600
+    views = item.get('views')
+    if views:
+        score += math.log10(views + 1) / 2
+    return score
+
+
+# 점수 순으로 정렬된 항목 (정렬이 안정적이라 같은 점수면 검색 결과 순서(관련도) 유지)
+def rank_items(items):
+    return sorted(items, key=lambda item: -score_item(item))
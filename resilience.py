@@ -0,0 +1,321 @@
+# YouTube API 호출 복원력 계층
+# youtube_client.execute의 모든 요청이 이 모듈을 거친다.
+# - 호출 하나의 전체 시간 제한(RESILIENCE_DEADLINE)과 시도별 시간 제한(RESILIENCE_ATTEMPT_TIMEOUT).
+#   시도는 작업 스레드에서 실행하고, 시간 제한을 넘긴 시도는 더 기다리지 않는다 (응답이 오면 버린다)
+# - 일시적인 오류(429, 5xx, 연결 오류, 시간 초과)는 지터를 넣은 지수 백오프로 다시 시도한다
+# - HEDGE_METHODS의 요청은 최근 응답 지연 시간의 p95가 지나도 응답이 없으면 같은 요청을 하나 더 보내고
+#   먼저 온 응답을 쓴다
+# - 메서드별 회로 차단기: 일시적인 오류가 BREAKER_FAILURES번 이어지면 BREAKER_OPEN_SECONDS 동안 요청을 보내지 않고
+#   바로 UpstreamUnavailable을 올린다. 그 뒤 시험 요청 하나가 성공하면 다시 닫는다
+# 재시도와 hedge도 시도마다 할당량을 확보한다. 할당량 오류와 나머지 4xx는 다시 시도하지 않는다.
+# 호출자(curation.load_search_page)는 UpstreamUnavailable이면 마지막으로 받은 결과를 대신 보여 준다.
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import config
+import quota
+import tracing
+
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+LATENCY_WINDOW = 200  # hedge 지연 시간을 계산할 최근 응답 수
+HEDGE_MIN_SAMPLES = 20  # 응답이 이만큼 모이기 전에는 hedge하지 않음
+
+
+# upstream이 응답하지 않거나 계속 실패함
+# reason: circuit_open (회로 열림), timeout (시간 제한 초과), error (재시도해도 실패)
+class UpstreamUnavailable(Exception):
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason
+
+
+class _AttemptTimeout(Exception):
+    pass
+
+
+# 다시 시도할 만한 오류인지 (HttpError는 상태 코드로, 그 밖에는 연결 오류와 시간 초과)
+def is_retryable(error):
+    if isinstance(error, _AttemptTimeout):
+        return True
+    resp = getattr(error, 'resp', None)
+    if resp is not None:
+        return int(getattr(resp, 'status', 0) or 0) in RETRY_STATUSES
+    return isinstance(error, OSError) or type(error).__module__.startswith('httplib2')
+
+
+# 할당량 초과 응답은 QuotaExhausted로 바꿔서 올린다
+def _checked(fn):
+    try:
+        return fn()
+    except Exception as e:
+        quota.scheduler.check_error(e)
+        raise
+
+
+class CircuitBreaker:
+    def __init__(self, failures, open_seconds, clock=time.monotonic):
+        self.failures = failures
+        self.open_seconds = open_seconds
+        self.state = 'closed'
+        self.opened = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    # 요청을 보내도 되는지 (half_open이면 시험 요청 하나만 허용)
+    def allow(self):
+        with self._lock:
+            if self.state == 'open' and self._clock() - self._opened_at >= self.open_seconds:
+                self.state = 'half_open'
+                self._probing = False
+            if self.state == 'half_open':
+                if self._probing:
+                    return False
+                self._probing = True
+                return True
+            return self.state == 'closed'
+
+    # upstream이 응답함 (4xx 오류도 upstream은 살아 있다는 뜻)
+    def record_success(self):
+        with self._lock:
+            self._consecutive = 0
+            self.state = 'closed'
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive += 1
+            if self.state == 'half_open' or (
+                self.state == 'closed' and self.failures > 0 and self._consecutive >= self.failures
+            ):
+                self.state = 'open'
+                self._opened_at = self._clock()
+                self._probing = False
+                self.opened += 1
+
+    # upstream 상태를 알 수 없이 끝난 요청 (할당량 부족 등): 시험 요청 자리만 돌려준다
+    def release(self):
+        with self._lock:
+            self._probing = False
+
+
+class ResilientCaller:
+    def __init__(self, deadline, attempt_timeout, attempts, backoff_base, backoff_max, hedge_methods=(),
+                 hedge_percentile=0.95, hedge_min_delay=0.0, breaker_failures=5, breaker_open_seconds=30.0,
+                 workers=32, clock=time.monotonic, seed=None):
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.attempts = max(1, attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_methods = frozenset(hedge_methods)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.breaker_failures = breaker_failures
+        self.breaker_open_seconds = breaker_open_seconds
+        self.workers = workers
+        self._clock = clock
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._breakers = {}
+        self._latencies = {}
+        self._executor = None
+        self._stats = {
+            'calls': 0,
+            'attempts': 0,
+            'retries': 0,
+            'hedges': 0,
+            'hedge_wins': 0,
+            'timeouts': 0,
+            'short_circuits': 0,
+            'unavailable': 0,
+        }
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def breaker(self, method):
+        with self._lock:
+            breaker = self._breakers.get(method)
+            if breaker is None:
+                breaker = self._breakers[method] = CircuitBreaker(
+                    self.breaker_failures, self.breaker_open_seconds, self._clock,
+                )
+            return breaker
+
+    def _submit(self, fn):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='youtube-call')
+            executor = self._executor
+        return executor.submit(contextvars.copy_context().run, _checked, fn)
+
+    # 시도 사이 대기 시간 (full jitter: 0 ~ min(최대, 기본 × 2^(시도-1)))
+    def _backoff(self, attempt):
+        ceiling = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        with self._lock:
+            return self._rng.uniform(0, ceiling)
+
+    def _observe(self, method, seconds):
+        with self._lock:
+            samples = self._latencies.get(method)
+            if samples is None:
+                samples = self._latencies[method] = deque(maxlen=LATENCY_WINDOW)
+            samples.append(seconds)
+
+    # hedge 요청을 보내기까지 기다릴 시간 (최근 응답이 부족하면 None)
+    def hedge_delay(self, method):
+        with self._lock:
+            samples = self._latencies.get(method)
+            if samples is None or len(samples) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(samples)
+        return max(self.hedge_min_delay, ordered[min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile))])
+
+    # 할당량을 기다리지 않고 확보할 수 있을 때만 hedge
+    def _acquire_hedge(self, method, priority):
+        try:
+            quota.scheduler.acquire(method, priority, max_wait=0)
+        except quota.QuotaExhausted:
+            return False
+        return True
+
+    # 할당량을 확보한 뒤 fn()을 실행하고, 실패하면 백오프 후 다시 시도한다
+    def call(self, method, fn, priority=quota.PRIORITY_USER):
+        breaker = self.breaker(method)
+        self._count('calls')
+        with tracing.span('youtube.call', method=method) as span:
+            if not breaker.allow():
+                self._count('short_circuits')
+                span.set('outcome', 'circuit_open')
+                raise UpstreamUnavailable('circuit_open', f"{method} 요청이 계속 실패해서 잠시 멈췄습니다")
+            deadline = None
+            attempt = 0
+            while True:
+                attempt += 1
+                span.set('attempts', attempt)
+                try:
+                    quota.scheduler.acquire(method, priority)
+                    # 할당량을 기다린 시간은 시간 제한에 넣지 않는다
+                    if deadline is None and self.deadline > 0:
+                        deadline = self._clock() + self.deadline
+                    result = self._attempt(method, fn, priority, deadline, span)
+                except quota.QuotaExhausted:
+                    breaker.release()
+                    raise
+                except Exception as e:
+                    if not is_retryable(e):
+                        breaker.record_success()
+                        raise
+                    breaker.record_failure()
+                    delay = self._backoff(attempt)
+                    out_of_time = deadline is not None and self._clock() + delay >= deadline
+                    if attempt >= self.attempts or out_of_time or not breaker.allow():
+                        self._count('unavailable')
+                        reason = 'timeout' if isinstance(e, _AttemptTimeout) else 'error'
+                        span.set('outcome', reason)
+                        raise UpstreamUnavailable(reason, f"YouTube API가 응답하지 않습니다: {e}") from e
+                    self._count('retries')
+                    time.sleep(delay)
+                    continue
+                breaker.record_success()
+                return result
+
+    def _attempt(self, method, fn, priority, deadline, span):
+        self._count('attempts')
+        timeout = self.attempt_timeout if self.attempt_timeout > 0 else None
+        if deadline is not None:
+            remaining = deadline - self._clock()
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        hedge = method in self.hedge_methods
+        started = self._clock()
+        if timeout is None and not hedge:
+            result = _checked(fn)
+        else:
+            result = self._race(method, fn, priority, started, timeout, hedge, span)
+        self._observe(method, self._clock() - started)
+        return result
+
+    # 시도 하나 (필요하면 hedge 요청을 더해서) 먼저 성공한 응답을 반환
+    def _race(self, method, fn, priority, started, timeout, hedge, span):
+        futures = [self._submit(fn)]
+        if hedge:
+            delay = self.hedge_delay(method)
+            if delay is not None and (timeout is None or delay < timeout):
+                done, _ = wait(futures, delay)
+                if not done and self._acquire_hedge(method, priority):
+                    self._count('hedges')
+                    span.set('hedged', True)
+                    futures.append(self._submit(fn))
+        end = None if timeout is None else started + timeout
+        pending = set(futures)
+        error = None
+        while pending:
+            remaining = None if end is None else end - self._clock()
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = wait(pending, remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not futures[0]:
+                        self._count('hedge_wins')
+                    return future.result()
+                error = future.exception()
+        if pending:
+            self._count('timeouts')
+            raise _AttemptTimeout(f"{timeout:.1f}초 안에 응답이 없습니다")
+        raise error
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            breakers = dict(self._breakers)
+            latencies = {method: sorted(samples) for method, samples in self._latencies.items()}
+        stats['breakers'] = {
+            method: {'state': breaker.state, 'opened': breaker.opened} for method, breaker in breakers.items()
+        }
+        stats['p95_seconds'] = {
+            method: samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            for method, samples in latencies.items() if samples
+        }
+        return stats
+
+
+# 프로세스 전체에서 공유하는 호출기
+caller = ResilientCaller(
+    deadline=config.RESILIENCE_DEADLINE,
+    attempt_timeout=config.RESILIENCE_ATTEMPT_TIMEOUT,
+    attempts=config.RETRY_ATTEMPTS,
+    backoff_base=config.RETRY_BACKOFF_BASE,
+    backoff_max=config.RETRY_BACKOFF_MAX,
+    hedge_methods=[method.strip() for method in config.HEDGE_METHODS.split(',') if method.strip()],
+    hedge_percentile=config.HEDGE_PERCENTILE,
+    hedge_min_delay=config.HEDGE_MIN_DELAY,
+    breaker_failures=config.BREAKER_FAILURES,
+    breaker_open_seconds=config.BREAKER_OPEN_SECONDS,
+    workers=config.RESILIENCE_WORKERS,
+)
+
+_BREAKER_STATES = {'closed': 0, 'half_open': 1, 'open': 2}
+
+
+def _collect_metrics():
+    stats = caller.get_stats()
+    samples = [
+        ('app_youtube_calls_total', {'result': name}, stats[name])
+        for name in ('calls', 'attempts', 'retries', 'hedges', 'hedge_wins', 'timeouts', 'short_circuits', 'unavailable')
+    ]
+    for method, breaker in stats['breakers'].items():
+        samples.append(('app_youtube_breaker_state', {'method': method}, _BREAKER_STATES[breaker['state']]))
+        samples.append(('app_youtube_breaker_opened_total', {'method': method}, breaker['opened']))
+    return samples
+
+
+tracing.register_collector(_collect_metrics)
@@ -0,0 +1,338 @@
+# 세션 간 공유 검색 결과 캐시
+# - TTL이 지난 항목은 stale 기간 동안 즉시 반환하고 백그라운드에서 갱신한다
+# - 같은 키에 대한 동시 miss는 하나의 upstream 호출로 합쳐진다 (single-flight)
+# - 항목 수와 메모리 사용량 상한을 넘으면 설정된 정책으로 제거한다
+# - shared(shared_cache.SharedTier)가 있으면 miss일 때 레플리카 공유 캐시를 먼저 보고, 가져온 값은 공유 캐시에도 쓴다
+import json
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import config
+import quota
+import shared_cache
+import tracing
+
+EVICTION_POLICIES = ('lru', 'lfu', 'fifo')
+
+
+# 검색 파라미터를 정규화해서 캐시 키 생성
+def search_key(keyword, max_results, duration='medium', embeddable=True, page_token=None):
+    keyword = unicodedata.normalize('NFC', keyword)
+    keyword = ' '.join(keyword.split()).lower()
+    return (keyword, int(max_results), duration, bool(embeddable), page_token or '')
+
+
+# 캐시 항목의 대략적인 메모리 크기 (UTF-8 직렬화 기준)
+def estimate_size(value):
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode('utf-8'))
+
+
+class _Entry:
+    __slots__ = ('value', 'size', 'fresh_until', 'stale_until', 'hits')
+
+    def __init__(self, value, size, fresh_until, stale_until):
+        self.value = value
+        self.size = size
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+        self.hits = 0
+
+
+class _Flight:
+    __slots__ = ('done', 'value', 'error', 'priority')
+
+    def __init__(self, priority):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.priority = priority
+
+
+class SearchCache:
+    def __init__(self, ttl, stale_ttl=0, max_entries=1000, max_bytes=None, eviction='lru', clock=time.monotonic,
+                 shared=None):
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"지원하지 않는 캐시 정책입니다: {eviction}")
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.eviction = eviction
+        self.shared = shared
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._bytes = 0
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'refreshes': 0,
+            'evictions': 0,
+            'load_errors': 0,
+            'priority_retries': 0,
+        }
+
+    # 캐시된 값을 반환하고, 없으면 loader()로 가져와 저장한다
+    # priority는 loader가 할당량을 요청하는 우선순위 (사용자 요청은 다른 레플리카를 오래 기다리지 않는다)
+    def get_or_load(self, key, loader, priority=quota.PRIORITY_USER):
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.stale_until:
+                self._touch(key, entry)
+                if now < entry.fresh_until:
+                    self._stats['hits'] += 1
+                    return entry.value
+                # stale 항목은 바로 반환하고 갱신은 백그라운드에서
+                self._stats['stale_hits'] += 1
+                if key not in self._flights:
+                    flight = self._flights[key] = _Flight(priority)
+                    self._stats['refreshes'] += 1
+                    threading.Thread(target=self._run_flight, args=(key, loader, flight, priority), daemon=True).start()
+                return entry.value
+
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._stats['coalesced'] += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight(priority)
+                self._stats['misses'] += 1
+                leader = True
+
+        if leader:
+            self._run_flight(key, loader, flight, priority)
+        else:
+            flight.done.wait()
+            # 낮은 우선순위(prefetch 등)로 진행 중이던 호출이 할당량 부족으로 실패했으면
+            # 그 오류를 물려받지 않고 자기 우선순위로 다시 시도한다
+            if isinstance(flight.error, quota.QuotaExhausted) and priority < flight.priority:
+                with self._lock:
+                    self._stats['priority_retries'] += 1
+                return self.get_or_load(key, loader, priority)
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    # 메모리 캐시에 있는 값만 {key: value}로 반환 (stale 항목 포함, hit/miss를 센다)
+    def get_many(self, keys):
+        now = self._clock()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and now < entry.stale_until:
+                    self._touch(key, entry)
+                    found[key] = entry.value
+            self._stats['hits'] += len(found)
+            self._stats['misses'] += len(keys) - len(found)
+        return found
+
+    # 캐시에 있는 값만 반환 (없으면 None)
+    # allow_expired=True이면 stale 기간이 지났어도 아직 제거되지 않은 값을 반환한다
+    def peek(self, key, allow_stale=True, allow_expired=False):
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if (
+                allow_expired
+                or now < entry.fresh_until
+                or (allow_stale and now < entry.stale_until)
+            ):
+                return entry.value
+        return None
+
+    # 신선한 항목이 있거나 이미 가져오는 중인지 확인
+    def has(self, key):
+        now = self._clock()
+        with self._lock:
+            if key in self._flights:
+                return True
+            entry = self._entries.get(key)
+            return entry is not None and now < entry.fresh_until
+
+    # 신선한 기간이 몇 초 남았는지 (없으면 None)
+    # 메모리 캐시 → 공유 캐시 순서로 보고, 공유 캐시는 그 계층의 TTL과 저장 후 지난 시간으로 계산한다
+    def fresh_for(self, key):
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.fresh_until:
+                return entry.fresh_until - now
+        if self.shared is None:
+            return None
+        found = self.shared.get(key)
+        if found is None:
+            return None
+        value, age = found
+        self._put_local(key, value, age)
+        return max(0.0, self.shared.ttl - age)
+
+    # 캐시 여부와 관계없이 loader()로 다시 가져와 저장 (warm-up 갱신용)
+    def refresh(self, key, loader):
+        value = loader()
+        self.put(key, value)
+        return value
+
+    # 저장 (공유 캐시가 있으면 공유 캐시에도 쓴다)
+    def put(self, key, value):
+        self._put_local(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value)
+
+    def put_many(self, items):
+        for key, value in items.items():
+            self._put_local(key, value)
+        if self.shared is not None:
+            self.shared.set_many(items)
+
+    # 공유 캐시에서 키들을 찾아 메모리 캐시에 채우고 {key: value}로 반환
+    def fetch_shared(self, keys):
+        if self.shared is None or not keys:
+            return {}
+        found = self.shared.get_many(keys)
+        for key, (value, age) in found.items():
+            self._put_local(key, value, age)
+        return {key: value for key, (value, _) in found.items()}
+
+    # age: 다른 레플리카가 저장한 뒤 지난 시간 (그만큼 신선한 기간이 줄어든다)
+    def _put_local(self, key, value, age=0.0):
+        size = estimate_size(value)
+        fresh_until = self._clock() + max(0.0, self.ttl - age)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = _Entry(value, size, fresh_until, fresh_until + self.stale_ttl)
+            self._bytes += size
+            self._evict()
+
+    def invalidate(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+            stats['in_flight'] = len(self._flights)
+        if self.shared is not None:
+            stats['shared'] = self.shared.get_stats()
+        return stats
+
+    # 공유 캐시 → loader 순서로 값을 가져온다
+    # 다른 레플리카가 같은 키를 가져오는 중(lease)이면 loader 대신 그 결과를 기다리고,
+    # 그 레플리카가 값 없이 lease를 놓았거나 기다리는 시간이 지나면 lease를 다시 잡고 직접 가져온다
+    # (사용자 요청은 SHARED_CACHE_USER_WAIT까지만 기다린다)
+    def _load(self, key, loader, priority=quota.PRIORITY_USER):
+        if self.shared is None:
+            value = loader()
+            self._put_local(key, value)
+            return value
+        token = None
+        found = self.shared.get(key)
+        if found is None:
+            token = self.shared.acquire(key)
+            if token is None:
+                max_wait = config.SHARED_CACHE_USER_WAIT if priority == quota.PRIORITY_USER else None
+                found = self.shared.wait_for(key, max_wait)
+                if found is None:
+                    # 아직 다른 레플리카가 가지고 있으면 lease 없이 가져온다
+                    token = self.shared.acquire(key)
+        if found is not None:
+            value, age = found
+            self._put_local(key, value, age)
+            return value
+        try:
+            value = loader()
+            self.put(key, value)
+        finally:
+            if token is not None:
+                self.shared.release(key, token)
+        return value
+
+    def _run_flight(self, key, loader, flight, priority=quota.PRIORITY_USER):
+        try:
+            flight.value = self._load(key, loader, priority)
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._stats['load_errors'] += 1
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _touch(self, key, entry):
+        entry.hits += 1
+        if self.eviction == 'lru':
+            self._entries.move_to_end(key)
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            if self.eviction == 'lfu':
+                victim = min(self._entries, key=lambda k: self._entries[k].hits)
+                entry = self._entries.pop(victim)
+            else:
+                _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._stats['evictions'] += 1
+
+
+# 프로세스 전체에서 공유하는 검색 결과 캐시
+# 공유 캐시 hit 한 번은 search.list와 videos.list 한 번씩을 아낀다
+search_cache = SearchCache(
+    ttl=config.SEARCH_CACHE_TTL,
+    stale_ttl=config.SEARCH_CACHE_STALE_TTL,
+    max_entries=config.SEARCH_CACHE_MAX_ENTRIES,
+    max_bytes=config.SEARCH_CACHE_MAX_BYTES,
+    eviction=config.SEARCH_CACHE_EVICTION,
+    shared=shared_cache.tier(
+        'search', config.SHARED_CACHE_SEARCH_TTL,
+        saved_units_per_hit=quota.method_cost('youtube.search.list') + quota.method_cost('youtube.videos.list'),
+    ),
+)
+
+_metric_caches = {'search': search_cache}
+
+
+# /metrics에 내보낼 캐시 (이름 → SearchCache)
+def register_metrics(name, cache):
+    _metric_caches[name] = cache
+
+
+# 계층별 캐시 요청 수 (hit 비율은 hit / (hit + miss))
+def _collect_metrics():
+    samples = []
+    for name, cache in _metric_caches.items():
+        stats = cache.get_stats()
+        for result in ('hits', 'stale_hits', 'misses', 'coalesced'):
+            samples.append(('app_cache_requests_total', {'cache': name, 'tier': 'local', 'result': result}, stats[result]))
+        samples.append(('app_cache_entries', {'cache': name, 'tier': 'local'}, stats['entries']))
+        shared = stats.get('shared')
+        if shared:
+            for result in ('hits', 'misses', 'errors', 'skipped', 'lease_waits', 'lease_wait_hits'):
+                samples.append(('app_cache_requests_total', {'cache': name, 'tier': 'shared', 'result': result}, shared[result]))
+            samples.append(('app_cache_quota_units_saved_total', {'cache': name}, shared['quota_units_saved']))
+    return samples
+
+
+tracing.register_collector(_collect_metrics)
@@ -0,0 +1,56 @@
+# 세션 메모리 사용량 계산
+# st.session_state의 키별로 객체 그래프를 따라가며 sys.getsizeof를 더한다.
+# 한 세션 안에서 여러 번 참조되는 객체는 한 번만 센다. 함수, 모듈, 클래스, 진행 중인 Future처럼
+# 세션 밖의 것을 가리키는 객체는 따라가지 않는다. 검색 캐시와 함께 쓰는 문자열도 세션 몫으로 세므로
+# 결과는 세션이 붙잡고 있는 메모리의 상한이다.
+import sys
+import types
+from collections import deque
+from concurrent.futures import Future
+
+_OPAQUE = (
+    types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType, type, Future, memoryview,
+)
+_ATOMIC = (str, bytes, bytearray, int, float, complex, bool, type(None))
+
+
+def _slots(cls):
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get('__slots__', ())
+        yield from ((slots,) if isinstance(slots, str) else slots)
+
+
+# obj에서 닿는 객체 크기의 합 (seen에 있는 객체는 건너뛰고, 센 객체를 seen에 넣는다)
+def deep_size(obj, seen=None):
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _OPAQUE):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, _ATOMIC):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        else:
+            for name in _slots(type(obj)):
+                if name not in ('__dict__', '__weakref__') and hasattr(obj, name):
+                    stack.append(getattr(obj, name))
+            if hasattr(obj, '__dict__'):
+                stack.append(obj.__dict__)
+    return total
+
+
+# 세션 상태의 키별 메모리 [{'key', 'bytes'}] (큰 순서) 와 합계
+# 앞의 키에서 이미 센 객체는 뒤의 키에서 다시 세지 않는다
+def session_report(state):
+    seen = set()
+    rows = [{'key': str(key), 'bytes': deep_size(value, seen)} for key, value in state.items()]
+    rows.sort(key=lambda row: row['bytes'], reverse=True)
+    return rows, sum(row['bytes'] for row in rows)
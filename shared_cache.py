@@ -0,0 +1,650 @@
+# 레플리카 공유 캐시 (2차 캐시)
+# 여러 Streamlit 레플리카가 검색 결과와 영상 상세 정보를 공유해서, 같은 검색에는 할당량을 한 번만 쓴다.
+# 프로세스 메모리 캐시(search_cache.SearchCache)에 없을 때 이 캐시를 먼저 보고, 새로 가져온 값은 여기에도 쓴다.
+# - 백엔드: 공유 볼륨의 SQLite 파일(sqlite:////절대경로) 또는 Redis 프로토콜 서버(redis://호스트:포트/DB)
+#   Redis가 없으면 `python shared_cache.py serve --port 6380`으로 띄우는 작은 RESP 서버로 대신할 수 있다
+# - 값은 검색 페이지와 상세 정보 전용 이진 형식으로 저장한다 (큰 값은 zlib 압축)
+# - 항목 종류(search, details)별 TTL
+# - 한 레플리카가 키를 가져오는 동안 lease를 잡고, 다른 레플리카는 upstream 대신 그 결과를 기다린다
+# - 백엔드 오류는 miss로 처리하고 잠시 공유 캐시를 건너뛴다 (검색은 메모리 캐시와 API로 계속 동작)
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import struct
+import threading
+import time
+import uuid
+import zlib
+from urllib.parse import urlsplit
+
+import config
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'ytcur:v1'
+
+_KIND_PAGE = ord('P')
+_KIND_DETAILS = ord('D')
+_KIND_JSON = ord('J')
+_FLAG_ZLIB = 1
+_STORED_AT = struct.Struct('>d')
+_PAGE_TEXT_FIELDS = ('id', 'title', 'channel')
+_PAGE_INT_FIELDS = ('duration', 'views')
+
+
+class SharedCacheError(Exception):
+    pass
+
+
+# ---- 직렬화 ----
+
+def _write_varint(out, value):
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _write_text(out, text):
+    encoded = text.encode('utf-8')
+    _write_varint(out, len(encoded))
+    out += encoded
+
+
+def _read_text(data, pos):
+    length, pos = _read_varint(data, pos)
+    return data[pos:pos + length].decode('utf-8'), pos + length
+
+
+# 없는 값(None)은 0, 나머지는 값 + 1
+def _write_optional(out, value):
+    _write_varint(out, 0 if value is None else value + 1)
+
+
+def _read_optional(data, pos):
+    value, pos = _read_varint(data, pos)
+    return (None if value == 0 else value - 1), pos
+
+
+def _is_count(value):
+    return value is None or (type(value) is int and value >= 0)
+
+
+def _is_page(value):
+    return (
+        isinstance(value, dict)
+        and value.keys() == {'items', 'next_page_token'}
+        and (value['next_page_token'] is None or isinstance(value['next_page_token'], str))
+        and all(
+            isinstance(item, dict)
+            and item.keys() <= {*_PAGE_TEXT_FIELDS, *_PAGE_INT_FIELDS}
+            and all(isinstance(item.get(name), str) for name in _PAGE_TEXT_FIELDS)
+            and all(_is_count(item.get(name)) for name in _PAGE_INT_FIELDS)
+            for item in value['items']
+        )
+    )
+
+
+def _is_details(value):
+    return (
+        isinstance(value, dict)
+        and value.keys() == set(_PAGE_INT_FIELDS)
+        and all(_is_count(value[name]) for name in _PAGE_INT_FIELDS)
+    )
+
+
+# 검색 페이지 {'items': [{id, title, channel, duration?, views?}], 'next_page_token'}와
+# 상세 정보 {'duration', 'views'}는 전용 형식으로, 나머지는 JSON으로 직렬화한다
+def encode(value, compress_min_bytes=None):
+    compress_min_bytes = config.SHARED_CACHE_COMPRESS_MIN_BYTES if compress_min_bytes is None else compress_min_bytes
+    body = bytearray()
+    if _is_page(value):
+        kind = _KIND_PAGE
+        _write_text(body, value['next_page_token'] or '')
+        _write_varint(body, len(value['items']))
+        for item in value['items']:
+            for name in _PAGE_TEXT_FIELDS:
+                _write_text(body, item[name])
+            for name in _PAGE_INT_FIELDS:
+                _write_optional(body, item.get(name))
+    elif _is_details(value):
+        kind = _KIND_DETAILS
+        for name in _PAGE_INT_FIELDS:
+            _write_optional(body, value[name])
+    else:
+        kind = _KIND_JSON
+        body += json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    flags = 0
+    if len(body) >= compress_min_bytes:
+        compressed = zlib.compress(bytes(body), 6)
+        if len(compressed) < len(body):
+            body, flags = compressed, _FLAG_ZLIB
+    return bytes((kind, flags)) + bytes(body)
+
+
+def decode(data):
+    kind, flags = data[0], data[1]
+    body = zlib.decompress(data[2:]) if flags & _FLAG_ZLIB else data[2:]
+    if kind == _KIND_JSON:
+        return json.loads(body)
+    pos = 0
+    if kind == _KIND_DETAILS:
+        duration, pos = _read_optional(body, pos)
+        views, pos = _read_optional(body, pos)
+        return {'duration': duration, 'views': views}
+    if kind != _KIND_PAGE:
+        raise SharedCacheError(f"알 수 없는 캐시 값 형식: {kind}")
+    token, pos = _read_text(body, pos)
+    count, pos = _read_varint(body, pos)
+    items = []
+    for _ in range(count):
+        item = {}
+        for name in _PAGE_TEXT_FIELDS:
+            item[name], pos = _read_text(body, pos)
+        for name in _PAGE_INT_FIELDS:
+            value, pos = _read_optional(body, pos)
+            if value is not None:
+                item[name] = value
+        items.append(item)
+    return {'items': items, 'next_page_token': token or None}
+
+
+# ---- 백엔드 ----
+# get_many(keys) → [bytes 또는 None], set_many([(key, bytes)], ttl), add(key, bytes, ttl) → bool (없을 때만 저장),
+# delete_if(key, bytes) (값이 같을 때만 삭제)
+
+# 공유 볼륨의 SQLite 파일 (WAL 모드, 레플리카마다 연결 하나)
+class SqliteBackend:
+    CLEANUP_EVERY = 1000  # 쓰기 이만큼마다 만료 항목 정리
+
+    def __init__(self, path, clock=time.time):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS shared_cache ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID"
+        )
+
+    def get_many(self, keys):
+        if not keys:
+            return []
+        placeholders = ','.join('?' * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, value FROM shared_cache WHERE key IN ({placeholders}) AND expires_at > ?",
+                (*keys, self._clock()),
+            ).fetchall()
+        found = dict(rows)
+        return [found.get(key) for key in keys]
+
+    def set_many(self, items, ttl):
+        expires_at = self._clock() + ttl
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO shared_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                [(key, value, expires_at) for key, value in items],
+            )
+            self._writes += len(items)
+            if self._writes >= self.CLEANUP_EVERY:
+                self._writes = 0
+                self._conn.execute("DELETE FROM shared_cache WHERE expires_at <= ?", (self._clock(),))
+
+    def add(self, key, value, ttl):
+        now = self._clock()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO shared_cache (key, value, expires_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at"
+                " WHERE shared_cache.expires_at <= ?",
+                (key, value, now + ttl, now),
+            )
+            return cursor.rowcount > 0
+
+    def delete_if(self, key, value):
+        with self._lock:
+            self._conn.execute("DELETE FROM shared_cache WHERE key = ? AND value = ?", (key, value))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RespError(SharedCacheError):
+    pass
+
+
+def _resp_command(*args):
+    out = bytearray(f"*{len(args)}\r\n".encode())
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode('utf-8')
+        elif isinstance(arg, (int, float)):
+            arg = str(arg).encode()
+        out += f"${len(arg)}\r\n".encode() + arg + b"\r\n"
+    return out
+
+
+def _read_reply(stream):
+    line = stream.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("RESP 연결이 끊어졌습니다")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b'+':
+        return rest.decode()
+    if kind == b'-':
+        raise RespError(rest.decode('utf-8', 'replace'))
+    if kind == b':':
+        return int(rest)
+    if kind == b'$':
+        length = int(rest)
+        if length < 0:
+            return None
+        data = stream.read(length + 2)
+        if len(data) != length + 2:
+            raise ConnectionError("RESP 연결이 끊어졌습니다")
+        return data[:-2]
+    if kind == b'*':
+        count = int(rest)
+        return None if count < 0 else [_read_reply(stream) for _ in range(count)]
+    raise RespError(f"알 수 없는 RESP 응답: {line!r}")
+
+
+# Redis 프로토콜(RESP2) 서버. 요청마다 유휴 연결을 빌려 쓰고 돌려준다
+class RespBackend:
+    MAX_IDLE_CONNECTIONS = 8
+
+    def __init__(self, host, port, db=0, password=None, timeout=1.0):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle = []
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        connection = (sock, sock.makefile('rb'))
+        if self.password:
+            self._send(connection, [('AUTH', self.password)])
+        if self.db:
+            self._send(connection, [('SELECT', self.db)])
+        return connection
+
+    @staticmethod
+    def _send(connection, commands):
+        sock, stream = connection
+        sock.sendall(b''.join(_resp_command(*command) for command in commands))
+        replies = []
+        error = None
+        for _ in commands:
+            try:
+                replies.append(_read_reply(stream))
+            except RespError as e:
+                error = error or e
+                replies.append(None)
+        if error:
+            raise error
+        return replies
+
+    # 여러 명령을 한 번에 보내고 (pipeline) 응답 목록을 받는다
+    def pipeline(self, commands):
+        with self._lock:
+            connection = self._idle.pop() if self._idle else None
+        if connection is None:
+            connection = self._connect()
+        try:
+            replies = self._send(connection, commands)
+        except (OSError, ConnectionError):
+            connection[0].close()
+            raise
+        with self._lock:
+            if len(self._idle) < self.MAX_IDLE_CONNECTIONS:
+                self._idle.append(connection)
+                connection = None
+        if connection is not None:
+            connection[0].close()
+        return replies
+
+    def get_many(self, keys):
+        if not keys:
+            return []
+        return self.pipeline([('MGET', *keys)])[0]
+
+    def set_many(self, items, ttl):
+        if items:
+            self.pipeline([('SET', key, value, 'PX', int(ttl * 1000)) for key, value in items])
+
+    def add(self, key, value, ttl):
+        return self.pipeline([('SET', key, value, 'NX', 'PX', int(ttl * 1000))])[0] == 'OK'
+
+    # GET 후 DEL이라 원자적이지 않다. lease는 TTL로도 풀리므로 드물게 남의 lease를 지워도 괜찮다
+    def delete_if(self, key, value):
+        if self.pipeline([('GET', key)])[0] == value:
+            self.pipeline([('DEL', key)])
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for sock, _ in idle:
+            sock.close()
+
+
+def open_backend(url):
+    parts = urlsplit(url)
+    if parts.scheme == 'sqlite':
+        # SQLAlchemy와 같은 형식: sqlite:///상대경로, sqlite:////절대경로
+        return SqliteBackend(parts.netloc + parts.path[1:])
+    if parts.scheme == 'redis':
+        return RespBackend(
+            parts.hostname or '127.0.0.1',
+            parts.port or 6379,
+            db=int(parts.path.strip('/') or 0),
+            password=parts.password,
+            timeout=config.SHARED_CACHE_TIMEOUT,
+        )
+    raise ValueError(f"지원하지 않는 SHARED_CACHE_URL: {url} (sqlite:///경로 또는 redis://호스트:포트/DB)")
+
+
+_backend_lock = threading.Lock()
+_backend = None
+
+
+# 프로세스 전체에서 공유하는 백엔드 (처음 사용할 때 연결)
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = open_backend(config.SHARED_CACHE_URL)
+    return _backend
+
+
+# ---- 캐시 계층 ----
+
+# 한 종류(search, details)의 공유 캐시. 키는 문자열이나 JSON으로 바꿀 수 있는 값
+class SharedTier:
+    def __init__(self, namespace, ttl, backend=None, lease_seconds=None, poll_interval=None,
+                 retry_seconds=None, saved_units_per_hit=0, clock=time.monotonic):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.lease_seconds = config.SHARED_CACHE_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        self.poll_interval = config.SHARED_CACHE_LEASE_POLL if poll_interval is None else poll_interval
+        self.retry_seconds = config.SHARED_CACHE_RETRY_SECONDS if retry_seconds is None else retry_seconds
+        self.saved_units_per_hit = saved_units_per_hit
+        self._backend = backend
+        self._clock = clock
+        self._owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'errors': 0,
+            'skipped': 0,
+            'writes': 0,
+            'bytes_read': 0,
+            'bytes_written': 0,
+            'leases': 0,
+            'lease_waits': 0,
+            'lease_wait_hits': 0,
+            'lease_wait_released': 0,
+        }
+
+    def _key(self, key):
+        if not isinstance(key, str):
+            key = json.dumps(key, ensure_ascii=False, separators=(',', ':'))
+        return f"{KEY_PREFIX}:{self.namespace}:{key}"
+
+    def _count(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                self._stats[name] += value
+
+    # 백엔드 호출. 오류가 나면 default를 반환하고 retry_seconds 동안 공유 캐시를 건너뛴다
+    def _call(self, fn, default):
+        if self._clock() < self._down_until:
+            self._count(skipped=1)
+            return default
+        try:
+            return fn(self._backend or get_backend())
+        except Exception as e:
+            self._down_until = self._clock() + self.retry_seconds
+            self._count(errors=1)
+            logger.warning("공유 캐시 오류 (%s초 동안 건너뜀): %s", self.retry_seconds, e)
+            return default
+
+    # 저장된 bytes → (value, 저장된 지 지난 초). 읽을 수 없으면 None
+    def _decode(self, key, data, now):
+        try:
+            (stored_at,) = _STORED_AT.unpack_from(data)
+            return decode(data[_STORED_AT.size:]), max(0.0, now - stored_at)
+        except Exception:
+            logger.warning("공유 캐시 값을 읽지 못했습니다: %s", key, exc_info=True)
+            return None
+
+    # {key: (value, 저장된 지 지난 초)}. 백엔드를 쓸 수 없으면 None
+    def _fetch(self, keys):
+        raw = self._call(lambda backend: backend.get_many([self._key(key) for key in keys]), None)
+        if raw is None:
+            return None
+        found = {}
+        size = 0
+        now = time.time()
+        for key, data in zip(keys, raw):
+            if data is None:
+                continue
+            entry = self._decode(key, data, now)
+            if entry is None:
+                continue
+            found[key] = entry
+            size += len(data)
+        self._count(bytes_read=size)
+        return found
+
+    # {key: (value, 저장된 지 지난 초)}. 없는 키는 빠진다
+    def get_many(self, keys):
+        keys = list(keys)
+        found = self._fetch(keys)
+        if found is None:
+            return {}
+        self._count(hits=len(found), misses=len(keys) - len(found))
+        return found
+
+    # (value, 저장된 지 지난 초) 또는 None
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def set_many(self, items):
+        header = _STORED_AT.pack(time.time())
+        encoded = [(self._key(key), header + encode(value)) for key, value in items.items()]
+        if not encoded:
+            return
+        if self._call(lambda backend: backend.set_many(encoded, self.ttl) or True, False):
+            self._count(writes=len(encoded), bytes_written=sum(len(value) for _, value in encoded))
+
+    def set(self, key, value):
+        self.set_many({key: value})
+
+    # 키를 가져오는 동안 다른 레플리카가 같은 키를 가져오지 않도록 lease를 잡는다
+    # 잡았으면 토큰, 다른 레플리카가 가지고 있으면 None. 백엔드 오류면 lease 없이 진행하도록 토큰을 준다
+    def acquire(self, key):
+        token = f"{self._owner}:{uuid.uuid4().hex[:8]}".encode()
+        acquired = self._call(lambda backend: backend.add(self._key(f"lease:{key}"), token, self.lease_seconds), None)
+        if acquired is False:
+            return None
+        if acquired:
+            self._count(leases=1)
+        return token
+
+    def release(self, key, token):
+        self._call(lambda backend: backend.delete_if(self._key(f"lease:{key}"), token), None)
+
+    # lease를 가진 레플리카가 값을 채울 때까지 기다린다 (최대 lease 시간, max_wait이 있으면 그만큼)
+    # 값과 lease를 한 번에 읽어서, 값 없이 lease가 풀렸거나(가져오기 실패) 백엔드를 쓸 수 없으면 바로 None
+    # None이면 호출한 쪽이 다시 acquire()하고 직접 가져온다
+    def wait_for(self, key, max_wait=None):
+        self._count(lease_waits=1)
+        wait = self.lease_seconds if max_wait is None else min(max_wait, self.lease_seconds)
+        deadline = self._clock() + wait
+        keys = [self._key(key), self._key(f"lease:{key}")]
+        while self._clock() < deadline:
+            time.sleep(self.poll_interval)
+            raw = self._call(lambda backend: backend.get_many(keys), None)
+            if raw is None:
+                return None
+            data, lease = raw
+            if data is not None:
+                found = self._decode(key, data, time.time())
+                if found is not None:
+                    self._count(lease_wait_hits=1, bytes_read=len(data))
+                    return found
+            if lease is None:
+                self._count(lease_wait_released=1)
+                return None
+        return None
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        stats['quota_units_saved'] = (stats['hits'] + stats['lease_wait_hits']) * self.saved_units_per_hit
+        return stats
+
+
+# 공유 캐시가 설정되어 있으면 namespace의 SharedTier, 아니면 None
+def tier(namespace, ttl, saved_units_per_hit=0):
+    if not config.SHARED_CACHE_URL:
+        return None
+    return SharedTier(namespace, ttl, saved_units_per_hit=saved_units_per_hit)
+
+
+# ---- 로컬 대체 서버 ----
+# Redis 대신 쓸 수 있는 최소 RESP 서버 (개발, 벤치마크용. 메모리에만 저장)
+# 지원 명령: PING, GET, MGET, SET [NX] [EX|PX], DEL, SELECT, AUTH, DBSIZE, FLUSHDB
+
+class RespStandIn:
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._data = {}
+
+    def _get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self._clock():
+            del self._data[key]
+            return None
+        return value
+
+    def execute(self, args):
+        name = args[0].upper()
+        if name == b'PING':
+            return '+PONG'
+        if name in (b'SELECT', b'AUTH'):
+            return '+OK'
+        if name == b'GET':
+            return self._get(args[1])
+        if name == b'MGET':
+            return [self._get(key) for key in args[1:]]
+        if name == b'DEL':
+            return sum(1 for key in args[1:] if self._data.pop(key, None) is not None)
+        if name == b'DBSIZE':
+            return len(self._data)
+        if name == b'FLUSHDB':
+            self._data.clear()
+            return '+OK'
+        if name == b'SET':
+            key, value, options = args[1], args[2], [arg.upper() for arg in args[3:]]
+            expires_at = None
+            if b'PX' in options:
+                expires_at = self._clock() + int(options[options.index(b'PX') + 1]) / 1000
+            elif b'EX' in options:
+                expires_at = self._clock() + int(options[options.index(b'EX') + 1])
+            if b'NX' in options and self._get(key) is not None:
+                return None
+            self._data[key] = (value, expires_at)
+            return '+OK'
+        return f"-ERR unknown command '{name.decode('utf-8', 'replace')}'"
+
+    @staticmethod
+    def _encode(reply):
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, str):
+            return reply.encode() + b"\r\n"
+        if isinstance(reply, int):
+            return f":{reply}\r\n".encode()
+        if isinstance(reply, list):
+            return f"*{len(reply)}\r\n".encode() + b''.join(RespStandIn._encode(item) for item in reply)
+        return f"${len(reply)}\r\n".encode() + reply + b"\r\n"
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                count = int(line[1:-2])
+                args = []
+                for _ in range(count):
+                    length = int((await reader.readline())[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                writer.write(self._encode(self.execute(args)))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve_stand_in(host, port):
+    server = await asyncio.start_server(RespStandIn().handle, host, port)
+    for sock in server.sockets:
+        logger.info("공유 캐시 대체 서버 시작: %s", sock.getsockname())
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help="Redis 대신 쓸 RESP 서버 실행")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=6380)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == 'serve':
+        asyncio.run(serve_stand_in(args.host, args.port))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+# 모르는 테마를 위한 유사 테마 검색
+# 카탈로그 테마를 문자 n-gram TF-IDF 벡터로 만들어 디스크에 저장하고 memory-map으로 읽는다.
+# 벡터는 n-gram 버킷별 역색인(CSC) 형태로 저장하므로, 질의에 나온 n-gram의 posting만 모아
+# 한 번의 벡터 연산으로 코사인 유사도를 계산한다. 네트워크 없이 동작한다.
+# numpy는 색인을 처음 만들거나 열 때 불러온다 (카탈로그에 있는 테마만 검색하면 필요 없음).
+import hashlib
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+import zlib
+from collections import Counter, defaultdict
+
+import config
+import keyword_index
+
+NGRAM_SIZES = (2, 3)
+# 작은 카탈로그에서는 흔한 n-gram도 그대로 색인한다
+MIN_MAX_DF = 1000
+INDEX_VERSION = 2
+_ARRAYS = ('indptr', 'theme_ids', 'weights', 'idf')
+
+
+def _ngrams(text):
+    text = ' '.join(text.split())
+    padded = f" {text} "
+    grams = Counter()
+    for n in NGRAM_SIZES:
+        for i in range(len(padded) - n + 1):
+            grams[padded[i:i + n]] += 1
+    return grams
+
+
+def _bucket(gram, dims):
+    return zlib.crc32(gram.encode('utf-8')) % dims
+
+
+# n-gram 빈도를 버킷별 (1 + log tf) 가중치로 변환
+def _bucket_tf(text, dims):
+    tf = defaultdict(float)
+    for gram, count in _ngrams(text).items():
+        tf[_bucket(gram, dims)] += count
+    return {bucket: 1.0 + math.log(count) for bucket, count in tf.items()}
+
+
+def catalog_fingerprint(themes, dims, max_df_ratio):
+    digest = hashlib.sha1(f"{INDEX_VERSION}:{dims}:{max_df_ratio}".encode('utf-8'))
+    for theme in themes:
+        digest.update(theme.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+# 테마 목록으로 역색인 배열을 만들어 path 디렉터리에 저장
+# 너무 많은 테마에 등장하는 n-gram(max_df_ratio 초과)은 변별력이 낮고 posting만 길어지므로 제외한다
+def build_index(themes, path, dims, max_df_ratio=None):
+    import numpy as np
+    max_df_ratio = config.THEME_SIMILARITY_MAX_DF if max_df_ratio is None else max_df_ratio
+    themes = list(themes)
+    rows = [_bucket_tf(theme, dims) for theme in themes]
+    df = np.zeros(dims, dtype=np.int64)
+    for row in rows:
+        for bucket in row:
+            df[bucket] += 1
+    idf = np.log((1 + len(themes)) / (1 + df)).astype(np.float32) + 1.0
+    max_df = max(MIN_MAX_DF, int(len(themes) * max_df_ratio))
+    idf[df > max_df] = 0.0
+
+    # 테마 벡터를 L2 정규화한 뒤 버킷별 posting 목록으로 모은다
+    postings = defaultdict(list)
+    for theme_id, row in enumerate(rows):
+        norm = math.sqrt(sum((weight * idf[bucket]) ** 2 for bucket, weight in row.items())) or 1.0
+        for bucket, weight in row.items():
+            if idf[bucket] > 0:
+                postings[bucket].append((theme_id, weight * idf[bucket] / norm))
+
+    indptr = np.zeros(dims + 1, dtype=np.int64)
+    for bucket, entries in postings.items():
+        indptr[bucket + 1] = len(entries)
+    np.cumsum(indptr, out=indptr)
+    theme_ids = np.empty(indptr[-1], dtype=np.int32)
+    weights = np.empty(indptr[-1], dtype=np.float32)
+    for bucket, entries in postings.items():
+        start = indptr[bucket]
+        theme_ids[start:start + len(entries)] = [theme_id for theme_id, _ in entries]
+        weights[start:start + len(entries)] = [weight for _, weight in entries]
+
+    # 옆의 임시 디렉터리에 다 쓴 뒤 한 번에 바꿔서, 다른 프로세스가 쓰다 만 색인을 읽지 않게 한다
+    path = os.path.abspath(path)
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=f"{os.path.basename(path)}.tmp-", dir=parent)
+    try:
+        for name, array in zip(_ARRAYS, (indptr, theme_ids, weights, idf)):
+            with open(os.path.join(tmp, f"{name}.npy"), 'wb') as f:
+                np.save(f, array)
+                f.flush()
+                os.fsync(f.fileno())
+        with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'fingerprint': catalog_fingerprint(themes, dims, max_df_ratio),
+                'dims': dims,
+                'themes': themes,
+            }, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        _swap_dir(tmp, path)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+# 비어 있지 않은 디렉터리는 os.replace로 덮어쓸 수 없으므로 기존 색인을 옆으로 옮긴 뒤 바꾼다
+# (이미 열린 색인은 mmap이라 옮기거나 지워도 계속 읽을 수 있다)
+def _swap_dir(tmp, path):
+    old = f"{tmp}.old"
+    try:
+        os.replace(path, old)
+    except FileNotFoundError:
+        pass
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        # 그 사이 다른 프로세스가 같은 색인을 먼저 옮겨 놓았으면 그것을 쓴다
+        if not os.path.isdir(path):
+            if os.path.isdir(old):
+                os.replace(old, path)
+            raise
+    finally:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+class ThemeSimilarityIndex:
+    def __init__(self, path):
+        import numpy as np
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        self.fingerprint = meta['fingerprint']
+        self.dims = meta['dims']
+        self.themes = meta['themes']
+        # np.memmap 하위 클래스 대신 같은 매핑을 가리키는 ndarray로 다뤄 슬라이싱 비용을 줄인다
+        arrays = {
+            name: np.asarray(np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r'))
+            for name in _ARRAYS
+        }
+        self._indptr = arrays['indptr']
+        self._theme_ids = arrays['theme_ids']
+        self._weights = arrays['weights']
+        self._idf = arrays['idf']
+
+    # 질의와 코사인 유사도가 높은 테마 (theme, score) 목록
+    def nearest(self, text, top_k=5):
+        import numpy as np
+        tf = _bucket_tf(text, self.dims)
+        if not tf:
+            return []
+        buckets = np.fromiter(tf.keys(), dtype=np.int64, count=len(tf))
+        query = np.fromiter(tf.values(), dtype=np.float32, count=len(tf)) * self._idf[buckets]
+        norm = float(np.linalg.norm(query))
+        if norm == 0:
+            return []
+        query /= norm
+
+        starts = self._indptr[buckets]
+        ends = self._indptr[buckets + 1]
+        ids = [self._theme_ids[s:e] for s, e in zip(starts, ends) if e > s]
+        if not ids:
+            return []
+        vals = [self._weights[s:e] * q for s, e, q in zip(starts, ends, query) if e > s]
+        candidates, inverse = np.unique(np.concatenate(ids), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(vals))
+
+        top_k = min(top_k, len(candidates))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.themes[candidates[i]], float(scores[i])) for i in top]
+
+
+# 유사 테마들의 키워드를 유사도 가중치로 섞어서 반환 (충분히 비슷한 테마가 없으면 None)
+def blend_keywords(matches, keywords_for, limit=5, min_score=None):
+    min_score = config.THEME_SIMILARITY_MIN_SCORE if min_score is None else min_score
+    votes = {}
+    for theme, score in matches:
+        if score < min_score:
+            continue
+        for rank, keyword in enumerate(keywords_for(theme)):
+            # 각 테마 안에서 앞쪽 키워드에 조금 더 높은 가중치
+            votes[keyword] = votes.get(keyword, 0.0) + score / (1 + 0.1 * rank)
+    if not votes:
+        return None
+    return sorted(votes, key=votes.get, reverse=True)[:limit]
+
+
+# 카탈로그와 같은 버전의 인덱스를 디스크에서 열고, 없거나 오래됐으면 새로 만든다
+def open_index(themes, path, dims, max_df_ratio=None):
+    max_df_ratio = config.THEME_SIMILARITY_MAX_DF if max_df_ratio is None else max_df_ratio
+    themes = list(themes)
+    fingerprint = catalog_fingerprint(themes, dims, max_df_ratio)
+    try:
+        index = ThemeSimilarityIndex(path)
+        if index.fingerprint == fingerprint:
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+    build_index(themes, path, dims, max_df_ratio)
+    return ThemeSimilarityIndex(path)
+
+
+_lock = threading.Lock()
+_index = None
+
+
+def get_index():
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index = open_index(
+                    keyword_index.get_index().themes(),
+                    config.THEME_SIMILARITY_INDEX_DIR,
+                    config.THEME_SIMILARITY_DIMS,
+                )
+    return _index
+
+
+# 카탈로그와 정확히 일치하지 않는 테마에 대해 유사 테마 키워드를 반환
+def similar_keywords(theme, limit=5):
+    text = keyword_index.normalize_theme(theme)
+    if not text:
+        return None
+    matches = get_index().nearest(text, top_k=config.THEME_SIMILARITY_TOP_K)
+    return blend_keywords(matches, keyword_index.get_index().keywords_for, limit)
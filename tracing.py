@@ -0,0 +1,354 @@
+# 성능 추적 (span)
+# 주요 구간(YouTube 클라이언트 생성, API 호출, 키워드 생성, 사이드바/그리드 렌더링)의 시간을 재서
+# 세션 ID와 rerun ID를 붙여 메모리 링 버퍼에 보관한다. 결과는 앱 디버그 패널(?debug=1),
+# /metrics 엔드포인트(Prometheus 텍스트 또는 JSON lines), 선택적인 JSON lines 파일로 볼 수 있다.
+# TRACING_ENABLED=0(기본값)이면 span()은 미리 만들어 둔 빈 객체를 돌려주므로 비용이 거의 없다.
+#
+#   with tracing.span('youtube.execute', method=request.methodId):
+#       ...
+#   with tracing.rerun('app.rerun', session_id):   # 세션 ID와 새 rerun ID를 하위 span에 전달
+#       ...
+import bisect
+import contextvars
+import functools
+import itertools
+import json
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# 히스토그램 구간 (초)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 현재 실행 흐름의 세션과 rerun (스레드 풀로 넘길 때는 contextvars.copy_context로 전달)
+_session_id = contextvars.ContextVar('trace_session_id', default=None)
+_rerun_id = contextvars.ContextVar('trace_rerun_id', default=None)
+_rerun_seq = itertools.count(1)
+
+
+# 추적이 꺼져 있을 때 돌려주는 span
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, name, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    __slots__ = ('_tracer', 'name', 'attrs', 'session_id', 'rerun_id', 'root', '_started', '_tokens')
+
+    def __init__(self, tracer, name, attrs, session_id, rerun_id, root=False):
+        self._tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.session_id = session_id
+        self.rerun_id = rerun_id
+        self.root = root
+        self._tokens = None
+
+    def set(self, name, value):
+        self.attrs[name] = value
+
+    def __enter__(self):
+        if self.root:
+            self._tokens = (_session_id.set(self.session_id), _rerun_id.set(self.rerun_id))
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._started
+        if self._tokens:
+            _session_id.reset(self._tokens[0])
+            _rerun_id.reset(self._tokens[1])
+        # st.rerun()/st.stop() 같은 제어 흐름 예외(BaseException)는 오류로 세지 않는다
+        if exc_type is not None and not issubclass(exc_type, Exception):
+            self.attrs['exit'] = exc_type.__name__
+            exc_type = None
+        self._tracer.record(self, seconds, exc_type)
+        return False
+
+
+class _Histogram:
+    __slots__ = ('counts', 'total', 'errors')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.errors = 0
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Tracer:
+    def __init__(self, enabled, buffer_size, log_path=''):
+        self.enabled = bool(enabled)
+        self._lock = threading.Lock()
+        self._spans = deque(maxlen=buffer_size)
+        self._histograms = {}
+        self._log_path = log_path
+        self._log = None
+
+    # 구간 하나 (현재 세션과 rerun ID를 이어받음)
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, attrs, _session_id.get(), _rerun_id.get())
+
+    # rerun(또는 API 요청) 하나의 최상위 구간. 이미 rerun 안이면 일반 span이 된다
+    # (전체 rerun 중에 fragment 함수가 실행되는 경우)
+    def rerun(self, name, session_id, **attrs):
+        if not self.enabled:
+            return _NULL_SPAN
+        if _rerun_id.get() is not None:
+            return self.span(name, **attrs)
+        return Span(self, name, attrs, session_id, next(_rerun_seq), root=True)
+
+    def record(self, span, seconds, error):
+        record = {
+            'name': span.name,
+            'session': span.session_id,
+            'rerun': span.rerun_id,
+            'root': span.root,
+            'start': round(time.time() - seconds, 6),
+            'duration_ms': round(seconds * 1000, 3),
+            'error': error.__name__ if error else None,
+            'attrs': span.attrs,
+        }
+        with self._lock:
+            self._spans.append(record)
+            histogram = self._histograms.get(span.name)
+            if histogram is None:
+                histogram = self._histograms[span.name] = _Histogram()
+            histogram.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+            histogram.total += seconds
+            if error:
+                histogram.errors += 1
+            if self._log_path:
+                self._write_log(record)
+
+    def _write_log(self, record):
+        try:
+            if self._log is None:
+                self._log = open(self._log_path, 'a', encoding='utf-8', buffering=1)
+            self._log.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        except OSError:
+            logger.exception("span 기록 파일 쓰기 실패: %s", self._log_path)
+            self._log_path = ''
+
+    # 최근 span (오래된 것부터). session_id나 rerun_id로 거를 수 있다
+    def records(self, session_id=None, rerun_id=None, limit=None):
+        with self._lock:
+            spans = list(self._spans)
+        if session_id is not None:
+            spans = [span for span in spans if span['session'] == session_id]
+        if rerun_id is not None:
+            spans = [span for span in spans if span['rerun'] == rerun_id]
+        return spans[-limit:] if limit else spans
+
+    # 세션에서 마지막으로 끝난 rerun의 span 목록
+    def last_rerun(self, session_id):
+        spans = self.records(session_id)
+        for span in reversed(spans):
+            if span['root']:
+                return [record for record in spans if record['rerun'] == span['rerun']]
+        return []
+
+    # 구간 이름별 횟수와 지연 시간 (버퍼에 남아 있는 span 기준)
+    def summary(self, session_id=None):
+        durations = {}
+        for span in self.records(session_id):
+            durations.setdefault(span['name'], []).append(span['duration_ms'])
+        summary = []
+        for name, values in sorted(durations.items()):
+            values.sort()
+            summary.append({
+                'name': name,
+                'count': len(values),
+                'p50_ms': round(statistics.median(values), 3),
+                'p95_ms': values[max(0, int(len(values) * 0.95 + 0.5) - 1)],
+                'max_ms': values[-1],
+            })
+        return summary
+
+    # Prometheus 텍스트 형식 (프로세스 시작 후 누적값)
+    def prometheus(self):
+        with self._lock:
+            histograms = {
+                name: (list(h.counts), h.total, h.errors) for name, h in sorted(self._histograms.items())
+            }
+        lines = [
+            '# HELP app_span_duration_seconds 구간별 실행 시간',
+            '# TYPE app_span_duration_seconds histogram',
+        ]
+        for name, (counts, total, _) in histograms.items():
+            label = _label(name)
+            cumulative = 0
+            for bound, count in zip(BUCKETS, counts):
+                cumulative += count
+                lines.append(f'app_span_duration_seconds_bucket{{span="{label}",le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'app_span_duration_seconds_bucket{{span="{label}",le="+Inf"}} {cumulative}')
+            lines.append(f'app_span_duration_seconds_sum{{span="{label}"}} {total:.6f}')
+            lines.append(f'app_span_duration_seconds_count{{span="{label}"}} {cumulative}')
+        lines.append('# HELP app_span_errors_total 예외로 끝난 구간 수')
+        lines.append('# TYPE app_span_errors_total counter')
+        for name, (_, _, errors) in histograms.items():
+            lines.append(f'app_span_errors_total{{span="{_label(name)}"}} {errors}')
+        lines.extend(_collected_lines())
+        return '\n'.join(lines) + '\n'
+
+    # 최근 span을 JSON lines로
+    def jsonl(self, limit=None):
+        return ''.join(
+            json.dumps(span, ensure_ascii=False, default=str) + '\n' for span in self.records(limit=limit)
+        )
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._histograms.clear()
+
+
+_collectors = []
+
+
+# /metrics에 함께 내보낼 값 등록 (추적이 꺼져 있어도 내보낸다)
+# fn()은 (메트릭 이름, 라벨 dict, 값) 목록을 반환한다. 이름이 _total로 끝나면 counter, 아니면 gauge
+def register_collector(fn):
+    _collectors.append(fn)
+
+
+def _collected_lines():
+    samples = {}
+    for collect in _collectors:
+        try:
+            for name, labels, value in collect():
+                samples.setdefault(name, []).append((labels, value))
+        except Exception:
+            logger.exception("메트릭 수집 실패")
+    lines = []
+    for name, values in samples.items():
+        lines.append(f"# TYPE {name} {'counter' if name.endswith('_total') else 'gauge'}")
+        for labels, value in values:
+            label_text = ','.join(f'{key}="{_label(label)}"' for key, label in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value}")
+    return lines
+
+
+# 프로세스 전체에서 공유하는 tracer
+tracer = Tracer(
+    enabled=config.TRACING_ENABLED,
+    buffer_size=config.TRACING_BUFFER_SIZE,
+    log_path=config.TRACING_LOG_PATH,
+)
+
+
+def enabled():
+    return tracer.enabled
+
+
+def span(name, **attrs):
+    if not tracer.enabled:
+        return _NULL_SPAN
+    return tracer.span(name, **attrs)
+
+
+def rerun(name, session_id, **attrs):
+    if not tracer.enabled:
+        return _NULL_SPAN
+    return tracer.rerun(name, session_id, **attrs)
+
+
+# 함수 실행 전체를 span으로 기록하는 데코레이터
+def traced(name):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# 함수 실행을 rerun 하나로 기록하는 데코레이터 (Streamlit fragment가 혼자 다시 실행될 때)
+# session_id_fn은 호출 시점의 세션 ID를 돌려주는 함수
+def traced_rerun(name, session_id_fn):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.rerun(name, session_id_fn()):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# /metrics 응답 (본문, content type). format=jsonl이면 최근 span, 아니면 Prometheus 텍스트
+def metrics_response(params):
+    if params.get('format') == 'jsonl':
+        limit = params.get('limit')
+        limit = int(limit) if limit and str(limit).isdigit() else None
+        return tracer.jsonl(limit), 'application/x-ndjson; charset=utf-8'
+    return tracer.prometheus(), 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != '/metrics':
+            self.send_error(404)
+            return
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        text, content_type = metrics_response(params)
+        body = text.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server_lock = threading.Lock()
+_server = None
+
+
+# API 서버가 없는 프로세스(Streamlit 앱)에서 /metrics를 제공하는 백그라운드 HTTP 서버
+# 프로세스당 한 번만 시작하고, 포트를 열지 못하면 경고만 남긴다
+def start_metrics_server(port, host=None):
+    global _server
+    if _server is not None:
+        return _server
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host or config.API_HOST, port), _MetricsHandler)
+            except OSError as e:
+                logger.warning("metrics 서버를 시작하지 못했습니다 (포트 %s): %s", port, e)
+                _server = False
+                return _server
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True).start()
+    return _server
@@ -0,0 +1,87 @@
+# 키워드 사용 기록 (SQLite)
+# 해시태그 클릭과 API 검색을 날짜별 키워드 횟수로 쌓는다. 기록 한 번은 upsert 한 번이다.
+# warm-up 작업(warmup.py)이 최근 많이 쓰인 키워드를 골라 미리 캐시를 채우는 데 사용한다.
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS keyword_usage (
+    day TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, keyword)
+) WITHOUT ROWID;
+"""
+
+
+def _day(timestamp):
+    return time.strftime('%Y-%m-%d', time.gmtime(timestamp))
+
+
+class UsageLog:
+    def __init__(self, path, clock=time.time):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+
+    def record(self, keyword, count=1):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO keyword_usage (day, keyword, count) VALUES (?, ?, ?)"
+                " ON CONFLICT (day, keyword) DO UPDATE SET count = count + excluded.count",
+                (_day(self._clock()), keyword, count),
+            )
+
+    # 최근 days일 동안 많이 쓰인 키워드 [(keyword, count)]
+    def top_keywords(self, days=7, limit=50):
+        since = _day(self._clock() - (days - 1) * 86400)
+        with self._lock:
+            return self._conn.execute(
+                "SELECT keyword, SUM(count) AS total FROM keyword_usage WHERE day >= ?"
+                " GROUP BY keyword ORDER BY total DESC, keyword LIMIT ?",
+                (since, limit),
+            ).fetchall()
+
+    # keep_days일보다 오래된 기록 삭제
+    def prune(self, keep_days):
+        since = _day(self._clock() - (keep_days - 1) * 86400)
+        with self._lock:
+            return self._conn.execute("DELETE FROM keyword_usage WHERE day < ?", (since,)).rowcount
+
+
+_log_lock = threading.Lock()
+_log = None
+
+
+# 프로세스 전체에서 공유하는 사용 기록
+def get_log():
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = UsageLog(config.USAGE_DB_PATH)
+    return _log
+
+
+# 키워드 사용 기록 (기록에 실패해도 검색은 계속한다)
+def record(keyword):
+    if not config.USAGE_LOG_ENABLED:
+        return
+    try:
+        get_log().record(keyword)
+    except sqlite3.Error:
+        logger.warning("키워드 사용 기록 실패: %s", keyword, exc_info=True)
@@ -0,0 +1,553 @@
+# 로컬 영상 카탈로그 (할당량 없는 키워드 검색)
+# API 검색 결과와 JSONL 일괄 가져오기로 영상 레코드(ID, 제목, 채널, 키워드 태그, 재생 시간, 조회수)를 모으고,
+# 제목 토큰과 키워드 태그로 역색인을 만든다. 키워드 검색은 역색인의 게시 목록 교집합으로 처리한다.
+# - 새 레코드는 메모리 세그먼트에 쌓이고, CATALOG_FLUSH_RECORDS개가 모이면 디스크 세그먼트 파일로 쓴다
+# - 디스크 세그먼트는 바뀌지 않는 파일이고 mmap으로 열어서 게시 목록(uint32 배열)을 복사 없이 읽는다
+# - 같은 영상이 여러 세그먼트에 있으면 가장 최근 레코드만 사용하고, compact가 하나로 합친다
+#
+#   python video_catalog.py import videos.jsonl     (한 줄에 {"id", "title", "channel", "keywords", "duration", "views"})
+#   python video_catalog.py search "비 오는 날 재즈"
+#   python video_catalog.py stats | compact
+import argparse
+import atexit
+import itertools
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# YouTube 검색의 videoDuration=medium (4분 이상 20분 이하)
+MEDIUM_DURATION = (4 * 60, 20 * 60)
+
+SEGMENT_SUFFIX = '.vcs'
+_MAGIC = b'VCS1'
+# magic, 문서 수, 용어 수, 섹션 위치 (ID, 레코드 위치, 레코드, 용어 위치, 게시 목록 위치, 용어, 게시 목록)
+_HEADER = struct.Struct('<4s4xQQQQQQQQQ')
+
+_TOKEN = re.compile(r'\w+')
+# 제목의 '빗소리와', '재즈를' 같은 어절도 키워드로 찾을 수 있도록 떼어 보는 조사
+_PARTICLES = frozenset('와과은는이가을를의에로도')
+
+
+def _normalize(text):
+    return unicodedata.normalize('NFC', text or '').lower()
+
+
+# 검색어 토큰
+def query_tokens(text):
+    return list(dict.fromkeys(_TOKEN.findall(_normalize(text))))
+
+
+# 레코드를 찾을 수 있는 용어 (제목 토큰 + 조사를 뗀 어절 + 키워드 태그 토큰)
+def record_terms(record):
+    terms = set(_TOKEN.findall(_normalize(record['title'])))
+    terms.update([token[:-1] for token in terms if len(token) >= 3 and token[-1] in _PARTICLES])
+    for keyword in record['keywords']:
+        terms.update(_TOKEN.findall(_normalize(keyword)))
+    return terms
+
+
+def is_medium(duration):
+    return MEDIUM_DURATION[0] <= duration <= MEDIUM_DURATION[1]
+
+
+def _is_number(value):
+    return value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+
+
+# 세그먼트 파일에 쓸 수 있는 값인지 확인 (아니면 ValueError)
+# 줄바꿈이 있는 ID나 문자열이 아닌 제목이 메모리 세그먼트에 들어가면 이후의 flush가 모두 실패한다
+def check_fields(video_id, title, channel, keywords, duration, views):
+    if not isinstance(video_id, str) or not video_id or '\n' in video_id:
+        raise ValueError(f"잘못된 영상 ID: {video_id!r}")
+    if not isinstance(title, str) or not isinstance(channel, str):
+        raise ValueError("제목과 채널은 문자열이어야 합니다")
+    if not all(isinstance(keyword, str) for keyword in keywords):
+        raise ValueError("키워드는 문자열이어야 합니다")
+    if not (_is_number(duration) and _is_number(views)):
+        raise ValueError("duration과 views는 숫자여야 합니다")
+
+
+# 레코드 (검색 결과 항목과 같은 필드 + keywords, medium, embeddable)
+def make_record(video_id, title, channel='', keywords=(), duration=None, views=None, medium=None, embeddable=True):
+    keywords = list(keywords)
+    check_fields(video_id, title, channel, keywords, duration, views)
+    if medium is None:
+        medium = duration is None or is_medium(duration)
+    return {
+        'id': video_id,
+        'title': title,
+        'channel': channel,
+        'keywords': sorted(set(keywords)),
+        'duration': duration,
+        'views': views,
+        'medium': bool(medium),
+        'embeddable': bool(embeddable),
+    }
+
+
+def _pack(record):
+    return json.dumps([
+        record['title'], record['channel'], record['keywords'], record['duration'], record['views'],
+        record['medium'], record['embeddable'],
+    ], ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+_decode = json.JSONDecoder().decode
+
+
+def _unpack(video_id, data):
+    title, channel, keywords, duration, views, medium, embeddable = _decode(data.decode('utf-8'))
+    return {
+        'id': video_id, 'title': title, 'channel': channel, 'keywords': keywords,
+        'duration': duration, 'views': views, 'medium': medium, 'embeddable': embeddable,
+    }
+
+
+# 게시 목록 교집합을 최근 문서부터 하나씩 (짧은 목록의 문서를 나머지 목록에서 이진 탐색)
+# 필요한 만큼만 꺼내므로 흔한 단어 검색도 limit개를 찾으면 멈춘다
+def _intersect(postings):
+    postings = sorted(postings, key=len)
+    first, others = postings[0], postings[1:]
+    for doc in reversed(first):
+        for other in others:
+            i = bisect_left(other, doc)
+            if i == len(other) or other[i] != doc:
+                break
+        else:
+            yield doc
+
+
+# 레코드 목록을 세그먼트 파일로 쓴다 (임시 파일에 쓰고 이름을 바꾸므로 읽는 쪽은 완성된 파일만 본다)
+def write_segment(path, records):
+    index = {}
+    ids = []
+    offsets = array('Q', [0])
+    blobs = []
+    for doc, record in enumerate(records):
+        ids.append(record['id'])
+        blob = _pack(record)
+        blobs.append(blob)
+        offsets.append(offsets[-1] + len(blob))
+        for term in record_terms(record):
+            index.setdefault(term, array('I')).append(doc)
+    terms = sorted(index)
+    term_offsets = array('Q', [0])
+    posting_offsets = array('Q', [0])
+    term_blobs = []
+    postings = array('I')
+    for term in terms:
+        encoded = term.encode('utf-8')
+        term_blobs.append(encoded)
+        term_offsets.append(term_offsets[-1] + len(encoded))
+        postings.extend(index[term])
+        posting_offsets.append(len(postings))
+
+    sections = [
+        '\n'.join(ids).encode('utf-8'),
+        offsets.tobytes(),
+        b''.join(blobs),
+        term_offsets.tobytes(),
+        posting_offsets.tobytes(),
+        b''.join(term_blobs),
+        postings.tobytes(),
+    ]
+    positions = []
+    position = _HEADER.size
+    for section in sections:
+        position += -position % 8
+        positions.append(position)
+        position += len(section)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, len(records), len(terms), *positions))
+        for start, section in zip(positions, sections):
+            f.write(b'\0' * (start - f.tell()))
+            f.write(section)
+        f.write(b'\0' * (position - f.tell()))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# 디스크 세그먼트 (읽기 전용, mmap)
+class Segment:
+    def __init__(self, path):
+        self.key = os.path.basename(path)
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mm)
+        magic, doc_count, term_count, *positions = _HEADER.unpack_from(self._mm)
+        if magic != _MAGIC:
+            raise ValueError(f"카탈로그 세그먼트가 아닙니다: {path}")
+        ids_at, offsets_at, records_at, term_offsets_at, posting_offsets_at, terms_at, postings_at = positions
+        self.ids = bytes(view[ids_at:offsets_at]).rstrip(b'\0').decode('utf-8').split('\n') if doc_count else []
+        self._offsets = view[offsets_at:offsets_at + 8 * (doc_count + 1)].cast('Q')
+        self._records_at = records_at
+        term_offsets = view[term_offsets_at:term_offsets_at + 8 * (term_count + 1)].cast('Q')
+        self._posting_offsets = view[posting_offsets_at:posting_offsets_at + 8 * (term_count + 1)].cast('Q')
+        terms = bytes(view[terms_at:terms_at + term_offsets[term_count]])
+        self._terms = {
+            terms[term_offsets[i]:term_offsets[i + 1]].decode('utf-8'): i for i in range(term_count)
+        }
+        self._postings = view[postings_at:postings_at + 4 * self._posting_offsets[term_count]].cast('I')
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def size(self):
+        return len(self._mm)
+
+    def postings(self, term):
+        i = self._terms.get(term)
+        if i is None:
+            return ()
+        return self._postings[self._posting_offsets[i]:self._posting_offsets[i + 1]]
+
+    def match(self, tokens):
+        return _intersect([self.postings(token) for token in tokens])
+
+    def record(self, doc):
+        start = self._records_at + self._offsets[doc]
+        end = self._records_at + self._offsets[doc + 1]
+        return _unpack(self.ids[doc], self._mm[start:end])
+
+    def records(self):
+        return (self.record(doc) for doc in range(len(self.ids)))
+
+
+_live_keys = itertools.count(1)
+
+
+# 메모리 세그먼트 (새로 들어온 레코드, 카탈로그 잠금 안에서만 바꾼다)
+class LiveSegment:
+    def __init__(self):
+        self.key = f"live-{next(_live_keys)}"
+        self.ids = []
+        self._records = []
+        self._index = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, record):
+        doc = len(self.ids)
+        self.ids.append(record['id'])
+        self._records.append(record)
+        for term in record_terms(record):
+            self._index.setdefault(term, []).append(doc)
+        return doc
+
+    def postings(self, term):
+        return self._index.get(term, ())
+
+    def match(self, tokens):
+        return list(_intersect([self.postings(token) for token in tokens]))
+
+    def record(self, doc):
+        return self._records[doc]
+
+    def records(self):
+        return iter(self._records)
+
+
+class VideoCatalog:
+    def __init__(self, directory=None, flush_records=None):
+        self.directory = directory
+        self.flush_records = config.CATALOG_FLUSH_RECORDS if flush_records is None else flush_records
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._segments = []
+        self._live = LiveSegment()
+        # 파일로 쓰는 중인 메모리 세그먼트 (쓰는 동안에도 검색에 포함된다)
+        self._frozen = []
+        self._flush_scheduled = False
+        # 레코드가 추가될 때마다 늘어난다 (검색 결과를 메모할 때 키에 포함)
+        self.version = 0
+        # 영상 ID → 가장 최근 레코드의 (세그먼트 key, 문서 번호)
+        self._owner = {}
+        self._by_key = {self._live.key: self._live}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self.reload()
+
+    # 디렉터리의 세그먼트 파일을 다시 읽는다 (다른 프로세스가 쓴 세그먼트 반영)
+    def reload(self):
+        if not self.directory:
+            return
+        with self._lock:
+            loaded = {segment.key: segment for segment in self._segments}
+            names = sorted(name for name in os.listdir(self.directory) if name.endswith(SEGMENT_SUFFIX))
+            segments = [loaded.get(name) or Segment(os.path.join(self.directory, name)) for name in names]
+            owner = {}
+            for segment in segments:
+                for doc, video_id in enumerate(segment.ids):
+                    owner[video_id] = (segment.key, doc)
+            for live in self._frozen + [self._live]:
+                for doc, video_id in enumerate(live.ids):
+                    owner[video_id] = (live.key, doc)
+            self._segments = segments
+            self._owner = owner
+            self.version += 1
+            self._by_key = {segment.key: segment for segment in segments + self._frozen + [self._live]}
+
+    def __len__(self):
+        return len(self._owner)
+
+    def get(self, video_id):
+        with self._lock:
+            owner = self._owner.get(video_id)
+            if owner is None:
+                return None
+            key, doc = owner
+            return self._by_key[key].record(doc)
+
+    # 레코드 추가 (이미 있는 영상이면 키워드 태그를 합치고, 바뀐 것이 없으면 건너뛴다)
+    # 세그먼트 파일에 쓸 수 없는 레코드는 ValueError
+    def add(self, record):
+        check_fields(
+            record['id'], record['title'], record['channel'], record['keywords'], record['duration'], record['views'],
+        )
+        with self._lock:
+            old = self.get(record['id'])
+            if old is not None:
+                keywords = set(old['keywords']) | set(record['keywords'])
+                if (
+                    len(keywords) == len(old['keywords'])
+                    and (record['duration'] is None or record['duration'] == old['duration'])
+                    and (record['views'] is None or record['views'] == old['views'])
+                ):
+                    return False
+                record = {
+                    **old,
+                    **{field: value for field, value in record.items() if value is not None},
+                    'keywords': sorted(keywords),
+                }
+            doc = self._live.add(record)
+            self._owner[record['id']] = (self._live.key, doc)
+            self.version += 1
+            # 세그먼트 파일은 백그라운드에서 쓰므로 추가와 검색을 막지 않는다
+            if self.directory and len(self._live) >= self.flush_records and not self._flush_scheduled:
+                self._flush_scheduled = True
+                threading.Thread(target=self._flush_in_background, daemon=True).start()
+            return True
+
+    def add_many(self, records):
+        return sum(self.add(record) for record in records)
+
+    # API 검색 결과 페이지 (curation.fetch_search_page 결과의 items) 추가
+    # 검색을 videoDuration=medium, videoEmbeddable=true로 했으므로 두 조건을 만족한다고 기록한다 (잘못된 항목은 건너뜀)
+    def add_search_page(self, keyword, items):
+        added = 0
+        for item in items:
+            try:
+                added += self.add(make_record(
+                    item['id'], item['title'], item.get('channel', ''), [keyword],
+                    item.get('duration'), item.get('views'), medium=True,
+                ))
+            except ValueError:
+                logger.warning("카탈로그에 넣을 수 없는 검색 결과: %r", item.get('id'))
+        return added
+
+    # 키워드 검색: 모든 토큰을 제목이나 키워드 태그에 가진 영상을 최근 세그먼트부터 최대 limit개
+    # 오늘의 API 검색 조건과 같게 medium 길이, 퍼가기 가능한 영상만 반환한다
+    def search(self, query, limit=100):
+        tokens = query_tokens(query)
+        if not tokens:
+            return []
+        with self._lock:
+            segments = [(live, live.match(tokens)) for live in [self._live] + self._frozen[::-1]]
+            segments += [(segment, None) for segment in reversed(self._segments)]
+            owner = self._owner
+        items = []
+        seen = set()
+        for segment, docs in segments:
+            if docs is None:
+                docs = segment.match(tokens)
+            for doc in docs:
+                video_id = segment.ids[doc]
+                if video_id in seen or owner.get(video_id) != (segment.key, doc):
+                    continue
+                seen.add(video_id)
+                record = segment.record(doc)
+                if not (record['medium'] and record['embeddable']):
+                    continue
+                items.append({
+                    'id': video_id,
+                    'title': record['title'],
+                    'channel': record['channel'],
+                    'duration': record['duration'],
+                    'views': record['views'],
+                })
+                if len(items) >= limit:
+                    return items
+        return items
+
+    # 메모리 세그먼트를 디스크 세그먼트로 쓴다
+    # 메모리 세그먼트를 얼려 두고(검색에는 계속 포함) 잠금 밖에서 파일을 쓴 뒤 디스크 세그먼트로 바꿔 끼운다
+    def flush(self):
+        if not self.directory:
+            return None
+        with self._flush_lock:
+            with self._lock:
+                live = self._live
+                if not len(live):
+                    return None
+                self._frozen.append(live)
+                self._live = LiveSegment()
+                self._by_key[self._live.key] = self._live
+            try:
+                path = os.path.join(self.directory, f"seg-{time.time_ns():020d}-{os.getpid()}{SEGMENT_SUFFIX}")
+                write_segment(path, list(live.records()))
+                segment = Segment(path)
+            except BaseException:
+                # 쓰지 못한 레코드는 메모리 세그먼트로 되돌려서 다음 flush에서 다시 쓴다
+                with self._lock:
+                    for doc, record in enumerate(live.records()):
+                        if self._owner.get(record['id']) == (live.key, doc):
+                            self._owner[record['id']] = (self._live.key, self._live.add(record))
+                    self._frozen.remove(live)
+                    self._by_key.pop(live.key, None)
+                raise
+            with self._lock:
+                self._segments.append(segment)
+                self._by_key[segment.key] = segment
+                for doc, video_id in enumerate(segment.ids):
+                    if self._owner.get(video_id) == (live.key, doc):
+                        self._owner[video_id] = (segment.key, doc)
+                self._frozen.remove(live)
+                self._by_key.pop(live.key, None)
+            return segment
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.warning("카탈로그 세그먼트 저장 실패", exc_info=True)
+        finally:
+            self._flush_scheduled = False
+
+    # 모든 세그먼트의 최신 레코드를 세그먼트 하나로 합친다 (가려진 레코드가 사라진다)
+    def compact(self):
+        if not self.directory:
+            return None
+        self.flush()
+        with self._flush_lock, self._lock:
+            old = self._segments
+            if len(old) <= 1:
+                return old[0] if old else None
+            records = [
+                segment.record(doc) for segment in old for doc, video_id in enumerate(segment.ids)
+                if self._owner.get(video_id) == (segment.key, doc)
+            ]
+            path = os.path.join(self.directory, f"seg-{time.time_ns():020d}-{os.getpid()}{SEGMENT_SUFFIX}")
+            write_segment(path, records)
+            self._segments = []
+            for segment in old:
+                os.remove(segment.path)
+            self.reload()
+            return self._segments[-1]
+
+    # JSONL 파일 가져오기 (스트리밍, 잘못된 줄은 건너뛰고 개수를 센다)
+    def import_jsonl(self, path, keywords=()):
+        added = skipped = 0
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                    if not isinstance(row, dict) or not isinstance(row.get('keywords') or [], list):
+                        raise ValueError("잘못된 행")
+                    tags = list(row.get('keywords') or ()) + ([row['keyword']] if row.get('keyword') else [])
+                    record = make_record(
+                        row['id'], row['title'], row.get('channel', ''), tags + list(keywords),
+                        row.get('duration'), row.get('views'), row.get('medium'), row.get('embeddable', True),
+                    )
+                    added += self.add(record)
+                except (ValueError, KeyError, TypeError):
+                    skipped += 1
+        self.flush()
+        return added, skipped
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'videos': len(self._owner),
+                'segments': len(self._segments),
+                'segment_records': sum(len(segment) for segment in self._segments),
+                'live_records': len(self._live),
+                'bytes_on_disk': sum(segment.size for segment in self._segments),
+            }
+
+
+_catalog_lock = threading.Lock()
+_catalog = None
+
+
+# 프로세스 전체에서 공유하는 카탈로그 (처음 사용할 때 디스크 세그먼트를 연다)
+# 종료할 때 아직 쓰지 않은 메모리 세그먼트를 디스크에 쓴다
+def get_catalog():
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = VideoCatalog(config.CATALOG_DIR)
+                atexit.register(_flush_at_exit, _catalog)
+    return _catalog
+
+
+def _flush_at_exit(catalog):
+    try:
+        catalog.flush()
+    except OSError:
+        logger.warning("카탈로그 세그먼트 저장 실패", exc_info=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 영상 카탈로그")
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_parser = commands.add_parser('import', help="JSONL 파일 가져오기")
+    import_parser.add_argument('paths', nargs='+')
+    import_parser.add_argument('--keyword', action='append', default=[], help="모든 레코드에 붙일 키워드 태그")
+    search_parser = commands.add_parser('search', help="키워드 검색")
+    search_parser.add_argument('query')
+    search_parser.add_argument('--limit', type=int, default=20)
+    commands.add_parser('stats')
+    commands.add_parser('compact', help="세그먼트를 하나로 합치기")
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    if args.command == 'import':
+        for path in args.paths:
+            added, skipped = catalog.import_jsonl(path, args.keyword)
+            print(f"{path}: {added}개 추가, {skipped}줄 건너뜀")
+    elif args.command == 'search':
+        started = time.perf_counter()
+        items = catalog.search(args.query, args.limit)
+        elapsed = (time.perf_counter() - started) * 1e6
+        for item in items:
+            print(json.dumps(item, ensure_ascii=False))
+        print(f"{len(items)}개, {elapsed:.0f} us", file=sys.stderr)
+    elif args.command == 'compact':
+        catalog.compact()
+    print(json.dumps(catalog.get_stats(), ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
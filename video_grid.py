@@ -0,0 +1,52 @@
+# 영상 카드 그리드 컴포넌트
+# 카드마다 st.markdown과 st.button을 따로 보내지 않고, 목록 전체를 하나의 컴포넌트로 그린다.
+# 카드 HTML(embeds)과 좋아요 목록을 한 번에 보내고, 좋아요/삭제 클릭은 컴포넌트 값
+# {'action', 'id', 'nonce'}로 돌아온다. 카드 수와 관계없이 delta는 하나다.
+# 카드 HTML은 영상 ID 목록이 바뀔 때만 보내고, 좋아요/취소 때는 좋아요 목록과 ID 목록만 보낸다.
+# 컴포넌트가 새로 만들어져서 가진 카드가 ID 목록과 다르면 {'action': 'need_cards'}로 다시 요청한다.
+import os
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+import embeds
+import tracing
+
+_component = components.declare_component(
+    'video_grid',
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'video_grid'),
+)
+
+
+# 영상 목록을 그리드로 표시. action은 'like' 또는 'delete'
+# 버튼을 누르면 다시 그리기 전에 on_event(video)가 호출된다
+def video_grid(videos, action, key, liked_ids=(), on_event=None):
+    by_id = {video.id: video for video in videos}
+    ids = tuple(by_id)
+    # 마지막으로 카드 HTML을 보낸 (key, ID 목록) (한 화면에 action마다 그리드는 하나)
+    sent = st.session_state.setdefault('video_grid_sent', {})
+
+    def handle_event():
+        event = st.session_state.get(key)
+        if not event:
+            return
+        if event.get('action') == 'need_cards':
+            st.session_state.video_grid_sent.pop(action, None)
+        elif on_event and event.get('action') == action and event.get('id') in by_id:
+            on_event(by_id[event['id']])
+
+    args = {}
+    if sent.get(action) != (key, ids):
+        args['cards_html'] = embeds.cards_html(videos)
+        sent[action] = (key, ids)
+
+    with tracing.span('video_grid.render', action=action, cards=len(videos), cards_sent='cards_html' in args):
+        _component(
+            ids=list(ids),
+            liked=[video_id for video_id in ids if video_id in liked_ids],
+            action=action,
+            key=key,
+            default=None,
+            on_change=handle_event,
+            **args,
+        )
@@ -0,0 +1,37 @@
+# 화면에 보여 주는 영상 레코드
+# 세션마다 current_videos와 저장 목록 페이지의 영상을 보관하므로 dict 대신 __slots__ 객체를 쓴다.
+# 채널과 키워드 문자열은 intern해서 모든 세션이 같은 객체를 공유하고, embed_url은 저장하지 않고 id로 만든다.
+import sys
+
+EMBED_URL = "https://www.youtube.com/embed/{}"
+
+
+class VideoRecord:
+    __slots__ = ('id', 'title', 'channel', 'keyword', 'liked_at')
+
+    def __init__(self, video_id, title, channel, keyword, liked_at=None):
+        self.id = video_id
+        self.title = title
+        self.channel = sys.intern(channel)
+        self.keyword = sys.intern(keyword)
+        self.liked_at = liked_at
+
+    @property
+    def embed_url(self):
+        return EMBED_URL.format(self.id)
+
+    # API 응답용 dict (이전 영상 dict와 같은 필드)
+    def to_dict(self):
+        video = {
+            'id': self.id,
+            'title': self.title,
+            'channel': self.channel,
+            'embed_url': self.embed_url,
+            'keyword': self.keyword,
+        }
+        if self.liked_at is not None:
+            video['liked_at'] = self.liked_at
+        return video
+
+    def __repr__(self):
+        return f"VideoRecord({self.id!r}, {self.title!r}, {self.channel!r}, {self.keyword!r})"
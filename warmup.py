@@ -0,0 +1,176 @@
+# 검색 캐시 warm-up 작업
+# 카탈로그의 모든 테마 키워드(화면에 보이는 앞 5개)와 사용 기록의 인기 키워드 첫 페이지를 미리 가져와서
+# 사용자가 몰리는 시간 전에 검색 캐시를 채운다. 신선한 기간이 WARMUP_REFRESH_WINDOW보다 많이 남은
+# 항목은 건너뛰므로 자주 실행해도 만료가 가까운 항목만 다시 가져온다.
+# API 호출은 warm-up 우선순위로 처리하고, 한 번 실행에 쓰는 할당량은 --budget 단위를 넘지 않는다.
+# 할당량 스케줄러는 프로세스마다 따로 세므로, 별도 프로세스에서는 오늘 앱 레플리카가 쓴 할당량을 모른다.
+# QUOTA_WARMUP_RESERVE도 이 프로세스가 쓴 양만 기준으로 하므로 앱 몫을 지키는 실제 한도는 --budget뿐이다.
+# 일일 예산에서 앱이 쓸 양을 빼고 남는 만큼으로 정한다.
+#
+# 별도 프로세스로 실행하면 이 프로세스의 메모리 캐시만 채워지므로, 앱 레플리카와 같은
+# 공유 캐시(SHARED_CACHE_URL)를 설정해야 효과가 있다.
+#
+#   SHARED_CACHE_URL=redis://cache:6379/0 python warmup.py --budget 3000 --concurrency 4
+#   0 17 * * * cd /app && python warmup.py --json >> /var/log/warmup.jsonl     (cron 예)
+import argparse
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+import curation
+import keyword_index
+import quota
+import usage_log
+from search_cache import search_cache
+
+logger = logging.getLogger(__name__)
+
+# 검색 한 번에 드는 할당량 (search.list + 후보 보강용 videos.list)
+UNITS_PER_SEARCH = quota.method_cost('youtube.search.list') + quota.method_cost('youtube.videos.list')
+
+
+# warm-up 대상 키워드 {keyword: 출처} (인기 키워드 → 카탈로그 테마 순서, 중복 제거)
+def candidate_keywords(top_keywords=None, usage_days=None, keyword_count=5):
+    top_keywords = config.WARMUP_TOP_KEYWORDS if top_keywords is None else top_keywords
+    usage_days = config.WARMUP_USAGE_DAYS if usage_days is None else usage_days
+    keywords = {}
+    if top_keywords > 0:
+        for keyword, _ in usage_log.get_log().top_keywords(usage_days, top_keywords):
+            keywords.setdefault(keyword, 'usage')
+    index = keyword_index.get_index()
+    for key in index.themes():
+        for keyword in index.keywords_for(key)[:keyword_count]:
+            keywords.setdefault(keyword, 'catalog')
+    for keyword in index.default_keywords[:keyword_count]:
+        keywords.setdefault(keyword, 'catalog')
+    return keywords
+
+
+def _refresh(key, loader):
+    try:
+        search_cache.refresh(key, loader)
+        return 'refreshed'
+    except quota.QuotaExhausted:
+        return 'quota_exhausted'
+    except Exception:
+        logger.warning("warm-up 실패: %s", key, exc_info=True)
+        return 'failed'
+
+
+# 키워드 검색 첫 페이지를 캐시에 채우고 결과 요약을 반환
+# 로컬 카탈로그가 답할 수 있거나 만료가 가깝지 않은 항목은 건너뛰고, 예산을 넘는 항목은 가져오지 않는다 (over_budget)
+def run_warmup(keywords, budget=None, concurrency=None, refresh_window=None, max_results=5):
+    budget = config.WARMUP_QUOTA_BUDGET if budget is None else budget
+    concurrency = config.WARMUP_CONCURRENCY if concurrency is None else concurrency
+    refresh_window = config.WARMUP_REFRESH_WINDOW if refresh_window is None else refresh_window
+    started = time.monotonic()
+    quota_before = quota.scheduler.get_stats()
+    youtube = curation.get_youtube()
+
+    outcomes = {}
+    sources = {}
+    jobs = []
+    reserved = 0
+    for keyword, source in keywords.items():
+        key, loader = curation.search_request(youtube, keyword, max_results, priority=quota.PRIORITY_WARMUP)
+        if key in sources:
+            continue
+        sources[key] = source
+        if curation.catalog_page(keyword, max_results) is not None:
+            outcomes[key] = 'local'
+            continue
+        remaining = search_cache.fresh_for(key)
+        if remaining is not None and remaining > refresh_window:
+            outcomes[key] = 'fresh'
+        elif reserved + UNITS_PER_SEARCH > budget:
+            outcomes[key] = 'over_budget'
+        else:
+            reserved += UNITS_PER_SEARCH
+            jobs.append((key, loader))
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix='warmup') as pool:
+        for (key, _), outcome in zip(jobs, pool.map(lambda job: _refresh(*job), jobs)):
+            outcomes[key] = outcome
+
+    quota_after = quota.scheduler.get_stats()
+    report = {
+        'candidates': len(sources),
+        'local': 0,
+        'fresh': 0,
+        'refreshed': 0,
+        'failed': 0,
+        'quota_exhausted': 0,
+        'over_budget': 0,
+    }
+    covered = {}
+    for key, outcome in outcomes.items():
+        report[outcome] += 1
+        total, ok = covered.get(sources[key], (0, 0))
+        covered[sources[key]] = (total + 1, ok + (outcome in ('local', 'fresh', 'refreshed')))
+    report['coverage'] = (
+        (report['local'] + report['fresh'] + report['refreshed']) / len(sources) if sources else 1.0
+    )
+    report['coverage_by_source'] = {source: ok / total for source, (total, ok) in covered.items()}
+    report['quota_units'] = quota_after['spent_today'] - quota_before['spent_today']
+    report['quota_units_by_method'] = {
+        method: spent - quota_before['spent_by_method'].get(method, 0)
+        for method, spent in quota_after['spent_by_method'].items()
+        if spent != quota_before['spent_by_method'].get(method, 0)
+    }
+    report['budget'] = budget
+    report['shared_cache'] = search_cache.shared is not None
+    report['elapsed_seconds'] = round(time.monotonic() - started, 3)
+    return report
+
+
+def print_report(report):
+    print(f"대상 키워드 {report['candidates']}개, 적용 범위 {report['coverage']:.1%}")
+    for source, ratio in sorted(report['coverage_by_source'].items()):
+        print(f"  {source:8s} {ratio:.1%}")
+    print(f"  로컬 카탈로그 {report['local']}  신선함(건너뜀) {report['fresh']}  갱신 {report['refreshed']}"
+          f"  실패 {report['failed']}  할당량 부족 {report['quota_exhausted']}  예산 초과 {report['over_budget']}")
+    print(f"할당량 {report['quota_units']} / {report['budget']} 단위 사용", end='')
+    if report['quota_units_by_method']:
+        print(' (' + ', '.join(f"{method} {units}" for method, units in sorted(report['quota_units_by_method'].items())) + ')')
+    else:
+        print()
+    print(f"{report['elapsed_seconds']:.1f}초")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 캐시 warm-up")
+    parser.add_argument('--budget', type=int, default=config.WARMUP_QUOTA_BUDGET, help="사용할 최대 할당량 단위 (앱 레플리카의 사용량을 모르므로 이 값이 실제 한도)")
+    parser.add_argument('--concurrency', type=int, default=config.WARMUP_CONCURRENCY)
+    parser.add_argument('--refresh-window', type=int, default=config.WARMUP_REFRESH_WINDOW,
+                        help="신선한 기간이 이보다 적게 남은 항목만 다시 가져옴 (초)")
+    parser.add_argument('--top-keywords', type=int, default=config.WARMUP_TOP_KEYWORDS,
+                        help="사용 기록에서 가져올 인기 키워드 수 (0이면 카탈로그만)")
+    parser.add_argument('--usage-days', type=int, default=config.WARMUP_USAGE_DAYS)
+    parser.add_argument('--json', action='store_true', help="결과를 JSON 한 줄로 출력")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    # 사용자 요청이 없는 배치 작업이므로 분당 한도에 걸리면 오래 기다린다
+    quota.scheduler.max_wait = config.WARMUP_MAX_WAIT
+    if search_cache.shared is None:
+        logger.warning("SHARED_CACHE_URL이 없어 이 프로세스의 메모리 캐시만 채웁니다 (앱 레플리카에는 효과 없음)")
+    try:
+        curation.configure()
+    except curation.CurationError as e:
+        logger.error(e.message)
+        return 2
+
+    keywords = candidate_keywords(args.top_keywords, args.usage_days)
+    report = run_warmup(keywords, args.budget, args.concurrency, args.refresh_window)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+    else:
+        print_report(report)
+    return 1 if report['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,264 @@
+# YouTube API 대체 백엔드 (오프라인 벤치마크와 회귀 측정용)
+# youtube_client.get_client가 돌려주는 클라이언트를 YOUTUBE_BACKEND 설정으로 바꾼다.
+# - live: 실제 API (기본값)
+# - record: 실제 API를 호출하면서 search.list / videos.list 응답을 fixture 파일로 저장
+# - replay: 저장된 fixture로만 응답 (네트워크 불필요, 없는 요청은 FixtureNotFound)
+# - synthetic: 요청 파라미터로 결정되는 가짜 응답. 지연 시간, 느린 응답, 오류 비율, 장애, 할당량 소진을 설정할 수 있다
+# 모든 클라이언트는 search().list(...)와 videos().list(...)가 methodId와 execute(http=...)를 가진
+# 요청을 반환하므로, 할당량 스케줄러와 캐시, prefetch는 실제 API와 같은 경로로 동작한다.
+import copy
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+from googleapiclient.errors import HttpError
+
+import config
+import quota
+
+MODES = ('live', 'record', 'replay', 'synthetic')
+SEARCH_PAGES = 5  # synthetic 검색 결과의 페이지 수
+
+
+class FixtureNotFound(LookupError):
+    pass
+
+
+def _canonical_params(params):
+    return {name: value for name, value in sorted(params.items()) if value is not None}
+
+
+def request_fingerprint(method, params):
+    text = json.dumps([method, _canonical_params(params)], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+# 요청별 응답을 {dir}/{method}/{fingerprint}.json 파일로 저장
+class FixtureStore:
+    def __init__(self, path):
+        self.path = path
+
+    def _file(self, method, params):
+        return os.path.join(self.path, method, f"{request_fingerprint(method, params)}.json")
+
+    def save(self, method, params, response):
+        path = self._file(method, params)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 쓰는 중에 읽히지 않도록 임시 파일에 쓴 뒤 교체
+        temp = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump({'method': method, 'params': _canonical_params(params), 'response': response},
+                      f, ensure_ascii=False)
+        os.replace(temp, path)
+
+    def load(self, method, params):
+        try:
+            with open(self._file(method, params), encoding='utf-8') as f:
+                return json.load(f)['response']
+        except FileNotFoundError:
+            raise FixtureNotFound(f"{method} fixture 없음: {_canonical_params(params)}") from None
+
+
+# 요청 복사본 (hedge처럼 같은 요청을 동시에 실행할 때 시도마다 따로 쓴다)
+# googleapiclient HttpRequest.execute는 headers를 고치고 uri/method/body를 바꿔 넣으므로 headers도 복사한다
+def copy_request(request):
+    clone = copy.copy(request)
+    headers = getattr(request, 'headers', None)
+    if isinstance(headers, dict):
+        clone.headers = dict(headers)
+    return clone
+
+
+class BackendRequest:
+    def __init__(self, method_id, execute):
+        self.methodId = method_id
+        self._execute = execute
+
+    def execute(self, http=None):
+        return self._execute(http)
+
+
+class _Resource:
+    def __init__(self, client, method):
+        self._client = client
+        self._method = method
+
+    def list(self, **params):
+        return self._client.request(self._method, params)
+
+
+# search()와 videos() 리소스를 제공하는 클라이언트 공통 부분
+class _Client:
+    def search(self):
+        return _Resource(self, 'youtube.search.list')
+
+    def videos(self):
+        return _Resource(self, 'youtube.videos.list')
+
+
+# 실제 API 응답을 fixture로 저장하면서 그대로 반환
+class RecordingClient(_Client):
+    def __init__(self, live_client, store):
+        self._live = live_client
+        self._store = store
+
+    def request(self, method, params):
+        resource = self._live.search() if method == 'youtube.search.list' else self._live.videos()
+        live_request = resource.list(**params)
+
+        def execute(http):
+            response = copy_request(live_request).execute(http=http)
+            self._store.save(method, params, response)
+            return response
+
+        return BackendRequest(method, execute)
+
+
+# fixture로만 응답
+class ReplayClient(_Client):
+    def __init__(self, store):
+        self._store = store
+
+    def request(self, method, params):
+        return BackendRequest(method, lambda http: self._store.load(method, params))
+
+
+def _http_error(status, reason, message):
+    import httplib2
+    content = json.dumps({'error': {'code': status, 'message': message, 'errors': [{'reason': reason}]}})
+    return HttpError(httplib2.Response({'status': status}), content.encode('utf-8'))
+
+
+# 요청 파라미터로 결정되는 가짜 응답
+# 같은 요청은 항상 같은 응답을 받으므로 캐시와 페이지 커서가 실제처럼 동작한다.
+# quota_units가 0보다 크면 그만큼 쓴 뒤로는 403 quotaExceeded를 반환한다.
+# 복원력 계층(resilience.py)을 확인할 수 있도록 장애를 흉내 낸다.
+# - error_rate 비율의 요청은 error_status 오류, slow_rate 비율의 요청은 slow_latency만큼 늦게 응답
+# - fail_for(seconds)를 부르면 그 시간 동안 모든 요청이 error_status 오류 (upstream 장애)
+class SyntheticClient(_Client):
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, quota_units=0, seed=0, error_status=500,
+                 slow_rate=0.0, slow_latency=2.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.quota_units = quota_units
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._outage_until = 0.0
+        self._stats = {'calls': 0, 'errors': 0, 'slow': 0, 'quota_errors': 0, 'units': 0}
+
+    # 지금부터 seconds 동안 모든 요청을 실패시킨다 (0이면 장애 끝)
+    def fail_for(self, seconds):
+        with self._lock:
+            self._outage_until = time.monotonic() + seconds
+
+    def request(self, method, params):
+        return BackendRequest(method, lambda http: self._respond(method, params))
+
+    def _respond(self, method, params):
+        with self._lock:
+            self._stats['calls'] += 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            if self.slow_rate > 0 and self._rng.random() < self.slow_rate:
+                self._stats['slow'] += 1
+                delay = self.slow_latency
+            failed = time.monotonic() < self._outage_until or (
+                self.error_rate > 0 and self._rng.random() < self.error_rate
+            )
+            cost = quota.method_cost(method)
+            exhausted = self.quota_units > 0 and self._stats['units'] + cost > self.quota_units
+            if exhausted:
+                self._stats['quota_errors'] += 1
+            elif failed:
+                self._stats['errors'] += 1
+            else:
+                self._stats['units'] += cost
+        if delay:
+            time.sleep(delay)
+        if exhausted:
+            raise _http_error(
+                403, 'quotaExceeded',
+                "The request cannot be completed because you have exceeded your quota.",
+            )
+        if failed:
+            raise _http_error(self.error_status, 'backendError', "Backend Error")
+        if method == 'youtube.search.list':
+            return self._search(params)
+        return self._videos(params)
+
+    def _random(self, *parts):
+        digest = hashlib.sha1(json.dumps([self.seed, *parts], ensure_ascii=False).encode('utf-8')).digest()
+        return random.Random(digest)
+
+    def _search(self, params):
+        token = params.get('pageToken') or 'P0'
+        page = int(token[1:]) if token[1:].isdigit() else 0
+        count = int(params.get('maxResults', 5))
+        rng = self._random('search', params.get('q'), page)
+        items = []
+        for i in range(count):
+            video_id = hashlib.sha1(f"{params.get('q')}:{page}:{i}".encode('utf-8')).hexdigest()[:11]
+            marker = rng.choice(('playlist', '플레이리스트', 'mix', 'live', 'official'))
+            items.append({
+                'kind': 'youtube#searchResult',
+                'id': {'kind': 'youtube#video', 'videoId': video_id},
+                'snippet': {
+                    'title': f"{params.get('q')} {marker} {page * count + i + 1}",
+                    'channelTitle': f"채널 {rng.randint(1, 50)}",
+                },
+            })
+        response = {'kind': 'youtube#searchListResponse', 'items': items}
+        if page + 1 < SEARCH_PAGES:
+            response['nextPageToken'] = f"P{page + 1}"
+        return response
+
+    def _videos(self, params):
+        items = []
+        for video_id in params.get('id', '').split(','):
+            rng = self._random('video', video_id)
+            minutes = rng.randint(4, 180)
+            items.append({
+                'kind': 'youtube#video',
+                'id': video_id,
+                'contentDetails': {'duration': f"PT{minutes // 60}H{minutes % 60}M{rng.randint(0, 59)}S"},
+                'statistics': {'viewCount': str(int(10 ** rng.uniform(2, 7)))},
+            })
+        return {'kind': 'youtube#videoListResponse', 'items': items}
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+# 설정된 모드의 클라이언트 생성. live_factory는 실제 API 클라이언트를 만드는 함수
+def create_client(mode, live_factory):
+    if mode == 'live':
+        return live_factory()
+    if mode == 'record':
+        return RecordingClient(live_factory(), FixtureStore(config.YOUTUBE_FIXTURE_DIR))
+    if mode == 'replay':
+        return ReplayClient(FixtureStore(config.YOUTUBE_FIXTURE_DIR))
+    if mode == 'synthetic':
+        return SyntheticClient(
+            latency=config.YOUTUBE_SYNTHETIC_LATENCY,
+            jitter=config.YOUTUBE_SYNTHETIC_JITTER,
+            error_rate=config.YOUTUBE_SYNTHETIC_ERROR_RATE,
+            quota_units=config.YOUTUBE_SYNTHETIC_QUOTA,
+            seed=config.YOUTUBE_SYNTHETIC_SEED,
+            error_status=config.YOUTUBE_SYNTHETIC_ERROR_STATUS,
+            slow_rate=config.YOUTUBE_SYNTHETIC_SLOW_RATE,
+            slow_latency=config.YOUTUBE_SYNTHETIC_SLOW_LATENCY,
+        )
+    raise ValueError(f"알 수 없는 YOUTUBE_BACKEND: {mode} ({', '.join(MODES)} 중 하나)")
+
+
+# API 키 없이 동작하는 모드인지
+def is_offline(mode):
+    return mode in ('replay', 'synthetic')
@@ -0,0 +1,135 @@
+# YouTube API 클라이언트 레지스트리
+# Streamlit은 매 rerun마다 app.py를 다시 실행하므로, 프로세스 전체에서 공유해야 하는
+# 상태는 별도 모듈에 둔다. 여기서는 discovery 문서 파싱과 리소스 트리 생성을
+# 프로세스당 한 번만 수행하고, 모든 세션과 스레드가 같은 클라이언트를 재사용한다.
+# googleapiclient.discovery와 httplib2는 실제 API 클라이언트를 만들 때 불러온다
+# (synthetic/replay 백엔드와 첫 화면에는 필요 없고 import에 0.2초 이상 걸린다).
+import json
+import threading
+import time
+
+import config
+import quota
+import resilience
+import tracing
+import youtube_backend
+
+# HTTP 연결 설정
+# 소켓 시간 제한은 시도별 시간 제한에 맞춘다 (시간 제한으로 포기한 시도가 작업 스레드를 오래 잡고 있지 않게)
+HTTP_TIMEOUT = config.RESILIENCE_ATTEMPT_TIMEOUT if config.RESILIENCE_ATTEMPT_TIMEOUT > 0 else 10
+MAX_IDLE_CONNECTIONS = 8
+
+_lock = threading.Lock()
+_discovery_doc = None
+_clients = {}
+_idle_http = []
+_stats = {
+    'hits': 0,
+    'misses': 0,
+    'build_seconds': 0.0,
+    'discovery_load_seconds': 0.0,
+    'http_created': 0,
+    'http_reused': 0,
+}
+
+
+# 라이브러리에 포함된 v3 discovery 문서를 한 번만 읽는다 (네트워크 불필요)
+def _load_discovery_doc():
+    global _discovery_doc
+    if _discovery_doc is None:
+        from googleapiclient.discovery_cache import get_static_doc
+        started = time.perf_counter()
+        content = get_static_doc('youtube', 'v3')
+        if content is None:
+            raise RuntimeError("youtube v3 discovery 문서를 찾을 수 없습니다")
+        _discovery_doc = json.loads(content)
+        _stats['discovery_load_seconds'] += time.perf_counter() - started
+    return _discovery_doc
+
+
+def _build_live(api_key):
+    from googleapiclient.discovery import build_from_document
+    return build_from_document(_load_discovery_doc(), developerKey=api_key)
+
+
+# API 키별로 클라이언트를 한 번만 생성해서 재사용
+def get_client(api_key):
+    with tracing.span('youtube.get_client') as span:
+        client = _clients.get(api_key)
+        if client is not None:
+            with _lock:
+                _stats['hits'] += 1
+            return client
+
+        with _lock:
+            client = _clients.get(api_key)
+            if client is not None:
+                _stats['hits'] += 1
+                return client
+            span.set('built', True)
+            started = time.perf_counter()
+            # YOUTUBE_BACKEND가 live가 아니면 녹화/재생/가짜 클라이언트 (youtube_backend)
+            client = youtube_backend.create_client(config.YOUTUBE_BACKEND, lambda: _build_live(api_key))
+            _stats['build_seconds'] += time.perf_counter() - started
+            _stats['misses'] += 1
+            _clients[api_key] = client
+            return client
+
+
+# httplib2.Http는 스레드 안전하지 않으므로 요청마다 유휴 연결을 빌려 쓰고 돌려준다.
+# 반납된 Http 객체는 keep-alive 연결을 유지하므로 다음 요청에서 TLS 핸드셰이크를 생략한다.
+def _acquire_http():
+    with _lock:
+        if _idle_http:
+            _stats['http_reused'] += 1
+            return _idle_http.pop()
+        _stats['http_created'] += 1
+    import httplib2
+    return httplib2.Http(timeout=HTTP_TIMEOUT)
+
+
+def _release_http(http):
+    with _lock:
+        if len(_idle_http) < MAX_IDLE_CONNECTIONS:
+            _idle_http.append(http)
+
+
+def _execute(request):
+    http = _acquire_http()
+    try:
+        with tracing.span('youtube.execute', method=request.methodId):
+            return request.execute(http=http)
+    finally:
+        _release_http(http)
+
+
+# 할당량 스케줄러와 복원력 계층(재시도, hedge, 회로 차단기)을 거쳐 공유 연결 풀로 API 요청 실행
+# 시도마다 요청 복사본을 실행한다 (hedge는 원래 시도와 동시에 실행되고, 포기한 시도도 계속 실행 중일 수 있음)
+def execute(request, priority=quota.PRIORITY_USER):
+    return resilience.caller.call(
+        request.methodId, lambda: _execute(youtube_backend.copy_request(request)), priority
+    )
+
+
+# 클라이언트 재사용 통계
+def get_stats():
+    with _lock:
+        stats = dict(_stats)
+        stats['clients'] = len(_clients)
+        stats['idle_connections'] = len(_idle_http)
+    return stats
+
+
+# 메서드별 할당량 사용량 (upstream 호출 수 = 단위 ÷ 메서드 비용, 할당량 초기화 시각에 0으로 돌아간다)
+def _collect_metrics():
+    samples = [
+        ('app_quota_units_total', {'method': method}, units)
+        for method, units in quota.scheduler.get_stats()['spent_by_method'].items()
+    ]
+    stats = get_stats()
+    samples.append(('app_youtube_http_connections_total', {'result': 'created'}, stats['http_created']))
+    samples.append(('app_youtube_http_connections_total', {'result': 'reused'}, stats['http_reused']))
+    return samples
+
+
+tracing.register_collector(_collect_metrics)